@@ -1 +1,5 @@
-__author__ = 'narae'
\ No newline at end of file
+__author__ = 'narae'
+
+from secretsanta.santadraw.batch import draw_many
+from secretsanta.santadraw.budget import CancellationToken, DrawCancelled, DrawTimeout
+from secretsanta.santadraw.planner import plan_years
@@ -0,0 +1,79 @@
+import asyncio
+from functools import partial
+
+from secretsanta.santadraw.budget import CancellationToken
+from secretsanta.santadraw.santa_draw import SantaDraw
+
+
+class AsyncSantaDraw:
+    """
+    ``AsyncSantaDraw`` class is the asyncio facade of ``SantaDraw`` for async web stacks.
+    The draws and the checks run in an executor so that the event loop is never blocked by a slow draw,
+    and the draws of this instance wait for each other by an ``asyncio.Lock`` instead of holding a thread.
+
+    The executor must run in this process, e.g., an instance of ``concurrent.futures.ThreadPoolExecutor``,
+    since the draw updates the ``SantaDraw`` of this instance.
+    By default, the default executor of the event loop is used.
+
+    Cancellation: a draw cancelled while waiting for another draw of this instance never starts.
+    A draw cancelled while running returns the control to the event loop straight away, and the draw running in the
+    executor is stopped by its ``CancellationToken`` soon, unless it has just finished.
+    """
+
+    def __init__(self, family_members=None, random_seed=None, executor=None, santa_draw=None):
+        """
+        :param family_members: Optional argument for the members of the family, see ``SantaDraw``
+        :param random_seed: Optional argument to seed the random stream of the draws, see ``SantaDraw``
+        :param executor: Optional argument for the executor to run the draws, e.g., ``ThreadPoolExecutor``
+        :param santa_draw: Optional argument for the instance of ``SantaDraw`` to wrap instead of a new one
+        """
+        self._santa_draw = SantaDraw(family_members, random_seed) if santa_draw is None else santa_draw
+        self._executor = executor
+        self._lock = None  # created in the event loop at the first draw, see ``_get_lock()``
+
+    def _get_lock(self) -> asyncio.Lock:
+        """Return the lock of the draws, which is created lazily since asyncio locks may be bound to the event loop"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def _run(self, func, *args, **kwargs):
+        """Run the function in the executor and wait for the result without blocking the event loop"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def draw(self, random_seed=None, strategy="backtracking", deadline=None, max_nodes=None):
+        """
+        Assign a Secret Santa to everyone as ``SantaDraw.assign_santa_to_everyone()`` in the executor.
+        The draws of this instance run one by one in the order of the calls.
+
+        :param random_seed: Optional argument to seed the random stream of this draw for debugging purpose
+        :param strategy: Optional argument for the search strategy, "backtracking" (default) or "matching"
+        :param deadline: Optional argument for the number of the seconds that the draw can take
+        :param max_nodes: Optional argument for the maximum number of the nodes that the search can visit
+        :raises ValueError: If the number of family members is less than 2 or there is no possible pairs
+            or the strategy is unknown
+        :raises DrawTimeout: If the draw runs out of the budget
+        """
+        async with self._get_lock():
+            cancellation = CancellationToken()
+            try:
+                return await self._run(self._santa_draw.assign_santa_to_everyone, random_seed, strategy,
+                                       deadline=deadline, max_nodes=max_nodes, cancellation=cancellation)
+            except asyncio.CancelledError:
+                cancellation.cancel()
+                raise
+
+    async def get_santa_pairs(self):
+        """
+        Return the latest { Secret Santa : Assignee } pairs as ``SantaDraw.get_santa_pairs()``.
+        The pairs are a published snapshot, so they are read without the executor nor the lock.
+        """
+        return self._santa_draw.get_santa_pairs()
+
+    async def is_drawable(self) -> bool:
+        """Return True if the family can be drawn as ``SantaDraw.is_drawable()`` in the executor. Otherwise, False."""
+        return await self._run(self._santa_draw.is_drawable)
+
+    def get_santa_draw(self) -> SantaDraw:
+        """Getter for the wrapped instance of ``SantaDraw``"""
+        return self._santa_draw
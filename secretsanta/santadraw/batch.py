@@ -0,0 +1,103 @@
+import os
+import random
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+from secretsanta.santadraw.budget import DrawBudget, DrawTimeout
+from secretsanta.santadraw.family import Family
+from secretsanta.santadraw.santa_draw import STRATEGIES, search_assignment_of_ids
+
+_CHUNKS_PER_WORKER = 4  # the number of the chunks in flight per worker, which bounds the memory of a large batch
+
+
+def draw_many(families, workers=None, chunksize=1, random_seed=None, strategy="backtracking", deadline=None,
+              max_nodes=None):
+    """
+    Draw the Secret Santa pairs of many separate families across a process pool, as ``draw_secret_santa_pairs()``
+    does for each family, and yield ``(family_id, pairs)`` or ``(family_id, error)`` as the draws complete.
+    The error is the 'ValueError' of the draw, e.g., if the family is less than 2 members or there is no possible pairs,
+    or the 'DrawTimeout' of the draw which runs out of its budget.
+
+    Each family is sent to the workers in a compact form of the IDs of its members only, i.e., the number of the
+    members, the households and the last assignees as ``array('I')``, so that no ``Person`` objects are pickled.
+    The pairs returned by the workers are applied to the last assignees of each family in this process.
+    The families must not change until their results are yielded.
+
+    :param families: A mapping of { family ID : family } or an iterable of families whose IDs are their positions.
+        A family has to be an iterable of Person type, e.g., Family
+    :param workers: Optional argument for the number of the worker processes. Otherwise, the number of the CPUs
+    :param chunksize: Optional argument for the number of the families sent to a worker at once
+    :param random_seed: Optional argument to seed the random streams of all the draws for debugging purpose
+    :param strategy: Optional argument for the search strategy, "backtracking" (default) or "matching"
+    :param deadline: Optional argument for the number of the seconds that the draw of each family can take
+    :param max_nodes: Optional argument for the maximum number of the nodes that the draw of each family can visit
+    :raises ValueError: If ``workers`` or ``chunksize`` is less than 1 or the strategy is unknown
+        or the budget is negative
+    """
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if workers < 1 or chunksize < 1:
+        raise ValueError("The number of the workers and the chunk size must be at least 1.")
+    if strategy not in STRATEGIES:
+        raise ValueError("Unknown strategy '{}'. It must be one of {}.".format(strategy, sorted(STRATEGIES)))
+    DrawBudget.of(deadline, max_nodes)  # validate the budget at the call
+    items = families.items() if hasattr(families, "items") else enumerate(families)
+    return _draw_many(iter(items), workers, chunksize, random_seed, strategy, (deadline, max_nodes))
+
+
+def _draw_many(items, workers, chunksize, random_seed, strategy, budget):
+    """The generator of ``draw_many()``, which is separated so that the arguments are validated at the call"""
+    seeds = random.Random(random_seed)
+    pending = {}  # { future : { family ID : (family, members) } }
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            while len(pending) < workers * _CHUNKS_PER_WORKER:
+                chunk = list(islice(items, chunksize))
+                if not chunk:
+                    break
+                drawn = {}
+                tasks = []
+                for family_id, family in chunk:
+                    if not isinstance(family, Family):
+                        family = Family(family)
+                    drawn[family_id] = (family, list(family))
+                    seed = None if random_seed is None else seeds.getrandbits(64)
+                    tasks.append((family_id, _compact(family), seed))
+                pending[executor.submit(_draw_chunk, tasks, strategy, budget)] = drawn
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                drawn = pending.pop(future)
+                for family_id, result in future.result():
+                    family, members = drawn[family_id]
+                    if isinstance(result, Exception):
+                        yield family_id, result
+                        continue
+                    santa_pairs = {members[santa]: members[assignee] for santa, assignee in enumerate(result)}
+                    with family.locked():
+                        family.update_last_assignees_with_pairs(santa_pairs)
+                    yield family_id, santa_pairs
+
+
+def _compact(family: Family) -> tuple:
+    """Return the compact form of the family to pickle: (the number of the members, households, last assignees)"""
+    size = len(family)
+    households = [household for household in family.get_households() if len(household) > 1]
+    return size, households, [family.get_last_assignee_ids(member_id) for member_id in range(size)]
+
+
+def _draw_chunk(tasks, strategy, budget) -> list:
+    """
+    Draw the families in the compact form in a worker process, where ``budget`` is (deadline, max_nodes) of each draw.
+    Return the list of (family ID, the assignee of each santa as ``array('I')`` or the error of the draw).
+    """
+    results = []
+    for family_id, (size, households, last_assignee_ids), seed in tasks:
+        try:
+            assignment = search_assignment_of_ids(size, households, last_assignee_ids, strategy, random.Random(seed),
+                                                  DrawBudget.of(*budget))
+            results.append((family_id, array("I", assignment)))
+        except (ValueError, DrawTimeout) as e:
+            results.append((family_id, e))
+    return results
@@ -0,0 +1,100 @@
+import time
+from threading import Event
+
+_CHECK_INTERVAL = 1024  # the number of the nodes between the checks of the clock and the cancellation
+
+
+class DrawTimeout(Exception):
+    """
+    ``DrawTimeout`` is raised when a draw runs out of its budget, i.e., the deadline or the maximum number of the nodes.
+    Unlike 'ValueError', it does not mean that the family cannot be drawn: the draw was stopped before it found out.
+    """
+
+
+class DrawCancelled(DrawTimeout):
+    """``DrawCancelled`` is raised when a draw is stopped by its ``CancellationToken``"""
+
+
+class CancellationToken:
+    """
+    ``CancellationToken`` class stops the draws which are given the token once it is cancelled, e.g., by another thread.
+    The draws check the token cooperatively while searching, so they stop soon and release their locks.
+    """
+
+    def __init__(self):
+        self._cancelled = Event()
+
+    def cancel(self) -> None:
+        """Cancel the draws given this token"""
+        self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        """Return True if this token is cancelled. Otherwise, False."""
+        return self._cancelled.is_set()
+
+
+class DrawBudget:
+    """
+    ``DrawBudget`` class bounds a draw by the time, the number of the nodes of the search, and a cancellation token.
+    The searches charge the budget for every node they visit, which raises 'DrawTimeout' once the budget runs out.
+    The clock and the token are only checked every ``_CHECK_INTERVAL`` nodes to keep the charge cheap.
+    """
+
+    def __init__(self, deadline=None, max_nodes=None, cancellation=None):
+        """
+        :param deadline: Optional argument for the number of the seconds that the draw can take from now
+        :param max_nodes: Optional argument for the maximum number of the nodes that the search can visit
+        :param cancellation: Optional argument for an instance of ``CancellationToken``
+        :raises ValueError: If ``deadline`` or ``max_nodes`` is negative
+        """
+        if (deadline is not None and deadline < 0) or (max_nodes is not None and max_nodes < 0):
+            raise ValueError("The deadline and the maximum number of the nodes must not be negative.")
+        self._end = None if deadline is None else time.monotonic() + deadline
+        self._max_nodes = max_nodes
+        self._cancellation = cancellation
+        self._nodes = 0
+        self._next_check = 0
+
+    @classmethod
+    def of(cls, deadline=None, max_nodes=None, cancellation=None):
+        """Return a new budget, or None if there is no bound at all so that the searches skip the charges"""
+        if deadline is None and max_nodes is None and cancellation is None:
+            return None
+        return cls(deadline, max_nodes, cancellation)
+
+    def charge(self, nodes: int = 1) -> None:
+        """
+        Charge the budget for the visited nodes.
+
+        :raises DrawCancelled: If the cancellation token is cancelled
+        :raises DrawTimeout: If the deadline has passed or the search visits more than the maximum number of the nodes
+        """
+        self._nodes += nodes
+        if self._max_nodes is not None and self._nodes > self._max_nodes:
+            raise DrawTimeout("The draw visited more than {} nodes.".format(self._max_nodes))
+        if self._nodes >= self._next_check:
+            self._next_check = self._nodes + _CHECK_INTERVAL
+            self.check()
+
+    def check(self) -> None:
+        """
+        Check the clock and the cancellation token regardless of the nodes.
+
+        :raises DrawCancelled: If the cancellation token is cancelled
+        :raises DrawTimeout: If the deadline has passed
+        """
+        if self._cancellation is not None and self._cancellation.is_cancelled():
+            raise DrawCancelled("The draw is cancelled.")
+        if self._end is not None and time.monotonic() > self._end:
+            raise DrawTimeout("The draw passed the deadline.")
+
+    def remaining_time(self):
+        """Return the number of the seconds left until the deadline, or None if there is no deadline"""
+        return None if self._end is None else max(0.0, self._end - time.monotonic())
+
+    def for_worker(self):
+        """
+        Return the budget of the nodes only for a search in a worker process, which cannot see the clock nor the token
+        of this process. The process which waits for the worker is responsible for the deadline and the token.
+        """
+        return None if self._max_nodes is None else DrawBudget(max_nodes=self._max_nodes)
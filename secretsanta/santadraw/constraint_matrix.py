@@ -0,0 +1,207 @@
+from itertools import compress
+
+from secretsanta.utils.bitset import from_flags
+
+_INVERT_FLAGS = bytes.maketrans(b"\x00\x01", b"\x01\x00")
+
+
+class ConstraintMatrix:
+    """
+    ``ConstraintMatrix`` class is the compiled n x n validity mask of the Santa Draw where the members are indexed
+    by their position. The santa ``i`` can have the candidate ``j`` if the byte at ``i * n + j`` is 1.
+
+    The mask is a flat ``bytearray`` so that it is built in bulk by slice assignments instead of calling
+    ``SantaDraw.is_valid_pairs()`` n^2 times, and the solvers only deal with integer indices.
+    """
+
+    def __init__(self, size: int, mask: bytearray):
+        if len(mask) != size * size:
+            raise ValueError("The mask of {} members must have {} entries.".format(size, size * size))
+        self.size = size
+        self._mask = mask
+
+    @classmethod
+    def from_members(cls, members, budget=None):
+        """
+        Build the mask of ``SantaDraw.is_valid_pairs()`` in bulk from the indices of the members:
+        every pair is valid at first, then the identity diagonal, the last assignees and the immediate family
+        of each santa are cleared.
+        Assignees and immediate family who are not a member of the given members are ignored.
+
+        :param members: A sequence of Person type, e.g., Family
+        :param budget: Optional argument for the budget of the draw, e.g., ``DrawBudget``, which is checked per santa
+        """
+        members = list(members)
+        size = len(members)
+        index = {member: i for i, member in enumerate(members)}
+        mask = bytearray(b"\x01") * (size * size)
+        mask[::size + 1] = bytes(size)  # a person cannot be their own Secret Santa
+        for santa, member in enumerate(members):
+            if budget is not None:
+                budget.check()
+            row = santa * size
+            for person in (*member.get_last_assignees(), *member.get_immediate_family()):
+                candidate = index.get(person)
+                if candidate is not None:
+                    mask[row + candidate] = 0
+        return cls(size, mask)
+
+    @classmethod
+    def from_family(cls, family, budget=None):
+        """
+        Build the mask of ``SantaDraw.is_valid_pairs()`` in bulk from the interned IDs of the family members,
+        which are the indices of the mask, without looking up any ``Person`` objects, see ``from_ids()``.
+
+        :param family: An instance of Family
+        :param budget: Optional argument for the budget of the draw, see ``from_ids()``
+        """
+        size = len(family)
+        return cls.from_ids(size, family.get_households(), (family.get_last_assignee_ids(i) for i in range(size)),
+                            budget)
+
+    @classmethod
+    def from_ids(cls, size: int, households, last_assignee_ids, budget=None):
+        """
+        Build the mask of ``SantaDraw.is_valid_pairs()`` in bulk from the IDs of the members only, e.g., in a worker
+        process which has no ``Person`` objects.
+        The immediate family is cleared household by household, i.e., the block of every household, which includes
+        the identity diagonal of its members, is cleared at once.
+
+        :param size: The number of the members
+        :param households: An iterable of the IDs of the members of every household, see ``Family.get_households()``
+        :param last_assignee_ids: The IDs of the last assignees of each member, see ``Family.get_last_assignee_ids()``
+        :param budget: Optional argument for the budget of the draw, e.g., ``DrawBudget``, which is checked per santa
+        """
+        mask = bytearray(b"\x01") * (size * size)
+        mask[::size + 1] = bytes(size)  # a person cannot be their own Secret Santa even without their household
+        for household in households:
+            for santa in household:
+                if budget is not None:
+                    budget.check()
+                row = santa * size
+                for candidate in household:
+                    mask[row + candidate] = 0
+        for santa, candidates in enumerate(last_assignee_ids):
+            row = santa * size
+            for candidate in candidates:
+                mask[row + candidate] = 0
+        return cls(size, mask)
+
+    @classmethod
+    def from_rule(cls, members, is_valid_pairs, budget=None):
+        """
+        Build the mask by calling ``is_valid_pairs`` for every pair of the members.
+        This is for the rules that cannot be compiled in bulk, e.g., an overridden ``SantaDraw.is_valid_pairs()``.
+
+        :param members: A sequence of Person type, e.g., Family
+        :param is_valid_pairs: The rule of a valid pair
+        :param budget: Optional argument for the budget of the draw, e.g., ``DrawBudget``, which is checked per santa
+        """
+        members = list(members)
+        mask = bytearray()
+        for santa in members:
+            if budget is not None:
+                budget.check()
+            mask.extend(is_valid_pairs(santa, candidate) for candidate in members)
+        return cls(len(members), mask)
+
+    def is_valid(self, santa: int, candidate: int) -> bool:
+        """Return True if the member at ``candidate`` is valid for the member at ``santa``. Otherwise, False."""
+        return self._mask[santa * self.size + candidate] == 1
+
+    def candidates(self, santa: int) -> list:
+        """Return the list of the indices of the valid candidates of the member at ``santa``"""
+        row = santa * self.size
+        return list(compress(range(self.size), self._mask[row:row + self.size]))
+
+    def candidate_lists(self, budget=None) -> list:
+        """
+        Return the list of the valid candidates of each member, see ``candidates()``.
+        The optional ``budget``, e.g., ``DrawBudget``, is checked per member.
+        """
+        return [self.candidates(santa) for santa in _checked(range(self.size), budget)]
+
+    def invalid_santas(self, candidate: int) -> list:
+        """Return the list of the indices of the santas for whom the member at ``candidate`` is not valid"""
+        return list(compress(range(self.size), self._mask[candidate::self.size].translate(_INVERT_FLAGS)))
+
+    def invalid_santa_lists(self, budget=None) -> list:
+        """
+        Return the list of the invalid santas of each member, see ``invalid_santas()``.
+        The optional ``budget``, e.g., ``DrawBudget``, is checked per member.
+        """
+        return [self.invalid_santas(candidate) for candidate in _checked(range(self.size), budget)]
+
+    def candidate_bitset(self, santa: int) -> int:
+        """Return the valid candidates of the member at ``santa`` as a bitset, see ``secretsanta.utils.bitset``"""
+        row = santa * self.size
+        return from_flags(self._mask[row:row + self.size])
+
+    def candidate_bitsets(self, budget=None) -> list:
+        """
+        Return the list of the valid candidates of each member as bitsets, see ``candidate_bitset()``.
+        The optional ``budget``, e.g., ``DrawBudget``, is checked per member.
+        """
+        return [self.candidate_bitset(santa) for santa in _checked(range(self.size), budget)]
+
+
+def _checked(indices, budget):
+    """Yield the indices, checking the budget before each of them if any, see ``DrawBudget.check()``"""
+    if budget is None:
+        yield from indices
+        return
+    for i in indices:
+        budget.check()
+        yield i
+
+
+class ForbiddenPairs:
+    """
+    ``ForbiddenPairs`` class is the sparse form of the constraints of ``SantaDraw.is_valid_pairs()`` where the members
+    are indexed by their position: ``forbidden[i]`` is the set of the invalid candidates of the santa ``i``,
+    i.e., the santa themselves, their household and their last assignees.
+
+    It takes O(n * (h + k)) for the households of at most h members and the last k assignees, instead of the n x n
+    mask of ``ConstraintMatrix``, so that a large family is matched without the quadratic mask, see
+    ``secretsanta.utils.matching.random_complement_matching()``.
+    """
+
+    def __init__(self, size: int, forbidden: list):
+        if len(forbidden) != size:
+            raise ValueError("The forbidden pairs of {} members must have {} sets.".format(size, size))
+        self.size = size
+        self.forbidden = forbidden
+
+    @classmethod
+    def from_family(cls, family):
+        """
+        Build the forbidden pairs from the interned IDs of the family members, see ``from_ids()``.
+
+        :param family: An instance of Family
+        """
+        size = len(family)
+        return cls.from_ids(size, family.get_households(), (family.get_last_assignee_ids(i) for i in range(size)))
+
+    @classmethod
+    def from_ids(cls, size: int, households, last_assignee_ids):
+        """
+        Build the forbidden pairs from the IDs of the members only. The members of a household share the set of the
+        household until they have last assignees.
+
+        :param size: The number of the members
+        :param households: An iterable of the IDs of the members of every household, see ``Family.get_households()``
+        :param last_assignee_ids: The IDs of the last assignees of each member, see ``Family.get_last_assignee_ids()``
+        """
+        forbidden = [frozenset((santa,)) for santa in range(size)]
+        for household in households:
+            household = frozenset(household)
+            for santa in household:
+                forbidden[santa] = household
+        for santa, candidates in enumerate(last_assignee_ids):
+            if candidates:
+                forbidden[santa] = forbidden[santa].union(candidates)
+        return cls(size, forbidden)
+
+    def is_valid(self, santa: int, candidate: int) -> bool:
+        """Return True if the member at ``candidate`` is valid for the member at ``santa``. Otherwise, False."""
+        return candidate not in self.forbidden[santa]
@@ -1,22 +1,282 @@
 import reprlib
+import weakref
+from array import array
+from threading import RLock
 
 from secretsanta.santadraw.person import Person
+from secretsanta.utils.assignment_history import AssignmentHistory, NO_ASSIGNEE
+from secretsanta.utils.disjoint_set import DisjointSet
 
 
 class Family:
     """
-    ``Family`` class is the sequence protocol.
+    ``Family`` class is the sequence protocol, where the position of a member is their ID.
+    Assigning a member to the position of another member swaps the two, e.g., ``random.shuffle(family)``, since a member
+    is at a single position only. Deleting a position moves the last member into it instead of shifting the others.
     ``Family`` class is not hashable since the object is not immutable.
     The members are wrapped in ``Person`` objects with unique names.
+
+    Every member is interned into a dense integer ID, which is their position in the family, by the name.
+    The last assignees of the members are held by the history of the family, see ``get_history()``, which keeps every
+    year as an array of the IDs of the assignees of the members, 4 bytes per member per year, with a configurable
+    window, so that the draw and validation can run on integers instead of comparing ``Person`` objects.
+    The members read and update their last assignees through their families, see ``Person.get_last_assignees()``,
+    so an update of a member who is shared by many families is added to the history of every family.
+    The members take their last assignees back once they leave the family, or once the family is garbage-collected.
+    The members linked as immediate family are in the same household, which is a group of the disjoint sets of the IDs.
+    Thus, whether two members are immediate family is a comparison of their household IDs.
+    The name index makes membership, lookup and deletion O(1) regardless of the size of the family.
+    The IDs are only valid until the members of the family change: a deleted member is replaced by the last member.
+    Each family has its own lock, see ``locked()``, so that the draws of different families never block each other.
     """
 
-    def __init__(self, members=None):
-        if members is None:
-            self._members = []
+    def __init__(self, members=None, history_window=None):
+        """
+        :param members: Optional argument for an iterable of the members, names or instances of Person
+        :param history_window: Optional argument for the number of the years of the last assignees kept.
+            Otherwise, the window of ``members`` if it is a family, or 2, i.e., nobody has the same assignee twice
+            within three years
+        :raises ValueError: If the history window is less than 1
+        """
+        if history_window is None:
+            history_window = members.get_history().window if isinstance(members, Family) else 2
+        self._members = []  # { ID : Person }
+        self._ids = {}  # { name : ID }
+        self._households = DisjointSet()  # the households of the IDs
+        self._history = AssignmentHistory(window=history_window)  # the last assignees of the IDs
+        self._lock = RLock()
+        self._ref = weakref.ref(self)  # the weak reference which the members hold, see ``Person._join_family()``
+        if members is not None:
+            self.__build(members)
+        weakref.finalize(self, _release_members, self._members, self._history, self._ref).atexit = False
+
+    def __intern(self, member) -> int:
+        """Return the ID of the member. If the member is new to this family, the member is appended."""
+        name = str(member)
+        if name not in self._ids:
+            self._ids[name] = len(self._members)
+            self._members.append(member if isinstance(member, Person) else Person(member))
+            self._households.add()
+            self._history.add()
+            self.__adopt(len(self._members) - 1)
+        return self._ids[name]
+
+    def __build(self, members) -> None:
+        """
+        Intern the members and the closure of their immediate family in O(n + links), and join the households.
+        The name index is the visited set, so every member is interned and expanded exactly once
+        while the members appended to ``_members`` are expanded in turn.
+        """
+        ids = self._ids
+        people = self._members
+        for member in members:
+            name = str(member)
+            if name not in ids:
+                ids[name] = len(people)
+                people.append(member if isinstance(member, Person) else Person(member))
+        households = self._households = DisjointSet(len(people))
+        for member_id, m in enumerate(people):  # the immediate family interned here will be expanded in turn
+            for p in m.get_immediate_family():
+                name = str(p)
+                immediate_family_id = ids.get(name)
+                if immediate_family_id is None:
+                    immediate_family_id = ids[name] = households.add()
+                    people.append(p if isinstance(p, Person) else Person(p))
+                households.union(member_id, immediate_family_id)
+        copied = 0
+        if isinstance(members, Family) and members.get_history().window == self._history.window:
+            copied = len(members)  # the members of the family keep their IDs, so the history is copied at once
+            self._history = members.get_history().copy()
+            for member in people[:copied]:
+                member._join_family(self._ref)
+        else:
+            self._history = AssignmentHistory(len(people), self._history.window)
+        for _ in range(len(self._history), len(people)):  # the immediate family interned after the copied members
+            self._history.add()
+        for member_id in range(copied, len(people)):
+            self.__adopt(member_id)
+
+    def __adopt(self, member_id: int) -> None:
+        """Import the last assignees of the member into the history of this family, which holds them from now on"""
+        member = self._members[member_id]
+        last_assignees = member.get_last_assignees()
+        member._join_family(self._ref)
+        if last_assignees:  # the assignees who are not members are not kept, while they still take their years
+            ids = self._ids
+            self._history.set_assignees(member_id, [ids.get(str(person), NO_ASSIGNEE) for person in last_assignees])
+
+    def __release(self, member_id: int) -> None:
+        """Let the member leave the history of this family, and take the last assignees back from the last family"""
+        self._members[member_id]._leave_family(self._ref, self._get_last_assignees_of(self._members[member_id]),
+                                               self._history.window)
+
+    def __swap_members(self, a: int, b: int) -> None:
+        """Swap the members with the IDs ``a`` and ``b`` with their households and history"""
+        members = self._members
+        members[a], members[b] = members[b], members[a]
+        self._ids[str(members[a])], self._ids[str(members[b])] = a, b
+        self._households.swap(a, b)
+        self._history.swap(a, b)
+
+    def __move_member(self, old_id: int, new_id: int) -> None:
+        """Move the member with ``old_id`` to the unused ``new_id``"""
+        member = self._members[old_id]
+        self._members[new_id] = member
+        self._ids[str(member)] = new_id
+
+    def __to_ids(self, persons) -> array:
+        """Return the array of the IDs of the persons. The persons who are not a member of this family are ignored."""
+        ids = self._ids
+        return array("I", [member_id for member_id in map(ids.get, map(str, persons)) if member_id is not None])
+
+    def __split_household(self, member_ids) -> None:
+        """
+        Split the household of the members with ``member_ids``, which a member has just left, into the connected
+        components of the immediate family links of the members, since the member may have been the only link between
+        them. It is O(the household + the links).
+        """
+        if len(member_ids) < 2:
+            return
+        ids = self._ids
+        left = set(member_ids)
+        components = []
+        while left:
+            component = [left.pop()]
+            for member_id in component:  # the members appended here are visited in turn
+                for person in self._members[member_id].get_immediate_family():
+                    immediate_family_id = ids.get(str(person))
+                    if immediate_family_id in left:
+                        left.remove(immediate_family_id)
+                        component.append(immediate_family_id)
+            components.append(component)
+        if len(components) > 1:
+            self._households.split(components)
+
+    def locked(self):
+        """
+        Return the context manager which holds the lock of this family, e.g., ``with family.locked(): ...``.
+        It is reentrant, and it is not taken by the methods of this family themselves.
+        """
+        return self._lock
+
+    def get_member_id(self, member):
+        """Return the ID of the member, which is a name or an instance of Person, or None if not a member"""
+        return self._ids.get(str(member))
+
+    def get(self, member, default=None):
+        """Return the member as an instance of Person by the name or an instance of Person, or ``default``"""
+        member_id = self._ids.get(str(member))
+        return default if member_id is None else self._members[member_id]
+
+    def add(self, member) -> int:
+        """
+        Add the member by the name or an instance of Person in O(1) and return the ID, i.e., the position.
+        If the member is already a member, nothing happens and the ID of the member is returned.
+        Note: the immediate family of the member is not added, see ``add_immediate_family_of_person_with_new_member()``.
+        """
+        return self.__intern(member)
+
+    def remove(self, member) -> None:
+        """
+        Remove the member by the name or an instance of Person in O(1) besides splitting the household of the member,
+        see ``__delitem__()``. It will raise 'ValueError' if not a member.
+        Note: the last member takes the ID, i.e., the position, of the removed member.
+        """
+        member_id = self._ids.get(str(member))
+        if member_id is None:
+            raise ValueError("'{}' is not a member of the family.".format(member))
+        del self[member_id]
+
+    def get_immediate_family_ids(self, member_id: int) -> array:
+        """Getter for the IDs of the household of the member with ``member_id`` except the member"""
+        return array("I", (i for i in self._households.group(member_id) if i != member_id))
+
+    def get_household_id(self, member_id: int) -> int:
+        """Getter for the household ID of the member with ``member_id``. Immediate family have the same household ID."""
+        return self._households.find(member_id)
+
+    def get_household_ids(self, member_id: int) -> array:
+        """Getter for the IDs of the household of the member with ``member_id`` including the member"""
+        return array("I", self._households.group(member_id))
+
+    def get_households(self):
+        """Yield the IDs of the members of every household as an array"""
+        return (array("I", household) for household in self._households.groups())
+
+    def get_largest_household_size(self) -> int:
+        """Getter for the number of the members in the largest household"""
+        return self._households.largest_group_size()
+
+    def get_last_assignee_ids(self, member_id: int) -> array:
+        """Getter for the IDs of the last assignees of the member with ``member_id`` from the oldest"""
+        return self._history.assignees(member_id)
+
+    def get_history(self) -> AssignmentHistory:
+        """
+        Getter for the history of the last assignees of the members by their IDs, e.g., ``was_assigned()``.
+        The history must be updated by ``update_last_assignees_with_pairs()`` only.
+        """
+        return self._history
+
+    def _get_last_assignees_of(self, member) -> tuple:
+        """Return the last assignees of the member from the oldest as ``Person.get_last_assignees()``"""
+        member_id = self._ids.get(str(member))
+        if member_id is None:
+            return ()
+        return tuple(self._members[assignee_id] for assignee_id in self._history.assignees(member_id))
+
+    def _is_last_assignee_of(self, member, person) -> bool:
+        """Return True if the person is a last assignee of the member as ``Person.is_person_in_last_assignees()``"""
+        member_id, person_id = self._ids.get(str(member)), self._ids.get(str(person))
+        return member_id is not None and person_id is not None and self._history.was_assigned(member_id, person_id)
+
+    def _update_last_assignee_of(self, member, person, replace_latest=False) -> None:
+        """Update the last assignees of the member with the person, or None, in this family only, see ``Person``"""
+        assignee_id = NO_ASSIGNEE if person is None else self._ids.get(str(person), NO_ASSIGNEE)
+        self.__update_history({self._ids[str(member)]: assignee_id}, replace_latest)
+
+    def __update_history(self, assignment: dict, replace_latest=False) -> None:
+        """Update the history of this family with the { member ID : assignee ID } ``assignment``"""
+        if replace_latest:
+            self._history.replace_latest(assignment)
+        elif len(assignment) == len(self._members):
+            self._history.assign_all([assignment[member_id] for member_id in range(len(self._members))])
         else:
-            self._members = list({member if isinstance(member, Person) else Person(member) for member in members})
-            for m in self._members:
-                self._members.extend(m.get_immediate_family())
+            self._history.assign(assignment)
+
+    def update_last_assignees_with_pairs(self, pairs: dict, replace_latest=False) -> None:
+        """
+        Update the last assignees of the santas according to the { Secret Santa : Assignee } pairs in the history.
+        The pairs of every member, e.g., a draw, are added as a new year at once.
+        The santas of the pairs must be the members of this family. The assignees who are not members are not kept.
+        The santas who are members of other families as well are updated in the history of every family.
+
+        :param pairs: The { Secret Santa : Assignee } pairs
+        :param replace_latest: Optional argument to replace the latest assignee of each santa instead, e.g., once the
+            latest draw is repaired
+        """
+        ids = self._ids
+        assignment = {}
+        for santa, assignee in pairs.items():
+            santa_id = ids[str(santa)]
+            assignment[santa_id] = ids.get(str(assignee), NO_ASSIGNEE)
+            for family in self._members[santa_id]._get_other_families(self._ref):
+                family._update_last_assignee_of(santa, assignee, replace_latest)
+        self.__update_history(assignment, replace_latest)
+
+    def update_last_assignees_with_ids(self, assignee_ids) -> None:
+        """
+        Add a year of the IDs of the assignees of every member to the history, e.g., a year of a snapshot,
+        where ``assignee_ids[member_id]`` is the ID of the assignee of the member, or NO_ASSIGNEE if none.
+        The members who are members of other families as well are updated in the history of every family.
+
+        :raises ValueError: If the IDs are not of every member
+        """
+        self._history.assign_all(assignee_ids)
+        members = self._members
+        for member, assignee_id in zip(members, assignee_ids):
+            for family in member._get_other_families(self._ref):
+                family._update_last_assignee_of(member, None if assignee_id == NO_ASSIGNEE else members[assignee_id])
 
     def add_immediate_family_of_person_with_new_member(self, person, new_member):
         """
@@ -26,14 +286,15 @@ class Family:
         Family has no ability to know whether an instance of Person has updated their immediate family by themselves.
         Thus, this method must be used if a new member must be in this family.
         """
-        for m in self._members:
-            if m == person:
-                if not isinstance(new_member, Person):
-                    new_member = Person(new_member)
-                self._members.append(new_member)
-                m.add_immediate_family_with(new_member)
-                new_member.add_immediate_family_with(person)
-                break
+        person_id = self.get_member_id(person)
+        if person_id is None:
+            return
+        m = self._members[person_id]
+        new_member_id = self.__intern(new_member)
+        new_member = self._members[new_member_id]
+        m.add_immediate_family_with(new_member)
+        new_member.add_immediate_family_with(m)
+        self._households.union(person_id, new_member_id)
 
     def remove_immediate_family_of_person_with_member(self, person, member):
         """
@@ -43,19 +304,14 @@ class Family:
         Family has no ability to know whether an instance of Person has updated their immediate family by themselves.
         Thus, this method must be used if a member must be removed from this family.
         """
-        valid = False
-        for m in self._members:
-            if m == person:
-                valid = True
-                m.remove_immediate_family_with(member)
-                break
-
-        if valid:
-            for m in self._members:
-                if m == member:
-                    self._members.remove(m)
-                    m.remove_immediate_family_with(person)
-                    break
+        person_id = self.get_member_id(person)
+        if person_id is None:
+            return
+        self._members[person_id].remove_immediate_family_with(member)
+        member_id = self.get_member_id(member)
+        if member_id is not None:
+            self._members[member_id].remove_immediate_family_with(person)
+            del self[member_id]
 
     def __len__(self):
         return len(self._members)
@@ -64,17 +320,65 @@ class Family:
         return self._members[position]
 
     def __setitem__(self, position, value):
-        if isinstance(value, Person):
-            self._members[position] = value
+        """
+        Replace the member at the position, i.e., the member with the ID.
+        The links of the new member are taken from the new member's own immediate family and last assignees.
+        If the new member is already another member of this family, the two members swap their positions, i.e., IDs,
+        and nothing happens if the new member is the member at the position itself.
+        """
+        if value is self._members[position]:
+            return
+        if not isinstance(value, Person):
+            value = Person(value)
+        member_id = self._ids[str(self._members[position])]
+        existing_id = self.get_member_id(value)
+        if existing_id is not None and existing_id != member_id:
+            self.__swap_members(member_id, existing_id)
+            return
+        household_ids = self.get_immediate_family_ids(member_id)
+        self._households.separate(member_id)
+        self.__release(member_id)
+        if str(value) == str(self._members[member_id]):
+            self._history.set_assignees(member_id, ())
         else:
-            self._members[position] = Person(value)
+            self._history.forget(member_id)
+        del self._ids[str(self._members[member_id])]
+        self._ids[str(value)] = member_id
+        self._members[member_id] = value
+        self.__split_household(household_ids)
+        for immediate_family_id in self.__to_ids(value.get_immediate_family()):
+            self._households.union(member_id, immediate_family_id)
+        self.__adopt(member_id)
 
     def __delitem__(self, position):
-        del self._members[position]
+        """
+        Delete the member at the position in O(1), as the last member takes the position, i.e., the ID.
+        The household of the member is split if the member was the only link between the others of the household.
+        Slices are deleted from the last position so that the positions to delete are not taken.
+        """
+        if isinstance(position, slice):
+            for member_id in sorted(range(*position.indices(len(self))), reverse=True):
+                del self[member_id]
+            return
+        member_id = self._ids[str(self._members[position])]
+        last_id = len(self._members) - 1
+        household_ids = [member_id if i == last_id else i for i in self.get_immediate_family_ids(member_id)]
+        self._households.swap_remove(member_id)
+        self.__release(member_id)
+        self._history.swap_remove(member_id)
+        del self._ids[str(self._members[member_id])]
+        if member_id != last_id:
+            self.__move_member(last_id, member_id)
+        self._members.pop()
+        self.__split_household(household_ids)
 
     def __iter__(self):
         return (member for member in self._members)
 
+    def __contains__(self, member):
+        """Return True if the member, a name or an instance of Person, is in this family in O(1)"""
+        return str(member) in self._ids
+
     def __repr__(self):
         class_name = type(self).__name__
         if not self._members:
@@ -84,5 +388,16 @@ class Family:
             return "{}({})".format(class_name, members)
 
     def __eq__(self, other):
-        """Based on the assumption, this logic makes sense"""
-        return len(self) == len(other) and all(a in other and b in self for a, b in zip(self, other))
+        """
+        Based on the assumption, this logic makes sense: the families are the same if the names of the members are
+        the same regardless of the order. The names are compared as hash sets in O(n).
+        """
+        if isinstance(other, Family):
+            return self._ids.keys() == other._ids.keys()
+        return len(self) == len(other) and self._ids.keys() == set(map(str, other))
+
+
+def _release_members(members: list, history: AssignmentHistory, family_ref) -> None:
+    """Let the members of a garbage-collected family take their last assignees back, see ``Person._leave_family()``"""
+    for member_id, member in enumerate(members):
+        member._leave_family(family_ref, [members[i] for i in history.assignees(member_id)], history.window)
@@ -0,0 +1,201 @@
+import mmap
+import random
+import struct
+import sys
+from array import array
+
+from secretsanta.santadraw.budget import DrawBudget
+from secretsanta.santadraw.family import Family
+from secretsanta.santadraw.santa_draw import search_assignment_of_ids
+from secretsanta.utils.assignment_history import NO_ASSIGNEE
+
+SNAPSHOT_VERSION = 1
+_MAGIC = b"SSFS"
+# magic, version, the number of the members, the history window, the number of the bytes of the names
+_HEADER = struct.Struct("<4sIIIQ")
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def write_snapshot(family_members: Family, path) -> None:
+    """
+    Write the family to the file of the path in the binary snapshot format, which ``FamilySnapshot`` maps.
+    The format is the header followed by little-endian arrays of 4-byte unsigned integers in this order:
+
+    * the offsets of the names of the members in the names, one more than the members
+    * the household ID of each member, which is the smallest ID of the members of the household
+    * the assignee ID of each member in every year of the history from the oldest, NO_ASSIGNEE if none
+
+    and the names of the members encoded in UTF-8 at the end.
+
+    :param family_members: An instance of Family
+    :param path: The path of the file to write
+    :raises ValueError: If the names take 4 GiB or more
+    """
+    with family_members.locked():
+        size = len(family_members)
+        history = family_members.get_history()
+        names = [str(member).encode("utf-8") for member in family_members]
+        offsets = array("I", [0])
+        total = 0
+        for name in names:
+            total += len(name)
+            if total > NO_ASSIGNEE:
+                raise ValueError("The names of the family must take less than 4 GiB.")
+            offsets.append(total)
+        household_ids = array("I", bytes(4 * size))
+        for household in family_members.get_households():  # the group IDs of the family may not be member IDs
+            household_id = min(household)
+            for member_id in household:
+                household_ids[member_id] = household_id
+        sections = [offsets, household_ids]
+        sections.extend(history.year(year) for year in range(history.window))
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, SNAPSHOT_VERSION, size, history.window, total))
+        for section in sections:
+            if not _LITTLE_ENDIAN:
+                section.byteswap()
+            section.tofile(f)
+        for name in names:
+            f.write(name)
+
+
+class FamilySnapshot:
+    """
+    ``FamilySnapshot`` class maps a snapshot file written by ``write_snapshot()`` read-only by ``mmap``.
+    The household IDs and the years of the history are zero-copy ``memoryview`` of 4-byte unsigned integers on the
+    mapped file, so the processes which map the same file share the page cache instead of each holding a copy,
+    and nothing is parsed nor any ``Person`` object is created until it is asked for, see ``draw_snapshot()``.
+    The members are indexed by their IDs in the family which was written.
+
+    The views must be released before the snapshot is closed, since a mapped file cannot be closed while exported.
+    On a big-endian machine, the arrays are copied and swapped instead of mapped.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: The path of the snapshot file
+        :raises ValueError: If the file is not a snapshot or its version is not supported or it is truncated
+        """
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.__map()
+        except ValueError:
+            self._mmap.close()
+            raise
+
+    def __map(self) -> None:
+        """Map the sections of the file after checking the header"""
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError("The file is not a family snapshot.")
+        magic, version, size, window, names_size = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC:
+            raise ValueError("The file is not a family snapshot.")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError("The version {} of the snapshot is not supported.".format(version))
+        names_start = _HEADER.size + 4 * (size + 1 + size * (1 + window))
+        if len(self._mmap) != names_start + names_size:
+            raise ValueError("The family snapshot is truncated.")
+        self._size = size
+        self._buffer = memoryview(self._mmap)
+        self._views = []
+        start = _HEADER.size
+        for length in [size + 1, size] + [size] * window:
+            self._views.append(self.__view(start, length))
+            start += 4 * length
+        self._names = self._buffer[names_start:]
+        self._offsets, self._household_ids, *self._years = self._views
+
+    def __view(self, start: int, length: int):
+        """Return the view of the ``length`` integers from the byte ``start``"""
+        view = self._buffer[start:start + 4 * length].cast("I")
+        if not _LITTLE_ENDIAN:
+            view = array("I", view)
+            view.byteswap()
+        return view
+
+    def close(self) -> None:
+        """Release the views of this snapshot and unmap the file"""
+        for view in (*self._views, self._names, self._buffer):
+            if isinstance(view, memoryview):
+                view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def window(self) -> int:
+        """The number of the years of the history"""
+        return len(self._years)
+
+    @property
+    def household_ids(self):
+        """The view of the household ID of each member. The members of a household have the same ID."""
+        return self._household_ids
+
+    def year(self, year: int):
+        """Return the view of the assignee ID of each member in the year from the oldest year 0, NO_ASSIGNEE if none"""
+        return self._years[year]
+
+    def name(self, member_id: int) -> str:
+        """Return the name of the member with ``member_id``"""
+        return str(self._names[self._offsets[member_id]:self._offsets[member_id + 1]], "utf-8")
+
+    def last_assignee_ids(self, member_id: int) -> array:
+        """Return the IDs of the last assignees of the member from the oldest as ``Family.get_last_assignee_ids()``"""
+        return array("I", [year[member_id] for year in self._years if year[member_id] != NO_ASSIGNEE])
+
+    def households(self) -> list:
+        """Return the IDs of the members of every household as an array as ``Family.get_households()``"""
+        households = {}
+        for member_id, household_id in enumerate(self._household_ids):
+            households.setdefault(household_id, array("I")).append(member_id)
+        return list(households.values())
+
+    def to_family(self) -> Family:
+        """
+        Return the family of this snapshot with the same IDs and history.
+        The immediate family of the members are linked to the first member of their household, so the households
+        are the same while the links in between may differ from the family which was written.
+        """
+        family = Family((self.name(member_id) for member_id in range(self._size)), history_window=self.window)
+        for household in self.households():
+            for member_id in household[1:]:
+                family.add_immediate_family_of_person_with_new_member(family[household[0]], family[member_id])
+        for year in self._years:
+            family.update_last_assignees_with_ids(year)
+        return family
+
+    def __len__(self):
+        return self._size
+
+
+def draw_snapshot(snapshot: FamilySnapshot, random_seed=None, strategy="backtracking", deadline=None, max_nodes=None,
+                  cancellation=None) -> array:
+    """
+    Draw the Secret Santa pairs of the family of the snapshot as ``draw_secret_santa_pairs()`` does,
+    directly from the mapped arrays without creating ``Person`` objects, e.g., in a worker process.
+    Return the ID of the assignee of each santa as ``array('I')``, whose names are ``snapshot.name()``.
+    The snapshot is read-only, so the pairs are not added to its history.
+    The "matching" strategy is drawn from the forbidden pairs only, see ``ForbiddenPairs``, so that a large snapshot
+    is drawn without the n x n mask of every pair.
+
+    :param snapshot: An instance of FamilySnapshot
+    :param random_seed: Optional argument to seed the random stream of this draw for debugging purpose
+    :param strategy: Optional argument for the search strategy, "backtracking" (default) or "matching"
+    :param deadline: Optional argument for the number of the seconds that the draw can take
+    :param max_nodes: Optional argument for the maximum number of the nodes that the search can visit
+    :param cancellation: Optional argument for an instance of ``CancellationToken`` to stop the draw
+    :raises ValueError: If the number of family members is less than 2 or there is no possible pairs
+        or the strategy is unknown or the budget is negative
+    :raises DrawTimeout: If the draw runs out of the budget, or 'DrawCancelled' if the draw is cancelled
+    """
+    budget = DrawBudget.of(deadline, max_nodes, cancellation)
+    size = len(snapshot)
+    last_assignee_ids = (snapshot.last_assignee_ids(member_id) for member_id in range(size))
+    return array("I", search_assignment_of_ids(size, snapshot.households(), last_assignee_ids, strategy,
+                                               random.Random(random_seed), budget))
@@ -0,0 +1,169 @@
+import sqlite3
+
+from secretsanta.santadraw.family import Family
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS members (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS household_links (
+    member INTEGER NOT NULL REFERENCES members (id) ON DELETE CASCADE,
+    immediate_family INTEGER NOT NULL REFERENCES members (id) ON DELETE CASCADE,
+    PRIMARY KEY (member, immediate_family)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS assignments (
+    year INTEGER NOT NULL,
+    santa INTEGER NOT NULL REFERENCES members (id) ON DELETE CASCADE,
+    assignee INTEGER NOT NULL REFERENCES members (id) ON DELETE CASCADE,
+    PRIMARY KEY (year, santa)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS assignments_santa_year ON assignments (santa, year);
+CREATE INDEX IF NOT EXISTS assignments_assignee_year ON assignments (assignee, year);
+"""
+
+# The members, the links and the assignments of the last years in a single query, in this order, see ``load_family()``
+_HYDRATE = """
+SELECT 0, id, name, NULL FROM members
+UNION ALL
+SELECT 1, member, immediate_family, NULL FROM household_links
+UNION ALL
+SELECT 2, santa, assignee, year FROM assignments
+WHERE year IN (SELECT DISTINCT year FROM assignments ORDER BY year DESC LIMIT ?)
+ORDER BY 1, 4, 2
+"""
+
+
+class FamilyStore:
+    """
+    ``FamilyStore`` class persists a family and the pairs of every year in a SQLite database with ``sqlite3``,
+    so that the history survives a restart instead of being replayed by ``Person.update_last_assignees_with()``.
+
+    The members are stored by their names as text, so the members of a loaded family are named by strings.
+    The links of immediate family are stored once per pair of the members, and the assignments are stored per year,
+    indexed by (santa, year) and (assignee, year) for the queries of a member, see ``get_assignees()``.
+    The whole history is kept in the database, while a loaded family holds the years of its history window only.
+    The writes are bulk ``executemany()`` calls in a transaction each.
+    A store must be used by the thread which opened it, as the connection of ``sqlite3``.
+    """
+
+    def __init__(self, database=":memory:"):
+        """
+        :param database: Optional argument for the path of the database file. Otherwise, an in-memory database
+        """
+        self._connection = sqlite3.connect(database)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the database. The store cannot be used afterwards."""
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def save_family(self, family_members) -> None:
+        """
+        Save the members of the family and their links of immediate family, which replace the saved ones.
+        The assignments of the saved members are kept, while the members who left the family are deleted with theirs.
+
+        :param family_members: This argument has to be an iterable of Person type, e.g., Family
+        """
+        if not isinstance(family_members, Family):
+            family_members = Family(family_members)
+        with self._connection as connection:
+            connection.execute("CREATE TEMP TABLE IF NOT EXISTS roster (name TEXT PRIMARY KEY) WITHOUT ROWID")
+            connection.execute("DELETE FROM roster")
+            connection.executemany("INSERT INTO roster VALUES (?)", ((str(member),) for member in family_members))
+            connection.execute("DELETE FROM members WHERE name NOT IN roster")
+            connection.executemany("INSERT OR IGNORE INTO members (name) VALUES (?)",
+                                   ((str(member),) for member in family_members))
+            connection.execute("DELETE FROM household_links")
+            connection.executemany(
+                "INSERT OR IGNORE INTO household_links SELECT m.id, i.id FROM members m, members i "
+                "WHERE m.name = ? AND i.name = ?",
+                ((str(member), str(person)) for member in family_members
+                 for person in member.get_immediate_family() if str(member) < str(person)))
+            connection.execute("DELETE FROM roster")
+
+    def save_pairs(self, year: int, pairs: dict) -> None:
+        """
+        Save the { Secret Santa : Assignee } pairs of the year, e.g., ``SantaDraw.get_santa_pairs()``,
+        which replace the saved pairs of the year. The pairs of the santas or the assignees who are not saved members
+        are ignored, as ``Family.update_last_assignees_with_pairs()`` does not keep them.
+
+        :param year: The year of the pairs, e.g., 2020
+        :param pairs: The { Secret Santa : Assignee } pairs
+        """
+        with self._connection as connection:
+            ids = dict(connection.execute("SELECT name, id FROM members"))
+            connection.execute("DELETE FROM assignments WHERE year = ?", (year,))
+            connection.executemany("INSERT INTO assignments VALUES (?, ?, ?)",
+                                   ((year, santa_id, assignee_id) for santa_id, assignee_id in
+                                    ((ids.get(str(santa)), ids.get(str(assignee))) for santa, assignee in pairs.items())
+                                    if santa_id is not None and assignee_id is not None))
+
+    def load_family(self, history_window=None) -> Family:
+        """
+        Return the saved family whose history holds the pairs of the last saved years in the window, oldest first,
+        by a single query. The members are in the order they were first saved.
+
+        :param history_window: Optional argument for the window of the history of the family, 2 by default
+        :raises ValueError: If the history window is less than 1
+        """
+        family = Family(history_window=history_window)
+        window = family.get_history().window
+        names = {}  # { member ID in the database : name }
+        members = []
+        links = []
+        years = []  # [(year, pairs)] from the oldest
+        for kind, first, second, year in self._connection.execute(_HYDRATE, (window,)):
+            if kind == 0:
+                names[first] = second
+                members.append(second)
+            elif kind == 1:
+                links.append((names[first], names[second]))
+            else:
+                if not years or years[-1][0] != year:
+                    years.append((year, {}))
+                years[-1][1][names[first]] = names[second]
+        family = Family(members, history_window=window)
+        for member, person in links:
+            family.add_immediate_family_of_person_with_new_member(member, person)
+        for _, pairs in years:
+            family.update_last_assignees_with_pairs(pairs)
+        return family
+
+    def get_years(self) -> list:
+        """Return the saved years in order"""
+        return [year for year, in self._connection.execute("SELECT DISTINCT year FROM assignments ORDER BY year")]
+
+    def get_assignees(self, santa, since=None) -> list:
+        """
+        Return the [(year, assignee)] of the santa in order of the years by the (santa, year) index.
+
+        :param santa: The santa, a name or an instance of Person
+        :param since: Optional argument for the first year to return. Otherwise, every saved year
+        """
+        return self._connection.execute(
+            "SELECT year, a.name FROM assignments JOIN members s ON s.id = santa JOIN members a ON a.id = assignee "
+            "WHERE s.name = ? AND year >= ? ORDER BY year", (str(santa), _first_year(since))).fetchall()
+
+    def get_santas(self, assignee, since=None) -> list:
+        """
+        Return the [(year, santa)] of the assignee in order of the years by the (assignee, year) index.
+
+        :param assignee: The assignee, a name or an instance of Person
+        :param since: Optional argument for the first year to return. Otherwise, every saved year
+        """
+        return self._connection.execute(
+            "SELECT year, s.name FROM assignments JOIN members a ON a.id = assignee JOIN members s ON s.id = santa "
+            "WHERE a.name = ? AND year >= ? ORDER BY year", (str(assignee), _first_year(since))).fetchall()
+
+
+def _first_year(since) -> int:
+    """Return the first year of a query, where None is every year"""
+    return -(1 << 63) if since is None else since
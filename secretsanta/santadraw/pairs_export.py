@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+from itertools import islice
+
+EXPORT_FORMATS = ("csv", "jsonl")
+_BUFFER_SIZE = 1 << 20  # the bytes buffered before a write to the file
+
+
+def iter_pair_chunks(santa_pairs, chunksize=1000):
+    """
+    Yield the (Secret Santa, Assignee) records of the pairs lazily in lists of at most ``chunksize`` records.
+
+    :param santa_pairs: The { Secret Santa : Assignee } pairs, e.g., ``SantaDraw.get_santa_pairs()``
+    :param chunksize: Optional argument for the number of the records per chunk
+    :raises ValueError: If ``chunksize`` is less than 1
+    """
+    if chunksize < 1:
+        raise ValueError("The chunk size must be at least 1.")
+    return _iter_pair_chunks(santa_pairs, chunksize)
+
+
+def _iter_pair_chunks(santa_pairs, chunksize):
+    """The generator of ``iter_pair_chunks()``, which is separated so that the arguments are validated at the call"""
+    records = iter(santa_pairs.items())
+    while True:
+        chunk = list(islice(records, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def export_pairs(santa_pairs, target, export_format=None, chunksize=1000) -> int:
+    """
+    Write the (Secret Santa, Assignee) records of the pairs chunk by chunk to the target, e.g., the reveal file,
+    and return the number of the records written. Only a chunk of the records is encoded in memory at once.
+
+    * CSV: the header ``santa,assignee`` and a line of the names of every record.
+    * JSONL: an object of ``santa`` and ``assignee`` of every record per line.
+
+    The names are encoded in UTF-8. A path is written through a buffer of ``_BUFFER_SIZE`` bytes,
+    and a binary sink is given an encoded chunk per write, so the sink is not flushed nor closed.
+
+    :param santa_pairs: The { Secret Santa : Assignee } pairs, e.g., ``SantaDraw.get_santa_pairs()``
+    :param target: The path of the file to write, or a binary sink which has ``write()``, e.g., a socket file
+    :param export_format: Optional argument for the format, "csv" or "jsonl". Otherwise, the extension of the path
+    :param chunksize: Optional argument for the number of the records per chunk
+    :raises ValueError: If the format is unknown or ``chunksize`` is less than 1
+    """
+    if export_format is None:
+        export_format = str(getattr(target, "name", target)).rpartition(".")[2].lower()
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError("Unknown export format '{}'. It must be one of {}.".format(export_format,
+                                                                                  list(EXPORT_FORMATS)))
+    chunks = iter_pair_chunks(santa_pairs, chunksize)
+    if not hasattr(target, "write"):
+        with open(target, "wb", buffering=_BUFFER_SIZE) as f:
+            return _write_chunks(chunks, f, export_format)
+    return _write_chunks(chunks, target, export_format)
+
+
+def _write_chunks(chunks, sink, export_format) -> int:
+    """Encode every chunk of the records in the format and write it to the binary sink"""
+    count = 0
+    if export_format == "csv":
+        sink.write(b"santa,assignee\r\n")
+    for chunk in chunks:
+        if export_format == "csv":
+            text = io.StringIO()
+            csv.writer(text).writerows((str(santa), str(assignee)) for santa, assignee in chunk)
+            data = text.getvalue()
+        else:
+            data = "".join(json.dumps({"santa": str(santa), "assignee": str(assignee)}, ensure_ascii=False) + "\n"
+                           for santa, assignee in chunk)
+        sink.write(data.encode("utf-8"))
+        count += len(chunk)
+    return count
@@ -10,23 +10,105 @@ class Person:
 
     To allow the same name people, I could have introduced personal ID by a class attribute, e.g., ``count``.
     In that case, __hash__ and __eq__ methods need to be updated accordingly.
+
+    ``Person`` is slotted without ``__dict__`` to keep large rosters compact. The name as a string and the hash are
+    computed once, and the last assignees and the immediate family are only allocated when the first one is added.
+    Once the person is a member of a family, the last assignees are held by the history of the family instead,
+    see ``Family.get_history()``, and the methods of the last assignees read and update the family, or every family of
+    the person. The person only refers to the families weakly, and takes the last assignees back once the person leaves
+    the last family.
     """
 
+    __slots__ = ("__name", "__str", "__hash", "__last_assignees", "__immediate_family")
+
     def __init__(self, name, immediate_family=None):
         self.__name = name
-        self._last_assignees = deque(maxlen=2)  # only holds last two assignees
+        self.__str = str(name)
+        self.__hash = hash(name)
+        # None, the queue of the last two assignees once allocated, or the weak reference of the family which holds
+        # the last assignees, or a tuple of them if the person is a member of many families
+        self.__last_assignees = None
         if immediate_family is None:
-            self._immediate_family = set()
+            self.__immediate_family = None
+        else:
+            self.__immediate_family = {member if isinstance(member, Person) else Person(member) for member in
+                                       immediate_family}
+
+    @property
+    def _last_assignees(self):
+        """
+        The queue of the last two assignees, which is allocated at the first access.
+        If the families hold the last assignees, this is a copy of them.
+        """
+        if self.__last_assignees is None:
+            self.__last_assignees = deque(maxlen=2)
+        if not isinstance(self.__last_assignees, deque):
+            return deque(self.get_last_assignees())
+        return self.__last_assignees
+
+    def _get_families(self) -> list:
+        """Return the live families which hold the last assignees of this person"""
+        family_refs = self.__last_assignees
+        if family_refs is None or isinstance(family_refs, deque):
+            return []
+        if not isinstance(family_refs, tuple):
+            family_refs = (family_refs,)
+        return [family for family in (family_ref() for family_ref in family_refs) if family is not None]
+
+    def _get_other_families(self, family_ref) -> list:
+        """
+        Return the live families of this person except the family of ``family_ref``,
+        which is an empty list in O(1) if the person is a member of the family only
+        """
+        if self.__last_assignees is family_ref:
+            return []
+        family = family_ref()
+        return [other for other in self._get_families() if other is not family]
+
+    def _join_family(self, family_ref) -> None:
+        """
+        Let the family of ``family_ref`` hold the last assignees of this person as well from now on,
+        once they are imported into the family.
+        """
+        family_refs = self.__last_assignees
+        if family_refs is None or isinstance(family_refs, deque):
+            self.__last_assignees = family_ref
         else:
-            self._immediate_family = {member if isinstance(member, Person) else Person(member) for member in
-                                      immediate_family}
+            family_refs = family_refs if isinstance(family_refs, tuple) else (family_refs,)
+            self.__last_assignees = (*(ref for ref in family_refs if ref() is not None), family_ref)
+
+    def _leave_family(self, family_ref, last_assignees, window: int) -> None:
+        """
+        Let the family of ``family_ref`` no longer hold the last assignees of this person, e.g., once this person
+        leaves the family or the family is garbage-collected. If it was the last family of this person, the person
+        takes back ``last_assignees``, the last assignees in the family, as a queue of the window of the family.
+        """
+        family_refs = self.__last_assignees
+        if family_refs is family_ref:
+            self.__last_assignees = deque(last_assignees, maxlen=window)
+            return
+        if family_refs is None or isinstance(family_refs, deque):
+            return
+        family_refs = family_refs if isinstance(family_refs, tuple) else (family_refs,)
+        family_refs = tuple(ref for ref in family_refs if ref is not family_ref and ref() is not None)
+        if not family_refs:
+            self.__last_assignees = deque(last_assignees, maxlen=window)
+        else:
+            self.__last_assignees = family_refs[0] if len(family_refs) == 1 else family_refs
+
+    @property
+    def _immediate_family(self):
+        """The set of the immediate family, which is allocated at the first access"""
+        if self.__immediate_family is None:
+            self.__immediate_family = set()
+        return self.__immediate_family
 
     def is_person_in_immediate_family(self, person) -> bool:
         """
         Return True if the person is in the immediate family, ``_immediate_family``, of this person.
         Otherwise, return False.
         """
-        return person in self._immediate_family
+        return self.__immediate_family is not None and person in self.__immediate_family
 
     def add_immediate_family_with(self, person) -> None:
         """Add the person in the immediate family, ``_immediate_family``, as an instance of ``Person``"""
@@ -40,29 +122,70 @@ class Person:
         Remove the person from the immediate family, ``_immediate_family``.
         If the person does not exist, nothing happens (no exception).
         """
+        if self.__immediate_family is None:
+            return
         if isinstance(person, Person):
-            self._immediate_family.discard(person)
+            self.__immediate_family.discard(person)
         else:
-            self._immediate_family.discard(Person(person))
+            self.__immediate_family.discard(Person(person))
 
     def get_immediate_family(self):
         """Getter for the immediate family. Return a copy of ``self._immediate_family``"""
-        return set(self._immediate_family)
+        return set() if self.__immediate_family is None else set(self.__immediate_family)
 
     def is_person_in_last_assignees(self, person) -> bool:
         """
         Return True if the person is in ``self._last_assignees``.
-        In other words, return True if the person was this person's assignee in the last two times.
+        In other words, return True if the person was this person's assignee in the last two times by default,
+        or within the history window of a family of this person, which is an O(window) lookup of the IDs.
         Otherwise, return False.
         """
-        return person in self._last_assignees
+        last_assignees = self.__last_assignees
+        if last_assignees is None:
+            return False
+        if isinstance(last_assignees, deque):
+            return person in last_assignees
+        return any(family._is_last_assignee_of(self, person) for family in self._get_families())
+
+    def get_last_assignees(self):
+        """
+        Getter for the last assignees. Return a copy of ``self._last_assignees`` as a tuple from the oldest.
+        Each family keeps the last assignees who are its members within its window, so the last assignees are of the
+        family which keeps the most of them.
+        """
+        last_assignees = self.__last_assignees
+        if last_assignees is None:
+            return ()
+        if isinstance(last_assignees, deque):
+            return tuple(last_assignees)
+        return max((family._get_last_assignees_of(self) for family in self._get_families()), key=len, default=())
 
     def update_last_assignees_with(self, person) -> None:
         """
-        Add the person in ``self._last_assignees``.
+        Add the person in ``self._last_assignees``, or in the history of every family of this person.
         In other words, update the queue with the person once the person is assigned to this person.
         """
-        self._last_assignees.append(person)
+        families = self._get_families()
+        if not families:
+            self._last_assignees.append(person)
+        for family in families:
+            family._update_last_assignee_of(self, person)
+
+    def replace_latest_assignee_with(self, person) -> None:
+        """
+        Replace the latest assignee in ``self._last_assignees`` with the person, e.g., once the latest draw is repaired.
+        If there is no assignee yet, the person is added.
+        """
+        families = self._get_families()
+        for family in families:
+            family._update_last_assignee_of(self, person, replace_latest=True)
+        if families:
+            return
+        last_assignees = self._last_assignees
+        if last_assignees:
+            last_assignees[-1] = person
+        else:
+            last_assignees.append(person)
 
     @property
     def name(self):
@@ -73,11 +196,15 @@ class Person:
         return "{}({})".format(type(self).__name__, repr(self.name))
 
     def __str__(self):
-        return str(self.name)
+        return self.__str
 
     def __hash__(self):
-        return hash(self.name)
+        return self.__hash
 
     def __eq__(self, other):
-        """``Person`` compares the name of self and str(other) only"""
-        return str(self) == str(other)
+        """``Person`` compares the name of self and str(other) only, and the identity first as the fast path"""
+        if self is other:
+            return True
+        if isinstance(other, Person):
+            return self.__str == other.__str
+        return self.__str == str(other)
@@ -0,0 +1,175 @@
+import random
+
+from secretsanta.santadraw.budget import DrawBudget
+from secretsanta.santadraw.constraint_matrix import ConstraintMatrix
+from secretsanta.santadraw.family import Family
+from secretsanta.utils.bitset import lowest_index, popcount
+from secretsanta.utils.matching import random_maximum_matching, UNMATCHED
+
+_PLAN_RESTARTS = 8  # the number of the random tries of the first years before the exhaustive search
+
+
+def plan_years(family_members, years: int, random_seed=None, deadline=None, max_nodes=None, cancellation=None):
+    """
+    Plan the Secret Santa pairs of the next ``years`` years jointly, so that no santa has the same assignee twice
+    within the window of the history of the family and this year, i.e., three years by default, across the whole
+    schedule, starting from the last assignees of the members, see ``Family.get_history()``.
+    Unlike the draws year by year, which may come to a dead end, e.g., a family of three members in the third year,
+    the plan fails only if there is no schedule at all.
+
+    The rule of the draw is the same as ``SantaDraw.is_valid_pairs()``: the members of a household are never paired.
+    Only the first years up to the window and this year can come to a dead end: once as many consecutive years are
+    planned, the pairs of the earliest of them are always valid again in the following year. Thus, the first years are
+    searched jointly, by a few random tries of a random matching per year and then an exhaustive search of the years
+    at once, and every later year is a random matching avoiding the years in the window before, which always exists.
+    Planning is O(years * E * sqrt(V)) after the first years, without enumerating the products of the years.
+
+    The family is not changed by the plan: apply each year by ``Family.update_last_assignees_with_pairs()``
+    once it is drawn.
+
+    :param family_members: This argument has to be an iterable of Person type, e.g., Family
+    :param years: The number of the years to plan, at least 1
+    :param random_seed: Optional argument to seed the random stream of the plan for debugging purpose
+    :param deadline: Optional argument for the number of the seconds that the plan can take
+    :param max_nodes: Optional argument for the maximum number of the nodes that the search can visit
+    :param cancellation: Optional argument for an instance of ``CancellationToken`` to stop the plan
+    :raises ValueError: If the number of family members is less than 2 or the number of the years is less than 1
+        or there is no possible schedule or the budget is negative
+    :raises DrawTimeout: If the plan runs out of the budget, or 'DrawCancelled' if the plan is cancelled
+    """
+    budget = DrawBudget.of(deadline, max_nodes, cancellation)
+    if years < 1:
+        raise ValueError("The number of the years to plan must be at least 1.")
+    if len(family_members) < 2:
+        raise ValueError("The minimum number of the family for the draw is 2.")
+    if not isinstance(family_members, Family):
+        family_members = Family(family_members)
+    rng = random.Random(random_seed)
+    with family_members.locked():
+        size = len(family_members)
+        members = list(family_members)
+        if family_members.get_largest_household_size() * 2 > size:
+            raise ValueError("This family is invalid to generate secret santa pairs according to the rules.")
+        households = [household for household in family_members.get_households() if len(household) > 1]
+        rules = ConstraintMatrix.from_ids(size, households, [()] * size, budget)  # without the last assignees
+        window = family_members.get_history().window
+        history = [list(family_members.get_last_assignee_ids(santa)) for santa in range(size)]
+
+    candidates = rules.candidate_lists(budget)
+    first_years = _plan_first_years(rules, candidates, history, window, min(years, window + 1), rng, budget)
+    if first_years is None:
+        raise ValueError("There is no schedule of {} years for this family according to the rules.".format(years))
+    schedule = first_years
+    for _ in range(len(first_years), years):
+        assignment = _draw_year(candidates, history, schedule, window, rng, budget)
+        if assignment is None:  # the earliest year of the window before is always valid, see above
+            raise ValueError("There is no schedule of {} years for this family according to the rules.".format(years))
+        schedule.append(assignment)
+    return [{members[santa]: members[assignee] for santa, assignee in enumerate(assignment)}
+            for assignment in schedule]
+
+
+def _previous_assignees(history, schedule, santa: int, window: int) -> list:
+    """Return the assignees of the santa in the window of the years before the next year of the schedule"""
+    previous = history[santa] + [assignment[santa] for assignment in schedule[-window:]]
+    return previous[-window:]
+
+
+def _draw_year(candidates, history, schedule, window: int, rng, budget):
+    """
+    Return a random assignment of the next year of the schedule where every santa avoids their assignees of the
+    window of the years before, or None if there is none.
+    """
+    year = []
+    for santa, santa_candidates in enumerate(candidates):
+        previous = _previous_assignees(history, schedule, santa, window)
+        year.append([candidate for candidate in santa_candidates if candidate not in previous])
+    assignment = random_maximum_matching(year, len(year), rng, budget)
+    return None if UNMATCHED in assignment else assignment
+
+
+def _plan_first_years(rules: ConstraintMatrix, candidates, history, window: int, years: int, rng, budget):
+    """
+    Return the assignments of the first ``years`` years, at most ``window + 1``, of the schedule, or None if there are
+    none.
+    A few random tries year by year are enough for most families, otherwise the years are searched at once.
+    """
+    for _ in range(_PLAN_RESTARTS):
+        schedule = []
+        while len(schedule) < years:
+            assignment = _draw_year(candidates, history, schedule, window, rng, budget)
+            if assignment is None:
+                break
+            schedule.append(assignment)
+        else:
+            return schedule
+        if not schedule:
+            return None  # the first year alone is impossible
+    bitsets = rules.candidate_bitsets()
+    domains = []
+    for year in range(years):
+        domain = []
+        kept = window - year  # the number of the last assignees within the window of this year
+        for santa, bits in enumerate(bitsets):
+            for previous in (history[santa][-kept:] if kept > 0 else ()):
+                bits &= ~(1 << previous)
+            domain.append(bits)
+        domains.append(domain)
+    return _backtrack_years(domains, rng, budget)
+
+
+def _backtrack_years(domains, rng, budget=None):
+    """
+    Backtracking search for the assignments of a few years at once, where ``domains[year][santa]`` is the bitset of
+    the valid assignees of the santa in the year, see ``secretsanta.utils.bitset``.
+    Every year is a distinct assignee of every santa, and every santa has distinct assignees over the years.
+    Return the list of the assignee of each santa of every year, or None if there is no possible schedule.
+
+    The cell of a santa in a year with the fewest assignees left is assigned next, ties broken by a random order,
+    and the assignees are tried in a random order. The search is iterative as ``_backtrack_assignment()`` is.
+    """
+    years, size = len(domains), len(domains[0])
+    cells = [(year, santa) for year in range(years) for santa in range(size)]
+    rng.shuffle(cells)
+    schedule = [[None] * size for _ in range(years)]
+    taken_in_year = [0] * years  # { year : the bitset of the assignees taken in the year }
+    taken_by_santa = [0] * size  # { santa : the bitset of the assignees of the santa over the years }
+    stack = []  # [cell, assignees not tried yet] of each assigned cell
+
+    while len(stack) < len(cells):
+        if budget is not None:
+            budget.charge()
+        best, best_left, best_count = None, 0, size + 1
+        for year, santa in cells:
+            if schedule[year][santa] is None:
+                left = domains[year][santa] & ~taken_in_year[year] & ~taken_by_santa[santa]
+                count = popcount(left)
+                if count < best_count:
+                    best, best_left, best_count = (year, santa), left, count
+                    if not count:
+                        break
+        if best_left:
+            stack.append([best, best_left])
+            schedule[best[0]][best[1]] = UNMATCHED  # reserved until the first assignee is tried below
+        # try the next assignee of the latest cell, otherwise backtrack
+        while stack:
+            frame = stack[-1]
+            (year, santa), untried = frame
+            assignee = schedule[year][santa]
+            if assignee != UNMATCHED:
+                taken_in_year[year] ^= 1 << assignee
+                taken_by_santa[santa] ^= 1 << assignee
+            if untried:
+                start = rng.randrange(size)  # the first untried assignee from a random position
+                above = untried >> start
+                assignee = start + lowest_index(above) if above else lowest_index(untried)
+                frame[1] = untried ^ (1 << assignee)
+                schedule[year][santa] = assignee
+                taken_in_year[year] |= 1 << assignee
+                taken_by_santa[santa] |= 1 << assignee
+                break
+            stack.pop()
+            schedule[year][santa] = None
+        else:
+            return None
+    return schedule
@@ -0,0 +1,158 @@
+import csv
+import json
+import os
+from array import array
+from itertools import islice
+from typing import NamedTuple
+
+from secretsanta.santadraw.family import Family
+from secretsanta.utils.assignment_history import NO_ASSIGNEE
+
+FORMATS = ("csv", "jsonl")
+
+
+class RosterRow(NamedTuple):
+    """A member of a roster: the name, the key of the household or None, and the { year : prior assignee } pairs"""
+    name: str
+    household: str
+    assignees: dict
+
+
+def iter_roster(source, roster_format=None, chunksize=10000):
+    """
+    Read the roster of the source chunk by chunk, and yield the list of at most ``chunksize`` rows as ``RosterRow``.
+    Only a chunk of the roster is held in memory at once.
+
+    * CSV: the header has the columns ``name`` and optionally ``household``, and every other column is a year,
+      e.g., ``2019``, whose value is the prior assignee of the member in the year.
+    * JSONL: every line is an object of ``name``, optionally ``household`` and ``assignees``,
+      the { year : prior assignee } pairs of the member.
+
+    The years are integers, and an empty household or assignee is none.
+
+    :param source: The path of the roster, or a text file object of it
+    :param roster_format: Optional argument for the format, "csv" or "jsonl". Otherwise, the extension of the path
+    :param chunksize: Optional argument for the number of the rows per chunk
+    :raises ValueError: If the format is unknown or ``chunksize`` is less than 1 or a row is invalid
+    """
+    if roster_format is None:
+        roster_format = str(getattr(source, "name", source)).rpartition(".")[2].lower()
+    if roster_format not in FORMATS:
+        raise ValueError("Unknown roster format '{}'. It must be one of {}.".format(roster_format, list(FORMATS)))
+    if chunksize < 1:
+        raise ValueError("The chunk size must be at least 1.")
+    return _iter_roster(source, roster_format, chunksize)
+
+
+def _iter_roster(source, roster_format, chunksize):
+    """The generator of ``iter_roster()``, which is separated so that the arguments are validated at the call"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, newline="", encoding="utf-8") as f:
+            yield from _iter_roster(f, roster_format, chunksize)
+        return
+    rows = _read_csv(source) if roster_format == "csv" else _read_jsonl(source)
+    while True:
+        chunk = list(islice(rows, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _read_csv(f):
+    """Yield the rows of the CSV roster"""
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is None:
+        return
+    if "name" not in header:
+        raise ValueError("The CSV roster must have the column 'name'.")
+    name_column = header.index("name")
+    household_column = header.index("household") if "household" in header else None
+    try:
+        years = [(column, int(year)) for column, year in enumerate(header) if column not in
+                 (name_column, household_column)]
+    except ValueError:
+        raise ValueError("The columns of the CSV roster must be 'name', 'household' or years.") from None
+    for line, row in enumerate(reader, 2):
+        if len(row) != len(header):
+            raise ValueError("The line {} of the CSV roster must have {} columns.".format(line, len(header)))
+        yield RosterRow(row[name_column], row[household_column] if household_column is not None else None,
+                        {year: row[column] for column, year in years})
+
+
+def _read_jsonl(f):
+    """Yield the rows of the JSONL roster"""
+    for line, text in enumerate(f, 1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+            yield RosterRow(str(row["name"]), row.get("household"),
+                            {int(year): "" if assignee is None else str(assignee)
+                             for year, assignee in row.get("assignees", {}).items()})
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            raise ValueError("The line {} of the JSONL roster is invalid: {}".format(line, e)) from None
+
+
+def import_roster(source, roster_format=None, history_window=None, chunksize=10000) -> Family:
+    """
+    Import the roster of the source, see ``iter_roster()``, into a new family in a single pass of the chunks.
+    The members of a household are linked as immediate family to the first member of the household,
+    and the prior assignees of the last years in the history window are the history of the family from the oldest.
+
+    The rows are interned into the family as they are read, so only the family itself, the first member of every
+    household, the assignees of the years in the window by their IDs, and the assignees not read yet are held.
+    The assignees who are not in the roster are not kept, since a year of the history is of the member IDs.
+
+    :param source: The path of the roster, or a text file object of it
+    :param roster_format: Optional argument for the format, "csv" or "jsonl". Otherwise, the extension of the path
+    :param history_window: Optional argument for the window of the history of the family, 2 by default
+    :param chunksize: Optional argument for the number of the rows per chunk
+    :raises ValueError: If the format is unknown or ``chunksize`` or the window is less than 1 or a row is invalid
+        or a member has no name or is in the roster twice
+    """
+    family = Family(history_window=history_window)
+    window = family.get_history().window
+    households = {}  # { household : the ID of the first member }
+    years = {}  # { year : the assignee ID of each member } of the last years read in the window
+    pending = {}  # { assignee not read yet : [(year, the ID of the santa)] }
+    for chunk in iter_roster(source, roster_format, chunksize):
+        for name, household, assignees in chunk:
+            if not name:
+                raise ValueError("Every member of the roster must have a name.")
+            if name in family:
+                raise ValueError("'{}' is in the roster twice.".format(name))
+            member_id = family.add(name)
+            if household:
+                household_id = households.setdefault(household, member_id)
+                if household_id != member_id:
+                    family.add_immediate_family_of_person_with_new_member(family[household_id], family[member_id])
+            for year, assignee in assignees.items():
+                if not assignee:
+                    continue
+                if year not in years:
+                    if len(years) == window and year < min(years):
+                        continue  # older than the window
+                    years[year] = array("I")
+                    if len(years) > window:
+                        del years[min(years)]
+                assignee_id = family.get_member_id(assignee)
+                if assignee_id is None:
+                    pending.setdefault(assignee, []).append((year, member_id))
+                    assignee_id = NO_ASSIGNEE
+                _set(years[year], member_id, assignee_id)
+            for year, santa_id in pending.pop(name, ()):
+                if year in years:
+                    _set(years[year], santa_id, member_id)
+    for year in sorted(years):
+        assignee_ids = years[year]
+        assignee_ids.extend([NO_ASSIGNEE] * (len(family) - len(assignee_ids)))
+        family.update_last_assignees_with_ids(assignee_ids)
+    return family
+
+
+def _set(assignee_ids: array, member_id: int, assignee_id: int) -> None:
+    """Set the assignee ID of the member in the year, where the members not read yet in the year have none"""
+    if len(assignee_ids) <= member_id:
+        assignee_ids.extend([NO_ASSIGNEE] * (member_id + 1 - len(assignee_ids)))
+    assignee_ids[member_id] = assignee_id
@@ -1,17 +1,57 @@
+import multiprocessing
 import random
-import itertools
-from datetime import datetime
+from heapq import heapify, heappop, heappush
+from multiprocessing.connection import wait
+from types import MappingProxyType
+from typing import NamedTuple
 
+from secretsanta.santadraw.budget import DrawBudget
+from secretsanta.santadraw.constraint_matrix import ConstraintMatrix, ForbiddenPairs
 from secretsanta.santadraw.family import Family
-from secretsanta.utils.synchronized_decorator import synchronized_method, synchronized
+from secretsanta.santadraw.pairs_export import export_pairs, iter_pair_chunks
+from secretsanta.santadraw.person import Person
+from secretsanta.utils.bitset import popcount, lowest_index
+from secretsanta.utils.matching import has_complement_perfect_matching, has_perfect_matching, hopcroft_karp, \
+    random_complement_matching, random_maximum_matching, UNMATCHED
+from secretsanta.utils.synchronized_decorator import ReadWriteLock, read_synchronized_method, \
+    write_synchronized_method
+
+_PORTFOLIO_CHECK_INTERVAL = 0.05  # the seconds between the checks of the budget while waiting for the portfolio
+_REPAIR_FANOUT = 4  # the number of the matched assignees that a santa tries to take over in the repair search
+_REPAIR_MAX_NODES = 4096  # the number of the candidates probed to re-route a santa before the full matching
+
+
+class SantaPairsSnapshot(NamedTuple):
+    """The immutable result of a draw: the read-only { Secret Santa : Assignee } pairs and the generation of the draw"""
+    pairs: MappingProxyType
+    generation: int
+
+
+_NO_SANTA_PAIRS = SantaPairsSnapshot(MappingProxyType({}), 0)
 
 
 class SantaDraw:
-    """``SantaDraw`` class assigns a Secret Santa for everyone given a list of all the members of the extended family"""
+    """
+    ``SantaDraw`` class assigns a Secret Santa for everyone given a list of all the members of the extended family.
+    Many family members can view the results concurrently: the viewers hold the lock of this instance for reading
+    in parallel, while a draw holds it exclusively.
+    The result of a draw is published as a new immutable snapshot by a single reference swap, so the viewers of the
+    pairs never need the lock nor a copy.
+    """
 
-    def __init__(self, family_members=None):
-        self._family_members = Family(family_members)
-        self._santa_pairs = {}
+    def __init__(self, family_members=None, random_seed=None):
+        """
+        :param family_members: Optional argument for an instance of Family, which is drawn in place and shares its
+            lock and history with ``draw_secret_santa_pairs()``, or an iterable of the members, which is a new family
+        :param random_seed: Optional argument to seed the random stream of this instance
+        """
+        self._family_members = family_members if isinstance(family_members, Family) else Family(family_members)
+        self._santa_pairs = _NO_SANTA_PAIRS  # the latest published snapshot, which is replaced but never mutated
+        self._random = random.Random(random_seed)  # the random stream of this instance only
+        self._rw_lock = ReadWriteLock()  # the lock of this instance only, see ``read_synchronized_method``
+        # the latest pairs in reverse and the history of the santas before the latest draw, see ``repair()``
+        self._santas = {}  # { Assignee : Secret Santa }
+        self._drawn_last_assignees = {}  # { Secret Santa : their last assignees before the latest draw }
 
     @staticmethod
     def is_valid_pairs(santa, candidate) -> bool:
@@ -19,6 +59,10 @@ class SantaDraw:
         ``is_valid_pairs`` returns True if the candidate is valid for the santa. Otherwise, False.
         This method can be overridden when a new requirement or additional constraint comes to Santa Draw.
         This static method also can be a function instead.
+        Note: the draw compiles this rule in bulk by ``ConstraintMatrix.from_family()`` unless it is overridden,
+        where the immediate family of a member is their whole household in the family.
+        The last assignees of a member of a family are read from the history of the family in O(window),
+        so the number of the years kept is the window of the family, see ``Family.get_history()``.
 
         :param santa: This must be an instance of Person
         :param candidate: This can be a name of the person or an instance of Person
@@ -26,113 +70,632 @@ class SantaDraw:
         return santa != candidate and not santa.is_person_in_last_assignees(
             candidate) and not santa.is_person_in_immediate_family(candidate)
 
-    def __update_last_assignees(self) -> None:
-        """Update the members' last assignees according to the new pairs"""
-        for santa, assignee in self._santa_pairs.items():
-            santa.update_last_assignees_with(assignee)
+    @read_synchronized_method
+    def is_drawable(self) -> bool:
+        """
+        Return True if the Santa Draw can assign a Secret Santa to everyone according to ``self.is_valid_pairs()``.
+        Otherwise, return False.
+        A draw is possible if and only if there is a perfect matching between the santas and their valid candidates,
+        which is found by Hopcroft-Karp maximum bipartite matching in O(E * sqrt(V)) instead of an exhaustive search.
+        Unless ``is_valid_pairs()`` is overridden, the degrees of the santas and the assignees are counted from the
+        forbidden pairs in O(n * (h + k)), and the matching is only searched if a degree is less than half of
+        the family, see ``has_complement_perfect_matching()``.
+        """
+        if len(self._family_members) < 2 or _has_too_large_household(self._family_members, self.is_valid_pairs):
+            return False
+        if _is_family_rule(self._family_members, self.is_valid_pairs):
+            forbidden_pairs = ForbiddenPairs.from_family(self._family_members)
+            return has_complement_perfect_matching(forbidden_pairs.forbidden, forbidden_pairs.size)
+        constraints = _compile_constraints(self._family_members, self.is_valid_pairs)
+        return has_perfect_matching(constraints.candidate_lists(), constraints.size)
 
-    @synchronized_method
-    def assign_santa_to_everyone(self, random_seed=datetime.now()):
+    @write_synchronized_method
+    def assign_santa_to_everyone(self, random_seed=None, strategy="backtracking", portfolio=None, deadline=None,
+                                 max_nodes=None, cancellation=None):
         """
         Since this method updates attributes of ``self._family_members`` and ``self._santa_pairs``,
-        it needs to be thread-safe. Thus, the ``synchronized_method`` decorator is used.
+        it needs to be thread-safe. Thus, the ``write_synchronized_method`` decorator is used so that nobody reads
+        the half-updated attributes.
+        The new pairs are published as a new snapshot of the next generation once the draw is done.
+        If the draw fails, the latest snapshot stays published.
         This pair assignment requires at least two members to assign different people in pairs.
         It will raise 'ValueError' if < 2 members.
-        To start, it shuffles the members of the family before the pair assignment so that it will give randomness.
-            Note: random.shuffle(list) will shuffle the list in-place.
-        Then, validate all possible combination of the family members according to ``self.is_valid_pairs()``
-        until it finds validate pairs.
+        The members are not shuffled in-place since their positions are their IDs in the family.
+        Instead, search valid pairs according to ``self.is_valid_pairs()`` by the given strategy, see ``STRATEGIES``.
+        The search only starts if the draw is possible at all, which is checked in polynomial time as ``is_drawable()``.
+        The randomness comes from the random stream of this instance, so the global ``random`` module is untouched.
+
+        For tightly constrained families, a portfolio of independent randomised searches runs in worker processes,
+        and the first pairs found are taken while the other searches are terminated, see ``_portfolio_search()``.
+        Since the fastest search wins, the pairs of a portfolio are not reproducible by ``random_seed``.
+
+        The draw can be bounded by the time, the number of the nodes of the search and a cancellation token,
+        see ``DrawBudget``. Once the budget runs out, the draw stops with 'DrawTimeout' and releases the lock.
 
-        :param random_seed: Optional argument to set the random seed for debugging purpose
+        :param random_seed: Optional argument to seed the random stream of this draw for debugging purpose.
+            Otherwise, the draw continues the random stream of this instance
+        :param strategy: Optional argument for the search strategy, "backtracking" (default) or "matching"
+        :param portfolio: Optional argument for a portfolio, the number of the searches of ``strategy``
+            or a sequence of the strategies of the searches, e.g., ("backtracking", "backtracking", "matching")
+        :param deadline: Optional argument for the number of the seconds that the draw can take
+        :param max_nodes: Optional argument for the maximum number of the nodes that a search can visit
+        :param cancellation: Optional argument for an instance of ``CancellationToken`` to stop the draw
         :raises ValueError: If the number of family members is less than 2 or there is no possible pairs
+            or the strategy is unknown or the portfolio is empty or the budget is negative
+        :raises DrawTimeout: If the draw runs out of the budget, or 'DrawCancelled' if the draw is cancelled
         """
+        budget = DrawBudget.of(deadline, max_nodes, cancellation)
         if len(self._family_members) < 2:
             # depending on requirements it can raise a customised exception
             raise ValueError("The minimum number of the family for the draw is 2.")
-        self._santa_pairs.clear()
-        random.seed(random_seed)
-        random.shuffle(self._family_members)
-        # get possible {santa: [candidates]}
-        santa_candidates_pairs = {}
-        for member in self._family_members:
-            santa_candidates_pairs[member] = [m for m in self._family_members if self.is_valid_pairs(member, m)]
-        keys, values = zip(*santa_candidates_pairs.items())
-        santa_candidate_combination_gen = (dict(zip(keys, v)) for v in itertools.product(*values))
-        for combination_pairs in santa_candidate_combination_gen:
-            valid = True
-            left_members = set(self._family_members)
-            for santa, candidate in combination_pairs.items():  # each possible santa-candidate combination for members
-                if candidate in left_members and self.is_valid_pairs(santa, candidate):
-                    self._santa_pairs[santa] = candidate
-                    left_members.remove(candidate)
-                else:
-                    valid = False
-                    break
-            if valid:
-                self.__update_last_assignees()
-                return self._santa_pairs.copy()
-        raise ValueError("This family is invalid to generate secret santa pairs according to the rules.")
+        rng = self._random if random_seed is None else random.Random(random_seed)
+        with self._family_members.locked():  # the family can be drawn by ``draw_secret_santa_pairs()`` as well
+            santa_pairs = _search_santa_pairs(self._family_members, self.is_valid_pairs, strategy, rng, portfolio,
+                                              budget)
+            drawn_last_assignees = {santa: santa.get_last_assignees() for santa in santa_pairs}
+            self._family_members.update_last_assignees_with_pairs(santa_pairs)
+        self._santas = {assignee: santa for santa, assignee in santa_pairs.items()}
+        self._drawn_last_assignees = drawn_last_assignees
+        self._santa_pairs = SantaPairsSnapshot(MappingProxyType(santa_pairs), self._santa_pairs.generation + 1)
+        return dict(santa_pairs)
+
+    @write_synchronized_method
+    def repair(self, added=(), removed=(), random_seed=None):
+        """
+        Repair the latest draw after the members are added to or removed from the family, e.g., by
+        ``Family.add_immediate_family_of_person_with_new_member()``
+        or ``Family.remove_immediate_family_of_person_with_member()``, instead of drawing everyone again.
+        The pairs of the others are kept, and only the affected santas are re-routed: the santas of the leavers,
+        the newcomers, and the santas along the augmenting paths which hand their assignees over to them,
+        e.g., a newcomer is spliced into a cycle as the santa of an assignee whose santa takes the newcomer instead.
+        The pairs are valid against the history before the latest draw, which the repaired pairs replace.
+
+        Each affected santa is re-routed by a breadth-first search of the alternating paths which probes the members
+        from a random position and stops at the first free assignee, so the search is O(affected) for a large family.
+        Only if it is stuck after ``_REPAIR_MAX_NODES`` candidates, the full matching is augmented from the pairs
+        so far.
+        The repaired pairs are published as a new snapshot of the next generation. If the repair fails, nothing changes.
+        Since a published snapshot is never mutated, the new snapshot and the returned pairs are copies of the pairs,
+        which are the only O(n) steps of the repair, i.e., dict copies in C, while the reverse pairs and the history
+        are updated in place for the affected santas only.
+        Only the draw of ``SantaDraw.is_valid_pairs()`` can be repaired: an overridden rule can only see the history
+        of the santas as it is, i.e., with the latest draw in it, so it cannot check the pairs against the history
+        before the latest draw.
+
+        :param added: The members, names or instances of Person, added to the family since the latest draw
+        :param removed: The members, names or instances of Person, removed from the family since the latest draw
+        :param random_seed: Optional argument to seed the random stream of this repair for debugging purpose.
+            Otherwise, the repair continues the random stream of this instance
+        :raises ValueError: If there is no draw to repair, or ``is_valid_pairs()`` is overridden, or an added member is
+            not new in the family, or a removed member is still in the family, or there is no possible pairs
+        """
+        family = self._family_members
+        if not self._santa_pairs.generation:
+            raise ValueError("There is no draw to repair.")
+        if self.is_valid_pairs is not SantaDraw.is_valid_pairs:
+            raise ValueError("The draw of an overridden is_valid_pairs() cannot be repaired. Draw everyone again.")
+        rng = self._random if random_seed is None else random.Random(random_seed)
+        with family.locked():
+            if len(family) < 2:
+                raise ValueError("The minimum number of the family for the draw is 2.")
+            santa_pairs = dict(self._santa_pairs.pairs)  # the pairs of the new snapshot, which is never mutated
+            santas = self._santas  # updated in place, and rebuilt from the published pairs if the repair fails
+            try:
+                free_santas, free_assignees = set(), set()
+                for member in removed:
+                    if member in family:
+                        raise ValueError("'{}' is still a member of the family.".format(member))
+                    member = member if isinstance(member, Person) else Person(member)
+                    assignee, santa = santa_pairs.pop(member, None), santas.pop(member, None)
+                    if assignee is not None:
+                        del santas[assignee]
+                        free_assignees.add(assignee)
+                    if santa is not None:
+                        del santa_pairs[santa]
+                        free_santas.add(santa)
+                free_santas.difference_update(removed)
+                free_assignees.difference_update(removed)
+                for member in added:
+                    member_id = family.get_member_id(member)
+                    if member_id is None or family[member_id] in santa_pairs:
+                        raise ValueError("'{}' is not a new member of the family.".format(member))
+                    free_santas.add(family[member_id])
+                    free_assignees.add(family[member_id])
+
+                is_valid = self.__repair_rule()
+                changed = _repair_pairs(family, santa_pairs, santas, free_santas, free_assignees, is_valid, rng)
+                if len(santa_pairs) < len(family):  # stuck, so the pairs so far are augmented by the full matching
+                    changed |= self.__rematch(santa_pairs)
+                    santas = {assignee: santa for santa, assignee in santa_pairs.items()}
+                replaced = {santa: santa_pairs[santa] for santa in changed if santa in self._drawn_last_assignees}
+                appended = {santa: santa_pairs[santa] for santa in changed if santa not in self._drawn_last_assignees}
+                for santa in appended:
+                    self._drawn_last_assignees[santa] = santa.get_last_assignees()
+                for member in removed:
+                    self._drawn_last_assignees.pop(member, None)
+                family.update_last_assignees_with_pairs(replaced, replace_latest=True)
+                family.update_last_assignees_with_pairs(appended)
+            except Exception:
+                self._santas = {assignee: santa for santa, assignee in self._santa_pairs.pairs.items()}
+                raise
+        self._santas = santas
+        self._santa_pairs = SantaPairsSnapshot(MappingProxyType(santa_pairs), self._santa_pairs.generation + 1)
+        return dict(santa_pairs)
+
+    def __repair_rule(self):
+        """Return the rule of a valid pair for ``repair()``, which checks the history before the latest draw"""
+        family = self._family_members
+        drawn_last_assignees = self._drawn_last_assignees
+
+        def is_valid(santa, candidate):
+            santa_id, candidate_id = family.get_member_id(santa), family.get_member_id(candidate)
+            last_assignees = drawn_last_assignees.get(santa)
+            if last_assignees is None:
+                last_assignees = santa.get_last_assignees()
+            return (santa_id != candidate_id and candidate not in last_assignees
+                    and family.get_household_id(santa_id) != family.get_household_id(candidate_id))
+        return is_valid
+
+    def __rematch(self, santa_pairs: dict) -> set:
+        """
+        Augment the valid pairs kept in ``santa_pairs`` to the maximum matching of the whole family in place.
+        Return the santas whose assignees have changed.
+
+        :raises ValueError: If there is no possible pairs
+        """
+        family = self._family_members
+        members = list(family)
+        if _has_too_large_household(family, SantaDraw.is_valid_pairs):
+            raise ValueError("This family is invalid to generate secret santa pairs according to the rules.")
+        else:
+            last_assignee_ids = []
+            for member in members:
+                last_assignees = self._drawn_last_assignees.get(member, member.get_last_assignees())
+                last_assignee_ids.append([i for i in map(family.get_member_id, last_assignees) if i is not None])
+            households = [household for household in family.get_households() if len(household) > 1]
+            constraints = ConstraintMatrix.from_ids(len(members), households, last_assignee_ids)
+        match_left = [UNMATCHED] * len(members)
+        for santa, assignee in santa_pairs.items():
+            santa_id, assignee_id = family.get_member_id(santa), family.get_member_id(assignee)
+            if constraints.is_valid(santa_id, assignee_id):
+                match_left[santa_id] = assignee_id
+        match_left = hopcroft_karp(constraints.candidate_lists(), len(members), match_left)
+        if UNMATCHED in match_left:
+            raise ValueError("This family is invalid to generate secret santa pairs according to the rules.")
+        changed = set()
+        for santa_id, assignee_id in enumerate(match_left):
+            santa, assignee = members[santa_id], members[assignee_id]
+            if santa_pairs.get(santa) is not assignee:
+                santa_pairs[santa] = assignee
+                changed.add(santa)
+        return changed
 
     def get_family_members(self):
         """Getter for the family members that this instance of Santa Draw stores"""
         return self._family_members
 
     def get_santa_pairs(self):
-        """Getter for the latest { Secret Santa : Assignee } pairs with a copy of ``_santa_pairs``"""
-        return dict(self._santa_pairs)
+        """
+        Getter for the latest { Secret Santa : Assignee } pairs as a read-only mapping without a copy nor the lock.
+        The pairs never change once returned, even if a new draw is published.
+        """
+        return self._santa_pairs.pairs
+
+    def get_santa_pairs_snapshot(self) -> SantaPairsSnapshot:
+        """Getter for the latest snapshot of the pairs with the generation, which is 0 before the first draw"""
+        return self._santa_pairs
 
+    def iter_santa_pairs(self, chunksize=1000):
+        """
+        Yield the (Secret Santa, Assignee) records of the latest pairs lazily in lists of at most ``chunksize`` records,
+        e.g., to notify the santas, without a copy of the pairs nor the lock.
+        The records are of the snapshot at the call, even if a new draw is published meanwhile.
+
+        :param chunksize: Optional argument for the number of the records per chunk
+        :raises ValueError: If ``chunksize`` is less than 1
+        """
+        return iter_pair_chunks(self._santa_pairs.pairs, chunksize)
+
+    def export_santa_pairs(self, target, export_format=None, chunksize=1000) -> int:
+        """
+        Write the records of the latest pairs chunk by chunk to a CSV or JSONL file or a binary sink, e.g., the reveal
+        file, see ``export_pairs()``. Return the number of the records written.
+
+        :param target: The path of the file to write, or a binary sink which has ``write()``
+        :param export_format: Optional argument for the format, "csv" or "jsonl". Otherwise, the extension of the path
+        :param chunksize: Optional argument for the number of the records per chunk
+        :raises ValueError: If the format is unknown or ``chunksize`` is less than 1
+        """
+        return export_pairs(self._santa_pairs.pairs, target, export_format, chunksize)
 
-@synchronized
-def draw_secret_santa_pairs(family_members: Family, random_seed=datetime.now()):
+
+def draw_secret_santa_pairs(family_members: Family, random_seed=None, strategy="backtracking", portfolio=None,
+                            deadline=None, max_nodes=None, cancellation=None):
     """
     For the reusability of the functionality, this function can be replaced for Santa Draw.
     This function does exact the same thing as ``assign_santa_to_everyone()`` method in ``SantaDraw``.
 
-    Since this function intends to change internal states of ``family_members``, i.e., different orders by shuffling,
-    it needs to be thread-safe. Thus, the ``synchronized`` decorator is used.
+    Since this function intends to change internal states of ``family_members``, i.e., the last assignees,
+    it needs to be thread-safe. Thus, the draw holds the lock of the family, see ``Family.locked()``,
+    so that the draws of different families run concurrently while the draws of the same family do not interfere.
+    Otherwise, the family is not changed: the search works on the IDs of the members with its own random stream.
     This pair assignment requires at least two members to assign different people in pairs.
     It will raise 'ValueError' if < 2 members.
-    To start, it shuffles the members of the family before the pair assignment so that it will give randomness.
-        Note: random.shuffle(list) will shuffle the list in-place.
-    Then, validate all possible combination of the family members according to ``SantaDraw.is_valid_pairs()``
-    until it finds validate pairs.
+    The members are not shuffled in-place since their positions are their IDs in the family.
+    Instead, search valid pairs according to ``SantaDraw.is_valid_pairs()`` by the given strategy, see ``STRATEGIES``.
         Note: ``SantaDraw.is_valid_pairs()`` can be a function itself instead of the static method.
+    Every call has its own random stream, so the global ``random`` module is untouched.
 
     :param family_members: This argument has to be an iterable of Person type, e.g., Family
-    :param random_seed: Optional argument to set the random seed for debugging purpose
+    :param random_seed: Optional argument to seed the random stream of this draw for debugging purpose
+    :param strategy: Optional argument for the search strategy, "backtracking" (default) or "matching"
+    :param portfolio: Optional argument for a portfolio of the searches in worker processes,
+        see ``SantaDraw.assign_santa_to_everyone()``
+    :param deadline: Optional argument for the number of the seconds that the draw can take
+    :param max_nodes: Optional argument for the maximum number of the nodes that a search can visit
+    :param cancellation: Optional argument for an instance of ``CancellationToken`` to stop the draw
     :raises ValueError: If the number of family members is less than 2 or there is no possible pairs
+        or the strategy is unknown or the portfolio is empty or the budget is negative
+    :raises DrawTimeout: If the draw runs out of the budget, or 'DrawCancelled' if the draw is cancelled
     """
+    budget = DrawBudget.of(deadline, max_nodes, cancellation)
     if len(family_members) < 2:
         # depending on requirements it can raise a customised exception
         raise ValueError("The minimum number of the family for the draw is 2.")
 
-    def __update_last_assignees() -> None:
-        """Update the members' last assignees according to the new pairs"""
-        for santa, assignee in santa_pairs.items():
-            santa.update_last_assignees_with(assignee)
-
     if not isinstance(family_members, Family):
         family_members = Family(family_members)
-    santa_pairs = {}
-    random.seed(random_seed)
-    random.shuffle(family_members)
-    # get possible {santa: [candidates]}
-    santa_candidates_pairs = {}
-    for member in family_members:
-        santa_candidates_pairs[member] = [m for m in family_members if SantaDraw.is_valid_pairs(member, m)]
-    keys, values = zip(*santa_candidates_pairs.items())
-    santa_candidate_combination_gen = (dict(zip(keys, v)) for v in itertools.product(*values))
-    for combination_pairs in santa_candidate_combination_gen:
-        valid = True
-        left_members = set(family_members)
-        for santa, candidate in combination_pairs.items():  # each possible santa-candidate combination for members
-            if candidate in left_members and SantaDraw.is_valid_pairs(santa, candidate):
-                santa_pairs[santa] = candidate
-                left_members.remove(candidate)
+    with family_members.locked():
+        santa_pairs = _search_santa_pairs(family_members, SantaDraw.is_valid_pairs, strategy,
+                                          random.Random(random_seed), portfolio, budget)
+        family_members.update_last_assignees_with_pairs(santa_pairs)
+    return santa_pairs
+
+
+def _repair_pairs(family: Family, santa_pairs: dict, santas: dict, free_santas, free_assignees, is_valid, rng):
+    """
+    Match the free santas to the free assignees in place by re-routing the fewest santas for ``SantaDraw.repair()``,
+    where ``santa_pairs`` and ``santas`` are the kept { Secret Santa : Assignee } pairs and their reverse.
+    Return the santas whose assignees have changed. If the search of a santa is stuck, the santa is left free.
+
+    Each free santa is the root of a breadth-first search of the alternating paths: a santa takes a free assignee if
+    it is valid, otherwise it tries to take over up to ``_REPAIR_FANOUT`` matched assignees, whose santas are searched
+    next. The matched assignees are probed from a random position of the family so the repair is still a random draw.
+    Once a free assignee is reached, the assignees are handed over along the path back to the root.
+    """
+    free_assignees = list(free_assignees)
+    roots = list(free_santas)
+    rng.shuffle(roots)
+    rng.shuffle(free_assignees)
+    size = len(family)
+    changed = set()
+    for root in roots:
+        via = {}  # { assignee : the santa who takes it over on the path }
+        queue = [root]
+        head = 0
+        nodes = 0
+        found = None
+        while found is None and head < len(queue) and nodes <= _REPAIR_MAX_NODES:
+            santa = queue[head]
+            head += 1
+            for assignee in free_assignees:
+                nodes += 1
+                if is_valid(santa, assignee):
+                    via[assignee] = santa
+                    found = assignee
+                    break
             else:
-                valid = False
+                start = rng.randrange(size)
+                taken = 0
+                for i in range(size):
+                    nodes += 1
+                    assignee = family[(start + i) % size]
+                    if assignee in via or assignee not in santas or not is_valid(santa, assignee):
+                        continue
+                    via[assignee] = santa
+                    queue.append(santas[assignee])
+                    taken += 1
+                    if taken == _REPAIR_FANOUT or nodes > _REPAIR_MAX_NODES:
+                        break
+        if found is None:
+            continue
+        free_assignees.remove(found)
+        assignee = found
+        while True:  # hand the assignees over along the path back to the root
+            santa = via[assignee]
+            handed_over = santa_pairs.get(santa)
+            santa_pairs[santa] = assignee
+            santas[assignee] = santa
+            changed.add(santa)
+            if santa is root:
+                break
+            assignee = handed_over
+    return changed
+
+
+def _search_santa_pairs(members, is_valid_pairs, strategy="backtracking", rng=random, portfolio=None,
+                        budget=None) -> dict:
+    """
+    Search { Secret Santa : Assignee } pairs of the ``members`` where every pair satisfies ``is_valid_pairs``.
+    The members are indexed by their position, i.e., their IDs in the family, and the rule is compiled into
+    a ``ConstraintMatrix`` so that the search itself only deals with integers.
+    A single matching of a family only needs its ``ForbiddenPairs``, which is linear in the size of the family.
+    The santas are visited in a random order and their candidates are tried in a random order for the randomness.
+
+    :param members: A sequence of Person type, e.g., Family
+    :param is_valid_pairs: The rule of a valid pair, e.g., ``SantaDraw.is_valid_pairs()``
+    :param strategy: The name of the search strategy in ``STRATEGIES``
+    :param rng: Optional argument for the random number generator, e.g., an instance of ``random.Random``
+    :param portfolio: Optional argument for a portfolio of the searches, see ``_search_assignment()``
+    :param budget: Optional argument for the budget of the search, see ``DrawBudget``
+    :raises ValueError: If there is no possible pairs or the strategy is unknown or the portfolio is empty
+    :raises DrawTimeout: If the search runs out of the budget
+    """
+    if _has_too_large_household(members, is_valid_pairs):
+        constraints = None
+    elif strategy == "matching" and portfolio is None and _is_family_rule(members, is_valid_pairs):
+        constraints = ForbiddenPairs.from_family(members)  # the matching does not need the mask of every pair
+    else:
+        constraints = _compile_constraints(members, is_valid_pairs, budget)
+    assignment = _search_assignment(constraints, strategy, rng, portfolio, budget)
+    members = list(members)
+    return {members[santa]: members[assignee] for santa, assignee in enumerate(assignment)}
+
+
+def search_assignment_of_ids(size: int, households, last_assignee_ids, strategy="backtracking", rng=random,
+                             budget=None) -> list:
+    """
+    Search the assignee of every santa of a family given by the IDs of its members only, as
+    ``draw_secret_santa_pairs()`` does, e.g., in a worker process or from a snapshot without ``Person`` objects.
+    Return the list of the ID of the assignee of each santa.
+    The "matching" strategy is drawn from the ``ForbiddenPairs`` of the family, and the others from the
+    ``ConstraintMatrix`` of the family.
+
+    :param size: The number of the members
+    :param households: An iterable of the IDs of the members of every household, see ``Family.get_households()``
+    :param last_assignee_ids: The IDs of the last assignees of each member, see ``Family.get_last_assignee_ids()``
+    :param strategy: Optional argument for the search strategy, "backtracking" (default) or "matching"
+    :param rng: Optional argument for the random number generator, e.g., an instance of ``random.Random``
+    :param budget: Optional argument for the budget of the search, see ``DrawBudget``
+    :raises ValueError: If the number of family members is less than 2 or there is no possible pairs
+        or the strategy is unknown
+    :raises DrawTimeout: If the search runs out of the budget
+    """
+    if size < 2:
+        raise ValueError("The minimum number of the family for the draw is 2.")
+    households = [household for household in households if len(household) > 1]
+    if max(map(len, households), default=0) * 2 > size:
+        constraints = None  # a household of more than half of the members, see ``SantaDraw.is_drawable()``
+    elif strategy == "matching":
+        constraints = ForbiddenPairs.from_ids(size, households, last_assignee_ids)  # without the mask of every pair
+    else:
+        constraints = ConstraintMatrix.from_ids(size, households, last_assignee_ids, budget)
+    return _search_assignment(constraints, strategy, rng, budget=budget)
+
+
+def _search_assignment(constraints, strategy="backtracking", rng=random, portfolio=None, budget=None) -> list:
+    """
+    Search the assignee of every santa in the compiled constraints by the strategy.
+    Return the list of the index of the assignee of each santa.
+
+    :param constraints: An instance of ConstraintMatrix, or None if the draw is already known to be impossible
+    :param strategy: The name of the search strategy in ``STRATEGIES``
+    :param rng: Optional argument for the random number generator, e.g., an instance of ``random.Random``
+    :param portfolio: Optional argument for a portfolio of the searches in worker processes,
+        the number of the searches of ``strategy`` or a sequence of the strategies of the searches
+    :param budget: Optional argument for the budget of the search, see ``DrawBudget``
+    :raises ValueError: If there is no possible pairs or the strategy is unknown or the portfolio is empty
+    :raises DrawTimeout: If the search runs out of the budget
+    """
+    if portfolio is None:
+        strategies = [strategy]
+    elif isinstance(portfolio, int):
+        strategies = [strategy] * portfolio
+    else:
+        strategies = list(portfolio)
+    if not strategies:
+        raise ValueError("The portfolio must have at least one search.")
+    for name in strategies:
+        if name not in STRATEGIES:
+            raise ValueError("Unknown strategy '{}'. It must be one of {}.".format(name, sorted(STRATEGIES)))
+    if budget is not None:
+        budget.check()  # compiling the constraints of a large family takes time as well
+    if constraints is None:
+        assignment = None
+    elif portfolio is None:
+        assignment = STRATEGIES[strategy](constraints, rng, budget)
+    else:
+        assignment = _portfolio_search(constraints, strategies, rng, budget)
+    if assignment is None:
+        raise ValueError("This family is invalid to generate secret santa pairs according to the rules.")
+    return assignment
+
+
+def _portfolio_search(constraints: ConstraintMatrix, strategies, rng, budget=None) -> list:
+    """
+    Run an independent randomised search of every strategy in its own worker process with a different random seed.
+    Return the assignment of the first search which finds one, or None if a search finds out that there is none.
+    The other searches are terminated once the result is found, so a search stuck in an unlucky order does not
+    hold the draw back.
+    Each search is bounded by the maximum number of the nodes of the budget, while this process keeps watching
+    the deadline and the cancellation token of the budget, and terminates all the searches once it runs out.
+    """
+    context = multiprocessing.get_context()
+    processes = []
+    receivers = []
+    try:
+        for strategy in strategies:
+            receiver, sender = context.Pipe(duplex=False)
+            worker_budget = None if budget is None else budget.for_worker()
+            process = context.Process(target=_portfolio_run,
+                                      args=(constraints, strategy, rng.getrandbits(64), worker_budget, sender),
+                                      daemon=True)
+            process.start()
+            sender.close()  # only the worker holds the sender, so a worker lost without a result is seen as EOF
+            processes.append(process)
+            receivers.append(receiver)
+        error = None
+        while receivers:
+            if budget is not None:
+                budget.check()
+            for receiver in wait(receivers, None if budget is None else _PORTFOLIO_CHECK_INTERVAL):
+                receivers.remove(receiver)
+                try:
+                    assignment, e = receiver.recv()
+                except EOFError:
+                    assignment, e = None, RuntimeError("A search of the portfolio exited without a result.")
+                receiver.close()
+                if assignment is not None or e is None:  # found, or found out that there is no possible assignment
+                    return assignment
+                error = error or e
+        if error is not None:
+            raise error
+        return None
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+        for receiver in receivers:
+            receiver.close()
+
+
+def _portfolio_run(constraints: ConstraintMatrix, strategy: str, seed: int, budget, sender) -> None:
+    """Run a search of the portfolio in a worker process and send (assignment or None, error or None) back"""
+    try:
+        sender.send((STRATEGIES[strategy](constraints, random.Random(seed), budget), None))
+    except Exception as e:  # the error is raised in the parent process unless another search finds an assignment
+        sender.send((None, e))
+    finally:
+        sender.close()
+
+
+def _is_family_rule(members, is_valid_pairs) -> bool:
+    """Return True if the rule is ``SantaDraw.is_valid_pairs()`` of a family, whose IDs and households are interned"""
+    return is_valid_pairs is SantaDraw.is_valid_pairs and isinstance(members, Family)
+
+
+def _has_too_large_household(members, is_valid_pairs) -> bool:
+    """
+    Return True if a household has more than half of the members under ``SantaDraw.is_valid_pairs()``.
+    The assignees of a household must be outside the household, so such a household is pruned as a whole
+    without compiling the constraints of its members (Hall's condition on the household).
+    """
+    return _is_family_rule(members, is_valid_pairs) and members.get_largest_household_size() * 2 > len(members)
+
+
+def _compile_constraints(members, is_valid_pairs, budget=None) -> ConstraintMatrix:
+    """
+    Compile the rule of the draw for the members, who are indexed by their position.
+    ``SantaDraw.is_valid_pairs()`` itself is built in bulk, while an overridden rule has to be called for every pair.
+    The optional ``budget`` is checked per santa, since the mask of a large family takes time as well.
+    """
+    if is_valid_pairs is SantaDraw.is_valid_pairs:
+        if isinstance(members, Family):
+            return ConstraintMatrix.from_family(members, budget)
+        return ConstraintMatrix.from_members(members, budget)
+    return ConstraintMatrix.from_rule(members, is_valid_pairs, budget)
+
+
+def _backtracking_strategy(constraints: ConstraintMatrix, rng, budget=None) -> list:
+    """
+    Backtracking search which only starts if the draw is possible at all.
+    The feasibility check is polynomial so that an impossible family fails fast instead of exhausting the search.
+    """
+    if not has_perfect_matching(constraints.candidate_lists(budget), constraints.size, budget):
+        return None
+    return _backtrack_assignment(constraints.candidate_bitsets(budget), constraints.invalid_santa_lists(budget), rng,
+                                 budget)
+
+
+def _matching_strategy(constraints: ConstraintMatrix, rng, budget=None) -> list:
+    """
+    Randomised maximum bipartite matching, which is a valid draw if every santa is matched.
+    Unlike the backtracking, it is guaranteed to finish in polynomial time, i.e., O(E * sqrt(V)), for large families.
+    Given ``ForbiddenPairs`` instead, the matching is built from the forbidden pairs only in O(n * (h + k)) expected,
+    see ``random_complement_matching()``, so a large family is drawn without listing the candidates of every santa.
+    """
+    if isinstance(constraints, ForbiddenPairs):
+        assignment = random_complement_matching(constraints.forbidden, constraints.size, rng, budget)
+    else:
+        assignment = random_maximum_matching(constraints.candidate_lists(budget), constraints.size, rng, budget)
+    return None if UNMATCHED in assignment else assignment
+
+
+def _backtrack_assignment(candidates, invalid_santas, rng=random, budget=None):
+    """
+    Backtracking search for a distinct assignee of every santa, where ``candidates[santa]`` is the bitset of the valid
+    assignees, see ``secretsanta.utils.bitset``, and ``invalid_santas[assignee]`` lists the santas for whom the assignee
+    is not valid.
+    Return the list of the assignee of each santa, or None if there is no possible assignment.
+
+    - Variable ordering: the most constrained santa, i.e., the one with the fewest candidates left, is assigned next.
+      Ties are broken by a random order of the santas.
+    - Forward checking: once an assignee is taken, it leaves the bitset of the members left to assign.
+      If any santa runs out of candidates, the search backtracks straight away instead of going deeper.
+    - Value ordering: the candidates are tried in a random order so that the result is still a random draw.
+
+    The number of the candidates left of a santa is the number of the members left minus the number of the invalid
+    assignees left of the santa. Taking an assignee only changes the latter for its few invalid santas, so the most
+    constrained santa is kept in a heap instead of counting the candidates of every santa at each node.
+    The search is iterative so that large families do not hit the recursion limit.
+    The optional ``budget``, e.g., ``DrawBudget``, is charged for every node, which may stop the search.
+    """
+    size = len(candidates)
+    rank = list(range(size))  # a random order of the santas to break ties between the most constrained santas
+    rng.shuffle(rank)
+    # { santa : the number of the candidates left - the number of the members left }, i.e., -(invalid assignees left)
+    slack = [popcount(bits) - size for bits in candidates]
+    heap = [(slack[santa], rank[santa], santa) for santa in range(size)]  # may hold outdated entries
+    heapify(heap)
+    left_members = (1 << size) - 1
+    assignment = [None] * size
+    assigned = [False] * size
+    stack = []  # [santa, candidates not tried yet] of each assigned santa
+
+    def take(assignee, step):
+        for santa in invalid_santas[assignee]:
+            slack[santa] += step
+            if not assigned[santa]:
+                heappush(heap, (slack[santa], rank[santa], santa))
+
+    while len(stack) < size:
+        if budget is not None:
+            budget.charge()
+        while assigned[heap[0][2]] or heap[0][0] != slack[heap[0][2]]:  # drop the outdated entries
+            heappop(heap)
+        if size - len(stack) + heap[0][0] > 0:  # the most constrained santa still has a candidate left
+            santa = heappop(heap)[2]
+            assigned[santa] = True
+            stack.append([santa, candidates[santa] & left_members])
+        # try the next candidate of the latest santa, otherwise backtrack
+        while stack:
+            frame = stack[-1]
+            santa, untried = frame
+            if assignment[santa] is not None:
+                left_members |= 1 << assignment[santa]
+                take(assignment[santa], -1)
+                assignment[santa] = None
+            if untried:
+                start = rng.randrange(size)  # the first untried candidate from a random position
+                above = untried >> start
+                assignee = start + lowest_index(above) if above else lowest_index(untried)
+                frame[1] = untried ^ (1 << assignee)
+                assignment[santa] = assignee
+                left_members ^= 1 << assignee
+                take(assignee, 1)
                 break
-        if valid:
-            __update_last_assignees()
-            return santa_pairs
-    raise ValueError("This family is invalid to generate secret santa pairs according to the rules.")
+            stack.pop()
+            assigned[santa] = False
+            heappush(heap, (slack[santa], rank[santa], santa))
+        else:
+            return None
+    return assignment
+
+
+# { name : search strategy } where a strategy returns the assignee index of each santa, or None if there is no possible
+# assignment, given the ``ConstraintMatrix`` of the members, a random number generator and an optional budget
+STRATEGIES = {
+    "backtracking": _backtracking_strategy,
+    "matching": _matching_strategy,
+}
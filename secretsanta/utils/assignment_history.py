@@ -0,0 +1,195 @@
+# The assignment history of the dense indices 0 to n - 1, e.g., the last assignees of the members of a family.
+# Every year is a compact array of the assignee index of each santa index, 4 bytes per santa per year, instead of a
+# queue of objects per santa. The inverse of every year finds the santa of an assignee, so an index can be removed
+# without scanning the years.
+from array import array
+
+NO_ASSIGNEE = 0xFFFFFFFF  # the entry of a santa without an assignee in a year, the largest value of array('I')
+
+
+class AssignmentHistory:
+    """
+    ``AssignmentHistory`` class keeps the assignees of the santas 0 to ``len(self) - 1`` in the last ``window`` years.
+    ``was_assigned()`` is O(window), i.e., O(1) for a fixed window, regardless of the number of the santas.
+
+    The years are the last assignees of each santa from the oldest: assigning a single santa shifts the years of
+    the santa only, as a queue of the santa, while a year of every santa, e.g., a draw, rotates the arrays at once.
+    A year is usually a permutation whose inverse is exact. Otherwise, e.g., if the santas were assigned one by one,
+    the santas of an assignee in the year are scanned until the year leaves the window.
+    The indices are kept dense like a list: removing an index moves the last index into the freed index.
+    """
+
+    def __init__(self, size: int = 0, window: int = 2):
+        """
+        :param size: Optional argument for the number of the santas to start with
+        :param window: Optional argument for the number of the years kept, 2 by default
+        :raises ValueError: If the window is less than 1
+        """
+        if window < 1:
+            raise ValueError("The window of the history must be at least 1 year.")
+        self._size = size
+        self._years = [self.__no_assignees(size) for _ in range(window)]  # { year : { santa : assignee } }
+        self._santas = [self.__no_assignees(size) for _ in range(window)]  # { year : { assignee : santa } }
+        self._exact = [True] * window  # { year : whether ``_santas`` of the year is the exact inverse }
+
+    @staticmethod
+    def __no_assignees(size: int) -> array:
+        """Return the array of ``size`` santas without an assignee"""
+        return array("I", [NO_ASSIGNEE]) * size
+
+    def __set(self, year: int, santa: int, assignee: int) -> None:
+        """Set the assignee of the santa in the year and keep the inverse of the year in sync"""
+        assignees, santas = self._years[year], self._santas[year]
+        old_assignee = assignees[santa]
+        if old_assignee != NO_ASSIGNEE and santas[old_assignee] == santa:
+            santas[old_assignee] = NO_ASSIGNEE
+        assignees[santa] = assignee
+        if assignee != NO_ASSIGNEE:
+            other = santas[assignee]  # the inverse only refers to a santa who has the assignee in the year
+            if other != NO_ASSIGNEE and other != santa:
+                self._exact[year] = False  # two santas have the same assignee in the year
+            else:
+                santas[assignee] = santa
+
+    def __santas_of(self, year: int, assignee: int) -> list:
+        """Return the santas of the assignee in the year"""
+        if self._exact[year]:
+            santa = self._santas[year][assignee]
+            return [] if santa == NO_ASSIGNEE else [santa]
+        return [santa for santa, other in enumerate(self._years[year]) if other == assignee]
+
+    @property
+    def window(self) -> int:
+        """The number of the years kept"""
+        return len(self._years)
+
+    def copy(self):
+        """Return a copy of this history, whose arrays are copied at once"""
+        history = AssignmentHistory(window=self.window)
+        history._size = self._size
+        history._years = [array("I", assignees) for assignees in self._years]
+        history._santas = [array("I", santas) for santas in self._santas]
+        history._exact = list(self._exact)
+        return history
+
+    def add(self) -> int:
+        """Add a new santa without any assignee and return the index"""
+        for assignees, santas in zip(self._years, self._santas):
+            assignees.append(NO_ASSIGNEE)
+            santas.append(NO_ASSIGNEE)
+        self._size += 1
+        return self._size - 1
+
+    def assignees(self, santa: int) -> array:
+        """Return the array of the assignees of the santa in the window from the oldest"""
+        return array("I", [assignees[santa] for assignees in self._years if assignees[santa] != NO_ASSIGNEE])
+
+    def year(self, year: int) -> array:
+        """Return a copy of the assignee of every santa in the year from the oldest year 0, NO_ASSIGNEE if none"""
+        return array("I", self._years[year])
+
+    def was_assigned(self, santa: int, assignee: int) -> bool:
+        """Return True if the assignee was assigned to the santa in the window. Otherwise, False."""
+        for assignees in self._years:
+            if assignees[santa] == assignee:
+                return True
+        return False
+
+    def assign(self, assignment: dict) -> None:
+        """
+        Add the assignee of each santa in the { santa : assignee } ``assignment`` as the latest assignee of the santa,
+        and the oldest ones of the santas leave the window. The other santas are unchanged.
+        """
+        years = self._years
+        for year in range(len(years)):
+            latest = year == len(years) - 1
+            self.__set_all(year, assignment if latest else {santa: years[year + 1][santa] for santa in assignment})
+
+    def __set_all(self, year: int, assignment: dict) -> None:
+        """
+        Set the { santa : assignee } ``assignment`` in the year. The santas are cleared first, so a permutation among
+        them, e.g., a repaired draw, keeps the inverse of the year exact.
+        """
+        for santa in assignment:
+            self.__set(year, santa, NO_ASSIGNEE)
+        for santa, assignee in assignment.items():
+            self.__set(year, santa, assignee)
+
+    def assign_all(self, assignment) -> None:
+        """
+        Add a year of every santa, where ``assignment[santa]`` is the assignee of the santa, e.g., a draw.
+        The oldest year leaves the window.
+
+        :raises ValueError: If the assignment is not of every santa
+        """
+        if len(assignment) != self._size:
+            raise ValueError("The assignment must have the assignees of all the {} santas.".format(self._size))
+        assignees = array("I", assignment)
+        santas = self.__no_assignees(self._size)
+        exact = True
+        for santa, assignee in enumerate(assignees):
+            if assignee == NO_ASSIGNEE:
+                continue
+            if santas[assignee] != NO_ASSIGNEE:
+                exact = False
+            else:
+                santas[assignee] = santa
+        for years, latest in ((self._years, assignees), (self._santas, santas), (self._exact, exact)):
+            del years[0]
+            years.append(latest)
+
+    def replace_latest(self, assignment: dict) -> None:
+        """
+        Replace the latest assignee of each santa in the { santa : assignee } ``assignment``, e.g., once the latest
+        draw is repaired. If a santa has no assignee yet, the assignee is added.
+        """
+        new = {santa: assignee for santa, assignee in assignment.items() if not self.assignees(santa)}
+        self.__set_all(self.window - 1, {santa: assignee for santa, assignee in assignment.items() if santa not in new})
+        self.assign(new)
+
+    def set_assignees(self, santa: int, assignees) -> None:
+        """Replace the assignees of the santa with the given ones from the oldest, where the latest ones are kept"""
+        assignees = list(assignees)[-self.window:]
+        for year, assignee in enumerate([NO_ASSIGNEE] * (self.window - len(assignees)) + assignees):
+            self.__set(year, santa, assignee)
+
+    def forget(self, index: int) -> None:
+        """Remove every assignee of the index as a santa, and remove the index as an assignee of the others"""
+        for year in range(self.window):
+            for santa in self.__santas_of(year, index):
+                self.__set(year, santa, NO_ASSIGNEE)
+            self.__set(year, index, NO_ASSIGNEE)
+
+    def swap(self, a: int, b: int) -> None:
+        """Swap the indices ``a`` and ``b`` both as santas and as assignees in O(window) unless a year is not exact"""
+        if a == b:
+            return
+        swapped = {a: b, b: a}
+        for year in range(self.window):
+            santas = {a, b, *self.__santas_of(year, a), *self.__santas_of(year, b)}
+            assignees = {santa: self._years[year][santa] for santa in santas}
+            for santa in santas:
+                self.__set(year, santa, NO_ASSIGNEE)
+            for santa, assignee in assignees.items():
+                self.__set(year, swapped.get(santa, santa), swapped.get(assignee, assignee))
+
+    def swap_remove(self, index: int) -> None:
+        """
+        Remove the index as ``forget()`` does in O(window) unless a year is not exact, and move the last index into it.
+        """
+        self.forget(index)
+        last = self._size - 1
+        if index != last:
+            for year in range(self.window):
+                assignee = self._years[year][last]
+                self.__set(year, last, NO_ASSIGNEE)
+                self.__set(year, index, assignee)
+                for santa in self.__santas_of(year, last):
+                    self.__set(year, santa, index)
+        for assignees, santas in zip(self._years, self._santas):
+            assignees.pop()
+            santas.pop()
+        self._size -= 1
+
+    def __len__(self):
+        return self._size
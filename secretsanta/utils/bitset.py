@@ -0,0 +1,33 @@
+# Bitsets of indices as arbitrary-precision ints, where the index ``i`` is in the set if the bit ``1 << i`` is set.
+# Intersection (&), union (|), popcount and lowest-bit selection are single operations on ints in C.
+
+_BYTE_TO_DIGIT = bytes.maketrans(b"\x00\x01", b"01")
+
+
+try:
+    popcount = int.bit_count  # the number of the indices in the bitset, Python 3.10+
+except AttributeError:
+    def popcount(bits: int) -> int:
+        """Return the number of the indices in the bitset"""
+        return bin(bits).count("1")
+
+
+def lowest_index(bits: int) -> int:
+    """Return the lowest index in the non-empty bitset"""
+    return (bits & -bits).bit_length() - 1
+
+
+def iter_indices(bits: int):
+    """Yield the indices in the bitset in ascending order"""
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+
+def from_flags(flags) -> int:
+    """
+    Return the bitset of the indices whose flag is 1 in the bytes-like ``flags`` of 0 and 1, e.g., a row of a mask.
+    The conversion is done by ``bytes.translate()`` and ``int()`` without looping over the flags in Python.
+    """
+    return int(bytes(flags).translate(_BYTE_TO_DIGIT)[::-1] or b"0", 2)
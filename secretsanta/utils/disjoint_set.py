@@ -0,0 +1,118 @@
+# Disjoint sets of the dense indices 0 to n - 1, e.g., the households of the members of a family.
+# Every index holds the ID of its group, so finding the group is a single lookup and two indices are in the same group
+# if their group IDs are equal. A union relabels the smaller group into the larger one, which is O(log n) amortised per
+# index. Unlike a parent-pointer forest, an index can also leave its group or be removed.
+
+
+class DisjointSet:
+    """
+    ``DisjointSet`` class keeps the indices 0 to ``len(self) - 1`` in disjoint groups with integer group IDs.
+    A new index starts in a group of its own.
+    The indices are kept dense like a list: removing an index moves the last index into the freed index.
+    """
+
+    def __init__(self, size: int = 0):
+        self._group_ids = list(range(size))  # { index : group ID }
+        self._groups = {index: [index] for index in range(size)}  # { group ID : list of the indices }
+        self._next_group_id = size
+
+    def __new_group(self, index: int) -> int:
+        """Return the ID of a new group of the index only"""
+        group_id = self._next_group_id
+        self._next_group_id += 1
+        self._groups[group_id] = [index]
+        return group_id
+
+    def add(self) -> int:
+        """Add a new index in a group of its own and return the index"""
+        index = len(self._group_ids)
+        self._group_ids.append(self.__new_group(index))
+        return index
+
+    def find(self, index: int) -> int:
+        """Return the group ID of the index in O(1)"""
+        return self._group_ids[index]
+
+    def union(self, a: int, b: int) -> int:
+        """Merge the groups of the indices ``a`` and ``b``, and return the group ID of the merged group"""
+        group_a = self._group_ids[a]
+        group_b = self._group_ids[b]
+        if group_a == group_b:
+            return group_a
+        if len(self._groups[group_a]) < len(self._groups[group_b]):
+            group_a, group_b = group_b, group_a
+        indices = self._groups.pop(group_b)
+        for index in indices:
+            self._group_ids[index] = group_a
+        self._groups[group_a].extend(indices)
+        return group_a
+
+    def group(self, index: int) -> list:
+        """Return a copy of the list of the indices in the group of the index, including the index"""
+        return list(self._groups[self._group_ids[index]])
+
+    def groups(self):
+        """Yield a copy of the list of the indices of every group"""
+        return (list(indices) for indices in self._groups.values())
+
+    def group_size(self, index: int) -> int:
+        """Return the number of the indices in the group of the index"""
+        return len(self._groups[self._group_ids[index]])
+
+    def largest_group_size(self) -> int:
+        """Return the number of the indices in the largest group, or 0 if there is no index"""
+        return max(map(len, self._groups.values()), default=0)
+
+    def __leave(self, index: int) -> None:
+        """Remove the index from its group and drop the group if it is empty"""
+        group_id = self._group_ids[index]
+        indices = self._groups[group_id]
+        indices.remove(index)
+        if not indices:
+            del self._groups[group_id]
+
+    def separate(self, index: int) -> None:
+        """Move the index out of its group into a group of its own"""
+        if self.group_size(index) > 1:
+            self.__leave(index)
+            self._group_ids[index] = self.__new_group(index)
+
+    def split(self, components) -> None:
+        """
+        Split a group into the given components, e.g., once the index which linked them has left the group.
+        The first component keeps the group ID, and each of the others is a new group.
+
+        :param components: The lists of the indices of every component, which must cover the whole group
+        """
+        group_id = self._group_ids[components[0][0]]
+        self._groups[group_id] = list(components[0])
+        for component in components[1:]:
+            new_group_id = self.__new_group(component[0])
+            self._groups[new_group_id] = list(component)
+            for index in component:
+                self._group_ids[index] = new_group_id
+
+    def swap(self, a: int, b: int) -> None:
+        """Swap the indices ``a`` and ``b`` in their groups, like ``Family`` does with the IDs of two members"""
+        group_a, group_b = self._group_ids[a], self._group_ids[b]
+        if group_a == group_b:
+            return
+        indices = self._groups[group_a]
+        indices[indices.index(a)] = b
+        indices = self._groups[group_b]
+        indices[indices.index(b)] = a
+        self._group_ids[a], self._group_ids[b] = group_b, group_a
+
+    def swap_remove(self, index: int) -> None:
+        """Remove the index, and the last index takes the removed index like ``Family`` does with the IDs"""
+        last = len(self._group_ids) - 1
+        self.__leave(index)
+        if index != last:
+            group_id = self._group_ids[last]
+            indices = self._groups[group_id]
+            indices[indices.index(last)] = index
+            self._group_ids[index] = group_id
+        self._group_ids.pop()
+
+    def __len__(self):
+        return len(self._group_ids)
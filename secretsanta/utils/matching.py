@@ -0,0 +1,249 @@
+# Maximum bipartite matching between santas (left) and assignees (right).
+# A Santa Draw is possible if and only if every santa can be matched to a distinct valid assignee,
+# i.e., the bipartite graph of valid pairs has a perfect matching.
+import random
+
+UNMATCHED = -1
+_REJECTION_ATTEMPTS = 8  # the random free right vertices tried for a left vertex by the greedy complement matching
+
+
+class ComplementAdjacency:
+    """
+    ``ComplementAdjacency`` class is the adjacency of a dense bipartite graph given by its few missing edges,
+    where ``forbidden[u]`` is the collection of the right vertices not adjacent to the left vertex ``u``.
+    The list of the right vertices adjacent to a left vertex is only built in O(right_size) once it is asked for,
+    and cached, so ``hopcroft_karp()`` from a nearly perfect matching never builds the lists of the most vertices.
+    """
+
+    def __init__(self, forbidden, right_size: int, rng=None):
+        """
+        :param forbidden: A sequence where ``forbidden[u]`` is a set of the right vertices not adjacent to ``u``
+        :param right_size: The number of the right vertices
+        :param rng: Optional argument for the random number generator to shuffle each list. Otherwise, in order
+        """
+        self._forbidden = forbidden
+        self._right_size = right_size
+        self._rng = rng
+        self._lists = {}  # { left vertex : the list of its adjacent right vertices }
+
+    def __getitem__(self, u: int) -> list:
+        neighbours = self._lists.get(u)
+        if neighbours is None:
+            forbidden = self._forbidden[u]
+            neighbours = self._lists[u] = [v for v in range(self._right_size) if v not in forbidden]
+            if self._rng is not None:
+                self._rng.shuffle(neighbours)
+        return neighbours
+
+    def __len__(self):
+        return len(self._forbidden)
+
+
+def hopcroft_karp(adjacency, right_size: int, match_left=None, budget=None) -> list:
+    """
+    Hopcroft-Karp maximum bipartite matching in O(E * sqrt(V)).
+    Return the list of the matched right vertex of each left vertex, or ``UNMATCHED`` if the left vertex has no match.
+
+    Each phase finds the shortest augmenting paths by a BFS from all free left vertices and augments a maximal set of
+    vertex-disjoint ones of them by a DFS. The DFS is iterative so that large graphs do not hit the recursion limit.
+
+    :param adjacency: A sequence where ``adjacency[u]`` is a collection of the right vertices, 0 to ``right_size - 1``,
+        adjacent to the left vertex ``u``, or an instance of ComplementAdjacency
+    :param right_size: The number of the right vertices
+    :param match_left: Optional argument for the matching to start with. Otherwise, it starts with a greedy matching
+    :param budget: Optional argument for the budget of the search, e.g., ``DrawBudget``, which is charged for the left
+        vertices visited by each phase, and checked per left vertex of the greedy matching
+    """
+    left_size = len(adjacency)
+    if not isinstance(adjacency, ComplementAdjacency):  # which builds its lists only for the vertices visited
+        adjacency = [a if isinstance(a, (list, tuple)) else list(a) for a in adjacency]  # sets are not subscriptable
+    match_left = [UNMATCHED] * left_size if match_left is None else list(match_left)
+    match_right = [UNMATCHED] * right_size
+    for u, v in enumerate(match_left):
+        if v != UNMATCHED:
+            match_right[v] = u
+    # a greedy matching to start with, which leaves only a few free vertices in a dense graph
+    for u in range(left_size):
+        if match_left[u] != UNMATCHED:
+            continue
+        if budget is not None:
+            budget.check()
+        for v in adjacency[u]:
+            if match_right[v] == UNMATCHED:
+                match_left[u] = v
+                match_right[v] = u
+                break
+
+    while True:
+        # BFS: layer the left vertices by the length of the alternating path from a free left vertex
+        dist = [UNMATCHED] * left_size
+        queue = [u for u in range(left_size) if match_left[u] == UNMATCHED]
+        for u in queue:
+            dist[u] = 0
+        limit = None  # the layer of the shortest augmenting paths
+        head = 0
+        while head < len(queue):
+            u = queue[head]
+            head += 1
+            if limit is not None and dist[u] >= limit:
+                continue
+            for v in adjacency[u]:
+                w = match_right[v]
+                if w == UNMATCHED:
+                    limit = dist[u]
+                elif dist[w] == UNMATCHED:
+                    dist[w] = dist[u] + 1
+                    queue.append(w)
+        if budget is not None:
+            budget.charge(len(queue))
+        if limit is None:
+            return match_left
+
+        # DFS: augment vertex-disjoint shortest augmenting paths along the layers
+        pointer = [0] * left_size
+        for root in range(left_size):
+            if match_left[root] != UNMATCHED or dist[root] != 0:
+                continue
+            path = [root]  # left vertices on the alternating path
+            via = []  # via[i] is the right vertex between path[i] and path[i + 1]
+            while path:
+                u = path[-1]
+                neighbours = adjacency[u]
+                advanced = False
+                while pointer[u] < len(neighbours):
+                    v = neighbours[pointer[u]]
+                    pointer[u] += 1
+                    w = match_right[v]
+                    if w == UNMATCHED:
+                        if dist[u] == limit:
+                            via.append(v)
+                            for left, right in zip(path, via):
+                                match_left[left] = right
+                                match_right[right] = left
+                            path = []
+                            advanced = True
+                            break
+                    elif dist[w] == dist[u] + 1 and dist[w] <= limit:
+                        path.append(w)
+                        via.append(v)
+                        advanced = True
+                        break
+                if not advanced:
+                    dist[u] = UNMATCHED  # no augmenting path through this vertex in this phase
+                    path.pop()
+                    if via:
+                        via.pop()
+
+
+def random_maximum_matching(adjacency, right_size: int, rng=random, budget=None) -> list:
+    """
+    Hopcroft-Karp maximum bipartite matching which is randomised so that it can be used as a random draw.
+    Return the list of the matched right vertex of each left vertex, or ``UNMATCHED`` if the left vertex has no match.
+
+    The adjacency of every left vertex is shuffled, and the starting matching is built greedily in a random order of
+    the left vertices. Hopcroft-Karp then only augments the few vertices left free by the greedy matching.
+
+    :param adjacency: A sequence where ``adjacency[u]`` is a collection of the right vertices adjacent to ``u``
+    :param right_size: The number of the right vertices
+    :param rng: Optional argument for the random number generator, e.g., an instance of ``random.Random``
+    :param budget: Optional argument for the budget of the search, see ``hopcroft_karp()``
+    """
+    shuffled = []
+    for neighbours in adjacency:
+        if budget is not None:
+            budget.check()
+        neighbours = list(neighbours)
+        rng.shuffle(neighbours)
+        shuffled.append(neighbours)
+    order = list(range(len(shuffled)))
+    rng.shuffle(order)
+    match_left = [UNMATCHED] * len(shuffled)
+    taken = [False] * right_size
+    for u in order:
+        for v in shuffled[u]:
+            if not taken[v]:
+                match_left[u] = v
+                taken[v] = True
+                break
+    if budget is not None:
+        budget.charge(len(order))
+    return hopcroft_karp(shuffled, right_size, match_left, budget)
+
+
+def random_complement_matching(forbidden, right_size: int, rng=random, budget=None) -> list:
+    """
+    Randomised maximum bipartite matching of a dense bipartite graph given by its few missing edges, see
+    ``ComplementAdjacency``, in O(n * f) for the n left vertices of at most f missing edges each,
+    instead of listing the O(n^2) edges as ``random_maximum_matching()`` does.
+    Return the list of the matched right vertex of each left vertex, or ``UNMATCHED`` if the left vertex has no match.
+
+    The starting matching is built greedily in a random order of the left vertices, where each left vertex takes
+    a random free right vertex by rejection sampling: up to ``_REJECTION_ATTEMPTS`` free right vertices are drawn
+    until one is adjacent, which is O(1) expected as long as the missing edges are few.
+    Hopcroft-Karp then only augments the few vertices left free by the greedy matching, whose adjacency is built lazily.
+
+    :param forbidden: A sequence where ``forbidden[u]`` is a set of the right vertices not adjacent to ``u``
+    :param right_size: The number of the right vertices
+    :param rng: Optional argument for the random number generator, e.g., an instance of ``random.Random``
+    :param budget: Optional argument for the budget of the search, see ``hopcroft_karp()``
+    """
+    order = list(range(len(forbidden)))
+    rng.shuffle(order)
+    match_left = [UNMATCHED] * len(forbidden)
+    free = list(range(right_size))  # the free right vertices in any order
+    for u in order:
+        excluded = forbidden[u]
+        for _ in range(_REJECTION_ATTEMPTS):
+            if not free:
+                break
+            i = rng.randrange(len(free))
+            v = free[i]
+            if v not in excluded:
+                match_left[u] = v
+                free[i] = free[-1]
+                free.pop()
+                break
+    if budget is not None:
+        budget.charge(len(order))
+    return hopcroft_karp(ComplementAdjacency(forbidden, right_size, rng), right_size, match_left, budget)
+
+
+def has_perfect_matching(adjacency, right_size: int, budget=None) -> bool:
+    """
+    Return True if every left vertex can be matched to a distinct right vertex. Otherwise, return False.
+
+    :param adjacency: A sequence where ``adjacency[u]`` is a collection of the right vertices adjacent to ``u``
+    :param right_size: The number of the right vertices
+    :param budget: Optional argument for the budget of the search, see ``hopcroft_karp()``
+    """
+    if any(not neighbours for neighbours in adjacency):  # a santa without any candidate, no need to search
+        return False
+    return UNMATCHED not in hopcroft_karp(adjacency, right_size, budget=budget)
+
+
+def has_complement_perfect_matching(forbidden, right_size: int, budget=None) -> bool:
+    """
+    Return True if every left vertex can be matched to a distinct right vertex of a dense bipartite graph given by its
+    few missing edges, see ``ComplementAdjacency``. Otherwise, return False.
+
+    The degrees of the vertices are counted from the missing edges in O(n * f). If the sides are of the same size n
+    and every vertex has at least n / 2 neighbours, there is a perfect matching by Hall's condition: a set of at most
+    n / 2 left vertices has enough neighbours of any of them, and a larger set is adjacent to every right vertex.
+    Otherwise, it is found out by ``random_complement_matching()``.
+
+    :param forbidden: A sequence where ``forbidden[u]`` is a set of the right vertices not adjacent to ``u``
+    :param right_size: The number of the right vertices
+    :param budget: Optional argument for the budget of the search, see ``hopcroft_karp()``
+    """
+    left_size = len(forbidden)
+    missing = [0] * right_size  # the number of the left vertices not adjacent to each right vertex
+    for excluded in forbidden:
+        if len(excluded) == right_size:  # a left vertex without any neighbours, no need to search
+            return False
+        for v in excluded:
+            missing[v] += 1
+    left_degree = right_size - max(map(len, forbidden), default=0)
+    right_degree = left_size - max(missing, default=0)
+    if left_size == right_size and left_degree * 2 >= right_size and right_degree * 2 >= left_size:
+        return True
+    return UNMATCHED not in random_complement_matching(forbidden, right_size, random.Random(0), budget)
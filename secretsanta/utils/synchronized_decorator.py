@@ -1,4 +1,4 @@
-from threading import Lock
+from threading import Condition, Lock, get_ident
 
 
 # from https://theorangeduck.com/page/synchronized-python
@@ -20,11 +20,133 @@ def synchronized_method(method):
     lock_name = "__" + method.__name__ + "_lock" + "__"
 
     def sync_method(self, *args, **kwargs):
-        with outer_lock:
-            if not hasattr(self, lock_name):
-                setattr(self, lock_name, Lock())
-            lock = getattr(self, lock_name)
-            with lock:
-                return method(self, *args, **kwargs)
+        lock = getattr(self, lock_name, None)
+        if lock is None:  # the outer lock is only taken once per instance to create the lock
+            with outer_lock:
+                if not hasattr(self, lock_name):
+                    setattr(self, lock_name, Lock())
+                lock = getattr(self, lock_name)
+        with lock:
+            return method(self, *args, **kwargs)
+
+    return sync_method
+
+
+class ReadWriteLock:
+    """
+    ``ReadWriteLock`` class lets many readers hold the lock at the same time, while a writer holds it exclusively.
+    A waiting writer is preferred to new readers so that the writers are not starved by a stream of readers.
+
+    The lock is reentrant for the thread which holds it: a reader can read again, and a writer can read or write again.
+    A reader cannot become a writer, i.e., it will raise 'RuntimeError', since two such readers would wait for
+    each other forever.
+    """
+
+    def __init__(self):
+        self._condition = Condition(Lock())
+        self._readers = {}  # { thread ID : the number of the nested reads }
+        self._writer = None  # the thread ID of the writer
+        self._writes = 0  # the number of the nested writes of the writer
+        self._waiting_writers = 0
+
+    def acquire_read(self) -> None:
+        """Acquire the lock for reading, which waits while a writer holds or waits for the lock"""
+        me = get_ident()
+        with self._condition:
+            if self._writer != me and me not in self._readers:
+                while self._writer is not None or self._waiting_writers:
+                    self._condition.wait()
+            self._readers[me] = self._readers.get(me, 0) + 1
+
+    def release_read(self) -> None:
+        """Release the lock for reading. It will raise 'RuntimeError' if this thread does not read"""
+        me = get_ident()
+        with self._condition:
+            if me not in self._readers:
+                raise RuntimeError("The lock is not acquired for reading by this thread.")
+            self._readers[me] -= 1
+            if not self._readers[me]:
+                del self._readers[me]
+                if not self._readers:
+                    self._condition.notify_all()
+
+    def acquire_write(self) -> None:
+        """Acquire the lock for writing, which waits until no other thread holds the lock"""
+        me = get_ident()
+        with self._condition:
+            if self._writer == me:
+                self._writes += 1
+                return
+            if me in self._readers:
+                raise RuntimeError("The lock cannot be acquired for writing while this thread reads.")
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._condition.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._writes = 1
+
+    def release_write(self) -> None:
+        """Release the lock for writing. It will raise 'RuntimeError' if this thread does not write"""
+        with self._condition:
+            if self._writer != get_ident():
+                raise RuntimeError("The lock is not acquired for writing by this thread.")
+            self._writes -= 1
+            if not self._writes:
+                self._writer = None
+                self._condition.notify_all()
+
+    def reading(self):
+        """Return the context manager which holds the lock for reading, e.g., ``with lock.reading(): ...``"""
+        return _Holding(self.acquire_read, self.release_read)
+
+    def writing(self):
+        """Return the context manager which holds the lock for writing, e.g., ``with lock.writing(): ...``"""
+        return _Holding(self.acquire_write, self.release_write)
+
+
+class _Holding:
+    """The context manager which acquires a lock on enter and releases it on exit"""
+
+    __slots__ = ("_acquire", "_release")
+
+    def __init__(self, acquire, release):
+        self._acquire = acquire
+        self._release = release
+
+    def __enter__(self):
+        self._acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._release()
+
+
+def read_synchronized_method(method):
+    """
+    This read_synchronized_method decorator makes a method hold the ``ReadWriteLock`` of the instance for reading,
+    so that the readers run in parallel but never while a writer runs.
+    The instance must create the lock as ``self._rw_lock`` at construction time.
+    """
+
+    def sync_method(self, *args, **kwargs):
+        with self._rw_lock.reading():
+            return method(self, *args, **kwargs)
+
+    return sync_method
+
+
+def write_synchronized_method(method):
+    """
+    This write_synchronized_method decorator makes a method hold the ``ReadWriteLock`` of the instance for writing,
+    so that the writer runs exclusively, e.g., a draw or a mutation.
+    The instance must create the lock as ``self._rw_lock`` at construction time.
+    """
+
+    def sync_method(self, *args, **kwargs):
+        with self._rw_lock.writing():
+            return method(self, *args, **kwargs)
 
     return sync_method
@@ -104,3 +104,31 @@ def is_distinct_assignee_unique_and_not_in_last_two_pairs_and_not_in_immediate_f
         except KeyError:
             return False
     return len(covered_members) == len(family_members)
+
+
+def is_distinct_assignee_unique_and_not_in_history_and_not_in_household(family, pairs: dict) -> bool:
+    """
+    Given the Family ``family`` with ``pairs``, validate the given ``pairs`` have random assignment to each other and
+    not overlapped with the history of the family and not in their own household, before the pairs are added to the
+    history. The history is read by the IDs of the members in O(window) per pair, see ``Family.get_history()``.
+    If the unique keys of ``pairs`` are the members of ``family`` and each key has a unique value, not themselves,
+    from ``family`` and not assigned to the key within the window of the history and not in the household of the key,
+    then return True. Otherwise, return False.
+
+    :param family: This argument has to be an instance of Family
+    :param pairs: { Secret Santa : Assignee } pairs that is under validation
+    """
+    if len(family) != len(pairs):
+        return False
+    history = family.get_history()
+    covered_members = set()
+    for santa, assignee in pairs.items():
+        santa_id, assignee_id = family.get_member_id(santa), family.get_member_id(assignee)
+        if santa_id is None or assignee_id is None or santa_id == assignee_id:
+            return False
+        if history.was_assigned(santa_id, assignee_id):
+            return False
+        if family.get_household_id(santa_id) == family.get_household_id(assignee_id):
+            return False
+        covered_members.add(assignee_id)
+    return len(covered_members) == len(family)
@@ -0,0 +1,119 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+from unittest import IsolatedAsyncioTestCase, main
+
+from secretsanta.santadraw.async_santa_draw import AsyncSantaDraw
+from secretsanta.santadraw.budget import DrawTimeout
+from secretsanta.santadraw.santa_draw import SantaDraw
+from secretsanta.utils.validation import \
+    is_distinct_assignee_unique_and_not_in_last_two_pairs_and_not_in_immediate_family
+
+validate_santa_draw = is_distinct_assignee_unique_and_not_in_last_two_pairs_and_not_in_immediate_family
+
+
+class BlockingSantaDraw(SantaDraw):
+    """Santa Draw which blocks every draw until it is released, to test the draws running in the executor"""
+
+    def __init__(self, family_members=None):
+        super().__init__(family_members)
+        self.started = Event()
+        self.released = Event()
+
+    def assign_santa_to_everyone(self, random_seed=None, strategy="backtracking", **budget):
+        self.started.set()
+        self.released.wait(5)
+        return super().assign_santa_to_everyone(random_seed, strategy, **budget)
+
+
+class CooperativeSantaDraw(SantaDraw):
+    """Santa Draw which runs until its draw is cancelled, to test the cancellation of a running draw"""
+
+    def __init__(self, family_members=None):
+        super().__init__(family_members)
+        self.started = Event()
+
+    def assign_santa_to_everyone(self, random_seed=None, strategy="backtracking", cancellation=None, **budget):
+        self.started.set()
+        while not cancellation.is_cancelled():
+            time.sleep(0.01)
+        return super().assign_santa_to_everyone(random_seed, strategy, cancellation=cancellation, **budget)
+
+
+class TestAsyncSantaDraw(IsolatedAsyncioTestCase):
+    """Test ``AsyncSantaDraw`` class in the event loop"""
+
+    async def test_draw(self):
+        """The draw assigns valid pairs and publishes them"""
+        drawer = AsyncSantaDraw(["m{}".format(i) for i in range(10)])
+        self.assertTrue(await drawer.is_drawable())
+        santa_pairs = await drawer.draw()
+        self.assertTrue(validate_santa_draw(drawer.get_santa_draw().get_family_members(), santa_pairs))
+        self.assertEqual(await drawer.get_santa_pairs(), santa_pairs)
+
+    async def test_failed_draw(self):
+        """The draw of an impossible family raises 'ValueError' in the event loop"""
+        drawer = AsyncSantaDraw(["ALONE"])
+        self.assertFalse(await drawer.is_drawable())
+        with self.assertRaises(ValueError):
+            await drawer.draw()
+
+    async def test_draw_with_executor(self):
+        """The draw runs in the given executor"""
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="santa") as executor:
+            drawer = AsyncSantaDraw(["m1", "m2", "m3"], executor=executor)
+            await drawer.draw(random_seed=1)
+        self.assertEqual(await drawer.get_santa_pairs(),
+                         SantaDraw(["m1", "m2", "m3"]).assign_santa_to_everyone(random_seed=1))
+
+    async def test_event_loop_not_blocked(self):
+        """The event loop serves others while a draw is running"""
+        santa_draw = BlockingSantaDraw(["m1", "m2", "m3"])
+        drawer = AsyncSantaDraw(santa_draw=santa_draw)
+        task = asyncio.ensure_future(drawer.draw())
+        while not santa_draw.started.is_set():
+            await asyncio.sleep(0.01)
+        self.assertEqual(await drawer.get_santa_pairs(), {})
+        santa_draw.released.set()
+        self.assertEqual(await task, await drawer.get_santa_pairs())
+
+    async def test_cancel_waiting_draw(self):
+        """A draw cancelled while waiting for another draw never starts"""
+        santa_draw = BlockingSantaDraw(["m1", "m2", "m3"])
+        drawer = AsyncSantaDraw(santa_draw=santa_draw)
+        running = asyncio.ensure_future(drawer.draw())
+        while not santa_draw.started.is_set():
+            await asyncio.sleep(0.01)
+        waiting = asyncio.ensure_future(drawer.draw())
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        santa_draw.released.set()
+        await running
+        with self.assertRaises(asyncio.CancelledError):
+            await waiting
+        self.assertEqual(santa_draw.get_santa_pairs_snapshot().generation, 1)
+
+    async def test_cancel_running_draw(self):
+        """A draw cancelled while running is stopped by its cancellation token and publishes no pairs"""
+        santa_draw = CooperativeSantaDraw(["m1", "m2", "m3"])
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            drawer = AsyncSantaDraw(santa_draw=santa_draw, executor=executor)
+            task = asyncio.ensure_future(drawer.draw())
+            while not santa_draw.started.is_set():
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+        self.assertEqual(santa_draw.get_santa_pairs_snapshot().generation, 0)
+
+    async def test_draw_out_of_budget(self):
+        """A draw which runs out of its budget raises 'DrawTimeout' in the event loop"""
+        drawer = AsyncSantaDraw(["m{}".format(i) for i in range(10)])
+        with self.assertRaises(DrawTimeout):
+            await drawer.draw(max_nodes=0)
+        self.assertEqual(len(await drawer.draw(deadline=60)), 10)
+
+
+if __name__ == '__main__':
+    main()
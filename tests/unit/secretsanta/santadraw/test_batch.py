@@ -0,0 +1,81 @@
+from unittest import TestCase, main
+
+from secretsanta.santadraw import DrawTimeout, draw_many
+from secretsanta.santadraw.family import Family
+from secretsanta.utils.validation import \
+    is_distinct_assignee_unique_and_not_in_last_two_pairs_and_not_in_immediate_family
+
+validate_santa_draw = is_distinct_assignee_unique_and_not_in_last_two_pairs_and_not_in_immediate_family
+
+
+class TestDrawMany(TestCase):
+    """Test ``draw_many()`` with a process pool"""
+
+    def setUp(self) -> None:
+        """Each test case will have 20 families of 3 to 7 members with a household"""
+        self.families = {}
+        for i in range(20):
+            family = Family(["f{}-m{}".format(i, j) for j in range(3 + i % 5)])
+            family.add_immediate_family_of_person_with_new_member("f{}-m0".format(i), "f{}-h".format(i))
+            self.families["f{}".format(i)] = family
+
+    def test_draw_many(self):
+        """Every family is drawn once and the pairs are applied to the history of the family"""
+        results = dict(draw_many(self.families, workers=2, chunksize=3))
+        self.assertEqual(results.keys(), self.families.keys())
+        for family_id, santa_pairs in results.items():
+            family = self.families[family_id]
+            self.assertTrue(validate_santa_draw(family, santa_pairs))
+            for santa, assignee in santa_pairs.items():
+                self.assertEqual(family[family.get_member_id(santa)].get_last_assignees(), (assignee,))
+        second_results = dict(draw_many(self.families, workers=2))
+        for family_id, santa_pairs in second_results.items():
+            self.assertTrue(validate_santa_draw(self.families[family_id], santa_pairs, results[family_id]))
+
+    def test_draw_many_from_iterable(self):
+        """The families of an iterable are identified by their positions"""
+        families = [["a", "b"], ["c", "d", "e"]]
+        results = dict(draw_many(families, workers=1))
+        self.assertEqual(results[0], {"a": "b", "b": "a"})
+        self.assertEqual(len(results[1]), 3)
+
+    def test_errors(self):
+        """The families which cannot be drawn are yielded with the 'ValueError'"""
+        one_household = Family(["m1"])
+        for i in range(3):
+            one_household.add_immediate_family_of_person_with_new_member("m1", "h{}".format(i))
+        families = {"alone": ["ALONE"], "household": one_household, "ok": ["m1", "m2"]}
+        results = dict(draw_many(families, workers=2))
+        self.assertIsInstance(results["alone"], ValueError)
+        self.assertIsInstance(results["household"], ValueError)
+        self.assertEqual(results["ok"], {"m1": "m2", "m2": "m1"})
+        self.assertEqual(one_household[0].get_last_assignees(), ())
+
+    def test_budget(self):
+        """The families which run out of the budget are yielded with the 'DrawTimeout' and their history is untouched"""
+        results = dict(draw_many(self.families, workers=2, chunksize=5, max_nodes=0))
+        self.assertEqual(results.keys(), self.families.keys())
+        for family_id, result in results.items():
+            self.assertIsInstance(result, DrawTimeout)
+            self.assertEqual(self.families[family_id][0].get_last_assignees(), ())
+        with self.assertRaises(ValueError):
+            draw_many(self.families, deadline=-1)
+
+    def test_same_pairs_with_same_random_seed(self):
+        """The batches with the same random seed have the same pairs"""
+        families = [["m{}".format(j) for j in range(30)] for _ in range(4)]
+        results = dict(draw_many(families, workers=2, random_seed=7))
+        self.assertEqual(results, dict(draw_many(families, workers=2, random_seed=7)))
+
+    def test_invalid_arguments(self):
+        """It will raise 'ValueError' at the call with invalid arguments"""
+        with self.assertRaises(ValueError):
+            draw_many(self.families, workers=0)
+        with self.assertRaises(ValueError):
+            draw_many(self.families, chunksize=0)
+        with self.assertRaises(ValueError):
+            draw_many(self.families, strategy="UNKNOWN")
+
+
+if __name__ == '__main__':
+    main()
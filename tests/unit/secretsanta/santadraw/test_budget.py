@@ -0,0 +1,64 @@
+import time
+from threading import Thread
+from unittest import TestCase, main
+
+from secretsanta.santadraw.budget import CancellationToken, DrawBudget, DrawCancelled, DrawTimeout
+
+
+class TestDrawBudget(TestCase):
+    """Test ``DrawBudget`` class which bounds a draw"""
+
+    def test_unbounded_budget(self):
+        """There is no budget without any bound"""
+        self.assertIsNone(DrawBudget.of())
+        self.assertIsInstance(DrawBudget.of(max_nodes=1), DrawBudget)
+
+    def test_max_nodes(self):
+        """The budget runs out after the maximum number of the nodes. It will raise 'DrawTimeout'"""
+        budget = DrawBudget(max_nodes=10)
+        budget.charge(4)
+        budget.charge(6)
+        with self.assertRaises(DrawTimeout):
+            budget.charge()
+
+    def test_deadline(self):
+        """The budget runs out after the deadline. It will raise 'DrawTimeout'"""
+        budget = DrawBudget(deadline=0)
+        time.sleep(0.01)
+        self.assertEqual(budget.remaining_time(), 0)
+        with self.assertRaises(DrawTimeout):
+            budget.check()
+        with self.assertRaises(DrawTimeout):
+            budget.charge()
+        self.assertIsNone(DrawBudget(max_nodes=1).remaining_time())
+
+    def test_cancellation(self):
+        """The budget runs out once the token is cancelled by another thread. It will raise 'DrawCancelled'"""
+        token = CancellationToken()
+        budget = DrawBudget(cancellation=token)
+        budget.charge(5000)
+        thread = Thread(target=token.cancel)
+        thread.start()
+        thread.join()
+        self.assertTrue(token.is_cancelled())
+        with self.assertRaises(DrawCancelled):
+            budget.charge(5000)
+
+    def test_for_worker(self):
+        """The budget of a worker keeps the maximum number of the nodes only"""
+        self.assertIsNone(DrawBudget(deadline=10).for_worker())
+        worker_budget = DrawBudget(deadline=0, max_nodes=3, cancellation=CancellationToken()).for_worker()
+        worker_budget.check()
+        with self.assertRaises(DrawTimeout):
+            worker_budget.charge(4)
+
+    def test_negative_budget(self):
+        """The budget must not be negative. It will raise 'ValueError'"""
+        with self.assertRaises(ValueError):
+            DrawBudget(deadline=-1)
+        with self.assertRaises(ValueError):
+            DrawBudget(max_nodes=-1)
+
+
+if __name__ == '__main__':
+    main()
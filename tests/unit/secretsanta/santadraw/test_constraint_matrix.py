@@ -0,0 +1,150 @@
+from unittest import TestCase, main
+
+from secretsanta.santadraw.budget import CancellationToken, DrawBudget, DrawCancelled
+from secretsanta.santadraw.constraint_matrix import ConstraintMatrix, ForbiddenPairs
+from secretsanta.santadraw.family import Family
+from secretsanta.santadraw.person import Person
+from secretsanta.santadraw.santa_draw import SantaDraw
+
+
+class TestConstraintMatrix(TestCase):
+    """Test ``ConstraintMatrix`` built from the members of a family"""
+
+    def setUp(self) -> None:
+        """Each test case will have a family with immediate family members and last assignees"""
+        m2 = Person("m2")
+        m2.update_last_assignees_with("m3")
+        m3 = Person("m3")
+        m3.update_last_assignees_with("m4")
+        m3.update_last_assignees_with("NOT_EXIST")
+        self.family = Family(["m1", m2, m3, "m4"])
+        self.family.add_immediate_family_of_person_with_new_member("m1", "new1")
+        self.members = list(self.family)
+
+    def test_empty_members(self):
+        """No members, no constraints"""
+        constraints = ConstraintMatrix.from_members([])
+        self.assertEqual(constraints.size, 0)
+        self.assertEqual(constraints.candidate_lists(), [])
+
+    def test_from_members_same_as_is_valid_pairs(self):
+        """The compiled mask should have the same rule as ``SantaDraw.is_valid_pairs()``"""
+        constraints = ConstraintMatrix.from_members(self.members)
+        self.assertEqual(constraints.size, len(self.members))
+        for i, santa in enumerate(self.members):
+            for j, candidate in enumerate(self.members):
+                self.assertEqual(constraints.is_valid(i, j), SantaDraw.is_valid_pairs(santa, candidate))
+
+    def test_from_members_same_as_from_rule(self):
+        """The compiled mask should be the same as the one by calling the rule for every pair"""
+        compiled = ConstraintMatrix.from_members(self.members)
+        by_rule = ConstraintMatrix.from_rule(self.members, SantaDraw.is_valid_pairs)
+        self.assertEqual(compiled.candidate_lists(), by_rule.candidate_lists())
+
+    def test_from_family_same_as_from_members(self):
+        """The mask compiled from the interned IDs should be the same as the one from the members"""
+        by_ids = ConstraintMatrix.from_family(self.family)
+        by_members = ConstraintMatrix.from_members(self.members)
+        self.assertEqual(by_ids.candidate_lists(), by_members.candidate_lists())
+
+    def test_candidates(self):
+        """The candidates of a person are the indices of the valid members"""
+        constraints = ConstraintMatrix.from_members(self.members)
+        santa = self.members.index("m1")
+        expected = [i for i, m in enumerate(self.members) if m not in ("m1", "new1")]
+        self.assertEqual(constraints.candidates(santa), expected)
+
+    def test_candidate_bitset(self):
+        """The candidate bitset of a person has the same indices as their candidates"""
+        constraints = ConstraintMatrix.from_members(self.members)
+        for santa in range(constraints.size):
+            bits = constraints.candidate_bitset(santa)
+            self.assertEqual([i for i in range(constraints.size) if bits >> i & 1], constraints.candidates(santa))
+        self.assertEqual(constraints.candidate_bitsets(),
+                         [constraints.candidate_bitset(santa) for santa in range(constraints.size)])
+
+    def test_invalid_santas(self):
+        """The invalid santas of a person are the santas who cannot have the person"""
+        constraints = ConstraintMatrix.from_members(self.members)
+        for candidate in range(constraints.size):
+            expected = [santa for santa in range(constraints.size) if not constraints.is_valid(santa, candidate)]
+            self.assertEqual(constraints.invalid_santas(candidate), expected)
+        m4 = self.members.index("m4")
+        self.assertEqual(constraints.invalid_santas(m4), sorted([m4, self.members.index("m3")]))
+
+    def test_invalid_mask_size(self):
+        """The mask must have size * size entries. It will raise 'ValueError'"""
+        with self.assertRaises(ValueError):
+            ConstraintMatrix(3, bytearray(8))
+
+    def test_large_members(self):
+        """The diagonal of a large family is cleared"""
+        constraints = ConstraintMatrix.from_members([Person("m{}".format(i)) for i in range(1000)])
+        self.assertFalse(any(constraints.is_valid(i, i) for i in range(1000)))
+        self.assertEqual(len(constraints.candidates(500)), 999)
+
+
+    def test_from_family_by_household(self):
+        """The members in the same household cannot be each other's candidates even if they are not linked directly"""
+        self.family.add_immediate_family_of_person_with_new_member("new1", "new2")
+        constraints = ConstraintMatrix.from_family(self.family)
+        household = self.family.get_household_ids(self.family.get_member_id("m1"))
+        self.assertEqual(len(household), 3)
+        for santa in household:
+            for candidate in household:
+                self.assertFalse(constraints.is_valid(santa, candidate))
+        new2 = self.family.get_member_id("new2")
+        self.assertEqual(sorted(constraints.candidates(new2)), sorted(self.family.get_member_id(m) for m in
+                                                                      ("m2", "m3", "m4")))
+
+    def test_budget_checked_per_santa(self):
+        """The mask and the lists of a large family stop with the budget, e.g., once the draw is cancelled"""
+        token = CancellationToken()
+        budget = DrawBudget(cancellation=token)
+        rows = []
+
+        def is_valid_pairs(santa, candidate):
+            if len(rows) == 2:
+                token.cancel()
+            rows.append(santa)
+            return santa != candidate
+
+        with self.assertRaises(DrawCancelled):
+            ConstraintMatrix.from_rule(self.members, is_valid_pairs, budget)
+        self.assertLess(len(rows), len(self.members) * 2)
+        constraints = ConstraintMatrix.from_family(self.family)
+        for compile_lists in (constraints.candidate_lists, constraints.candidate_bitsets,
+                              constraints.invalid_santa_lists):
+            with self.assertRaises(DrawCancelled):
+                compile_lists(budget)
+        with self.assertRaises(DrawCancelled):
+            ConstraintMatrix.from_family(self.family, budget)
+        with self.assertRaises(DrawCancelled):
+            ConstraintMatrix.from_members(self.members, budget)
+
+
+class TestForbiddenPairs(TestCase):
+    """Test ``ForbiddenPairs`` built from the members of a family"""
+
+    def test_same_as_constraint_matrix(self):
+        """The forbidden pairs should have the same rule as the mask"""
+        m2 = Person("m2")
+        m2.update_last_assignees_with("m3")
+        family = Family(["m1", m2, "m3", "m4"])
+        family.add_immediate_family_of_person_with_new_member("m1", "new1")
+        family.add_immediate_family_of_person_with_new_member("new1", "new2")
+        mask = ConstraintMatrix.from_family(family)
+        forbidden_pairs = ForbiddenPairs.from_family(family)
+        self.assertEqual(forbidden_pairs.size, len(family))
+        for santa in range(len(family)):
+            for candidate in range(len(family)):
+                self.assertEqual(forbidden_pairs.is_valid(santa, candidate), mask.is_valid(santa, candidate))
+
+    def test_invalid_size(self):
+        """The forbidden pairs must have a set of every member"""
+        with self.assertRaises(ValueError):
+            ForbiddenPairs(2, [{0}])
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,10 @@
+import random
 from unittest import TestCase, main
 
 from secretsanta.santadraw.family import Family
 from secretsanta.santadraw.person import Person
+from secretsanta.santadraw.santa_draw import SantaDraw, draw_secret_santa_pairs
+from secretsanta.utils.assignment_history import NO_ASSIGNEE
 
 
 class TestDefaultFamilyMember(TestCase):
@@ -299,5 +302,373 @@ class TestFlexibleFamily(TestCase):
         self.assertFalse(Person("new21") in family)
 
 
+class TestInternedFamily(TestCase):
+    """Test the interned IDs of the members of ``Family``"""
+
+    def setUp(self) -> None:
+        """Instantiate ``Family`` class with two members and their immediate family"""
+        self.family = Family([Person("orig1", ["new11"]), "orig2"])
+        self.family.add_immediate_family_of_person_with_new_member("orig2", "new21")
+
+    def test_member_ids(self):
+        """The ID of a member is their position in the family"""
+        for position, member in enumerate(self.family):
+            self.assertEqual(self.family.get_member_id(member), position)
+            self.assertEqual(self.family.get_member_id(str(member)), position)
+        self.assertIsNone(self.family.get_member_id("NOT_EXIST"))
+
+    def test_immediate_family_ids(self):
+        """The immediate family is stored as IDs"""
+        orig1 = self.family.get_member_id("orig1")
+        orig2 = self.family.get_member_id("orig2")
+        new11 = self.family.get_member_id("new11")
+        new21 = self.family.get_member_id("new21")
+        self.assertEqual(list(self.family.get_immediate_family_ids(orig1)), [new11])
+        self.assertEqual(list(self.family.get_immediate_family_ids(orig2)), [new21])
+        self.assertEqual(list(self.family.get_immediate_family_ids(new21)), [orig2])
+
+    def test_no_duplicated_member_by_adding_immediate_family(self):
+        """Adding an existing member as immediate family links them without a duplicated member"""
+        self.family.add_immediate_family_of_person_with_new_member("orig1", Person("orig2"))
+        self.assertEqual(len(self.family), 4)
+        orig1 = self.family.get_member_id("orig1")
+        orig2 = self.family.get_member_id("orig2")
+        self.assertIn(orig2, self.family.get_immediate_family_ids(orig1))
+        self.assertIn(orig1, self.family.get_immediate_family_ids(orig2))
+        self.assertTrue(self.family[orig1].is_person_in_immediate_family("orig2"))
+
+    def test_update_last_assignees_with_pairs(self):
+        """The last assignees are updated both in the members and in the ID arrays"""
+        pairs = {"orig1": "orig2", "orig2": "new11", "new11": "new21", "new21": "orig1"}
+        self.family.update_last_assignees_with_pairs(pairs)
+        for santa, assignee in pairs.items():
+            santa_id = self.family.get_member_id(santa)
+            self.assertTrue(self.family[santa_id].is_person_in_last_assignees(assignee))
+            self.assertEqual(list(self.family.get_last_assignee_ids(santa_id)),
+                             [self.family.get_member_id(assignee)])
+
+    def test_ids_after_removing_member(self):
+        """The IDs are renumbered once a member is removed"""
+        self.family.update_last_assignees_with_pairs({"orig2": "new11", "new21": "orig1"})
+        self.family.remove_immediate_family_of_person_with_member("orig1", "new11")
+        self.assertEqual(len(self.family), 3)
+        for position, member in enumerate(self.family):
+            self.assertEqual(self.family.get_member_id(member), position)
+        self.assertEqual(list(self.family.get_last_assignee_ids(self.family.get_member_id("orig2"))), [])
+        self.assertEqual(list(self.family.get_last_assignee_ids(self.family.get_member_id("new21"))),
+                         [self.family.get_member_id("orig1")])
+
+    def test_set_member(self):
+        """A member can be replaced by a new member, and swaps their position with another member"""
+        position = self.family.get_member_id("new11")
+        self.family[position] = "NEW"
+        self.assertEqual(self.family.get_member_id("NEW"), position)
+        self.assertIsNone(self.family.get_member_id("new11"))
+        orig1_position = self.family.get_member_id("orig1")
+        self.family[position] = "orig1"
+        self.assertEqual(self.family.get_member_id("orig1"), position)
+        self.assertEqual(self.family.get_member_id("NEW"), orig1_position)
+
+
+class TestIndexedFamily(TestCase):
+    """Test the name index of ``Family`` class for membership, lookup and deletion"""
+
+    def setUp(self) -> None:
+        """Instantiate ``Family`` class with five members, their immediate family and their last assignees"""
+        self.family = Family(["m1", "m2", "m3", "m4", "m5"])
+        self.family.add_immediate_family_of_person_with_new_member("m1", "m5")
+        self.family.update_last_assignees_with_pairs({"m5": "m2", "m2": "m5", "m3": "m1", "m4": "m3"})
+
+    def assert_ids_consistent(self):
+        """The IDs are the positions and the ID arrays are the same as the members' own links"""
+        for position, member in enumerate(self.family):
+            self.assertEqual(self.family.get_member_id(member), position)
+            self.assertEqual(sorted(self.family[i] for i in self.family.get_immediate_family_ids(position)),
+                             sorted(p for p in member.get_immediate_family() if p in self.family))
+            self.assertEqual([self.family[i] for i in self.family.get_last_assignee_ids(position)],
+                             [p for p in member.get_last_assignees() if p in self.family])
+
+    def test_contains(self):
+        """A member is in the family by the name or an instance of Person"""
+        self.assertIn("m1", self.family)
+        self.assertIn(Person("m5"), self.family)
+        self.assertNotIn("m6", self.family)
+
+    def test_get(self):
+        """A member is returned by the name or an instance of Person, otherwise the default"""
+        self.assertIs(self.family.get("m3"), self.family[self.family.get_member_id("m3")])
+        self.assertIsNone(self.family.get("m6"))
+        self.assertEqual(self.family.get("m6", "none"), "none")
+
+    def test_remove(self):
+        """The last member takes the position of the removed member, and the links to the removed member are gone"""
+        position = self.family.get_member_id("m2")
+        self.family.remove("m2")
+        self.assertNotIn("m2", self.family)
+        self.assertEqual(len(self.family), 4)
+        self.assertEqual(self.family.get_member_id("m5"), position)
+        self.assertEqual(list(self.family.get_last_assignee_ids(position)), [])
+        self.assert_ids_consistent()
+        self.family.remove("m3")
+        self.assert_ids_consistent()
+
+    def test_swap(self):
+        """Two members swap their positions with their links, e.g., by shuffling the family"""
+        households = {str(member): sorted(map(str, member.get_immediate_family())) for member in self.family}
+        last_assignees = {str(member): member.get_last_assignees() for member in self.family}
+        m1, m2 = self.family.get_member_id("m1"), self.family.get_member_id("m2")
+        self.family[m1], self.family[m2] = self.family[m2], self.family[m1]
+        self.assertEqual(self.family.get_member_id("m1"), m2)
+        self.assertEqual(self.family.get_member_id("m2"), m1)
+        self.assert_ids_consistent()
+        random.Random(0).shuffle(self.family)
+        self.assert_ids_consistent()
+        self.assertEqual(self.family, ["m1", "m2", "m3", "m4", "m5"])
+        for member in self.family:
+            self.assertEqual(sorted(str(self.family[i]) for i in self.family.get_immediate_family_ids(
+                self.family.get_member_id(member))), households[str(member)])
+            self.assertEqual(member.get_last_assignees(), last_assignees[str(member)])
+
+    def test_remove_not_member(self):
+        """It will raise 'ValueError' to remove a person who is not a member"""
+        with self.assertRaises(ValueError):
+            self.family.remove("m6")
+
+    def test_remove_last_member(self):
+        """The last member is removed without moving any member"""
+        self.family.remove("m5")
+        self.assertEqual([str(m) for m in self.family], ["m1", "m2", "m3", "m4"])
+        self.assert_ids_consistent()
+
+    def test_delete_slice(self):
+        """The members in the slice are deleted and the IDs stay consistent"""
+        del self.family[1:3]
+        self.assertEqual(len(self.family), 3)
+        self.assertNotIn("m2", self.family)
+        self.assertNotIn("m3", self.family)
+        self.assert_ids_consistent()
+
+    def test_set_member_keeps_links(self):
+        """The links of the other members to the replaced member are gone and the new member's own links are kept"""
+        new_member = Person("new")
+        new_member.update_last_assignees_with("m4")
+        self.family[self.family.get_member_id("m1")] = new_member
+        self.assertNotIn("m1", self.family)
+        self.assertEqual(list(self.family.get_last_assignee_ids(self.family.get_member_id("new"))),
+                         [self.family.get_member_id("m4")])
+        self.assertEqual(list(self.family.get_immediate_family_ids(self.family.get_member_id("m5"))), [])
+
+
+
+class TestHouseholdFamily(TestCase):
+    """Test the households of ``Family`` class, which are the groups of the members linked as immediate family"""
+
+    def setUp(self) -> None:
+        """Instantiate ``Family`` class with the households {h1, h1-1, h1-2} and {h2, h2-1}, and a single s1"""
+        self.family = Family([Person("h1", ["h1-1"]), "h2", "s1"])
+        self.family.add_immediate_family_of_person_with_new_member("h1-1", "h1-2")
+        self.family.add_immediate_family_of_person_with_new_member("h2", "h2-1")
+
+    def household_of(self, name):
+        """Return the names of the household of the member"""
+        return sorted(str(self.family[i]) for i in self.family.get_household_ids(self.family.get_member_id(name)))
+
+    def test_households(self):
+        """The members linked through immediate family are in the same household"""
+        h1 = self.family.get_household_id(self.family.get_member_id("h1"))
+        self.assertEqual(self.family.get_household_id(self.family.get_member_id("h1-2")), h1)
+        self.assertNotEqual(self.family.get_household_id(self.family.get_member_id("h2")), h1)
+        self.assertEqual(self.household_of("h1-2"), ["h1", "h1-1", "h1-2"])
+        self.assertEqual(self.household_of("s1"), ["s1"])
+        self.assertEqual(len(list(self.family.get_households())), 3)
+        self.assertEqual(self.family.get_largest_household_size(), 3)
+
+    def test_households_after_removing_member(self):
+        """The removed member leaves the household and the moved member keeps the household"""
+        self.family.remove("h1")
+        self.assertEqual(self.household_of("h1-1"), ["h1-1", "h1-2"])
+        self.assertEqual(self.household_of("h2-1"), ["h2", "h2-1"])
+        self.family.remove_immediate_family_of_person_with_member("h2", "h2-1")
+        self.assertEqual(self.household_of("h2"), ["h2"])
+
+    def test_households_after_removing_bridging_member(self):
+        """The household is split once the member who linked the others leaves, or is replaced"""
+        self.family.remove_immediate_family_of_person_with_member("h1", "h1-1")
+        self.assertEqual(self.household_of("h1"), ["h1"])
+        self.assertEqual(self.household_of("h1-2"), ["h1-2"])
+        family = Family(["A", "D"])
+        family.add_immediate_family_of_person_with_new_member("A", "B")
+        family.add_immediate_family_of_person_with_new_member("B", "C")
+        family[family.get_member_id("B")] = "E"
+        self.assertEqual(len(list(family.get_households())), 4)
+        family = Family(["A", "D"])
+        family.add_immediate_family_of_person_with_new_member("A", "B")
+        family.add_immediate_family_of_person_with_new_member("B", "C")
+        family.remove_immediate_family_of_person_with_member("A", "B")
+        self.assertTrue(SantaDraw.is_valid_pairs(family.get("A"), family.get("C")))
+        self.assertTrue(SantaDraw(family).is_drawable())
+        self.assertEqual(len(draw_secret_santa_pairs(family)), 3)
+
+    def test_households_after_setting_member(self):
+        """The replaced member leaves the household and the new member joins the household of their immediate family"""
+        self.family[self.family.get_member_id("h1")] = Person("new", ["h2"])
+        self.assertEqual(self.household_of("h1-1"), ["h1-1", "h1-2"])
+        self.assertEqual(self.household_of("new"), ["h2", "h2-1", "new"])
+
+
+class TestFamilyHistory(TestCase):
+    """Test the history of ``Family`` class, which holds the last assignees of the members"""
+
+    def setUp(self) -> None:
+        """Instantiate ``Family`` class of four members with a window of three years, and a member with a history"""
+        m1 = Person("m1")
+        m1.update_last_assignees_with("m2")
+        m1.update_last_assignees_with("NOT_EXIST")
+        self.family = Family([m1, "m2", "m3", "m4"], history_window=3)
+        self.m1 = m1
+
+    def test_history_of_new_members(self):
+        """The history of the family holds the last assignees of the members who are members in their years"""
+        self.assertEqual(self.family.get_history().window, 3)
+        self.assertEqual(list(self.family.get_last_assignee_ids(0)), [1])
+        self.assertEqual(self.family.get_history().year(1)[0], 1)
+        self.assertEqual(self.family.get_history().year(2)[0], NO_ASSIGNEE)
+        self.assertEqual(self.m1.get_last_assignees(), ("m2",))
+        self.assertTrue(self.family.get_history().was_assigned(0, 1))
+        self.assertEqual(Family(self.family).get_history().window, 3)
+        self.assertEqual(Family(["m1", "m2"]).get_history().window, 2)
+        with self.assertRaises(ValueError):
+            Family(["m1", "m2"], history_window=0)
+
+    def test_window_of_history(self):
+        """The members keep the last assignees of the window of the family"""
+        for assignee in ("m3", "m4", "m2"):
+            self.family.update_last_assignees_with_pairs({"m1": assignee})
+        self.assertEqual(self.m1.get_last_assignees(), ("m3", "m4", "m2"))
+        self.family.update_last_assignees_with_pairs({"m1": "m2", "m2": "m3", "m3": "m4", "m4": "m1"})
+        self.assertEqual(self.m1.get_last_assignees(), ("m4", "m2", "m2"))
+        self.assertTrue(self.family.get_history().was_assigned(3, 0))
+
+    def test_members_update_family(self):
+        """The members update their last assignees in the history of the family"""
+        m2 = self.family[1]
+        m2.update_last_assignees_with("m1")
+        self.assertEqual(list(self.family.get_last_assignee_ids(1)), [0])
+        m2.replace_latest_assignee_with("m3")
+        self.assertEqual(list(self.family.get_last_assignee_ids(1)), [2])
+        self.assertEqual(len(m2._last_assignees), 1)
+
+    def test_removed_member_keeps_history(self):
+        """A removed member takes their last assignees back, and the others no longer have the member in the history"""
+        self.family.update_last_assignees_with_pairs({"m1": "m2", "m2": "m3", "m3": "m4", "m4": "m1"})
+        m2 = self.family[1]
+        self.family.remove("m2")
+        self.assertEqual(m2.get_last_assignees(), ("m3",))
+        m2.update_last_assignees_with("m4")
+        self.assertEqual(m2.get_last_assignees(), ("m3", "m4"))
+        self.assertEqual(self.m1.get_last_assignees(), ())
+        self.assertEqual(list(self.family.get_last_assignee_ids(0)), [])
+        self.assertEqual(self.family[self.family.get_member_id("m3")].get_last_assignees(), ("m4",))
+
+    def test_member_of_two_families(self):
+        """The families of the same members see the same last assignees, whichever family is updated"""
+        a, b, c = Person("a"), Person("b"), Person("c")
+        f1 = Family([a, b, c])
+        f2 = Family([a, b], history_window=3)
+        f1.update_last_assignees_with_pairs({"a": "b", "b": "c", "c": "a"})
+        self.assertEqual(a.get_last_assignees(), ("b",))
+        self.assertEqual(list(f2.get_last_assignee_ids(0)), [1])
+        self.assertEqual(list(f2.get_last_assignee_ids(1)), [])
+        f2.update_last_assignees_with_pairs({"a": "b", "b": "a"})
+        f2.update_last_assignees_with_pairs({"a": "b", "b": "a"})
+        self.assertEqual(list(f1.get_last_assignee_ids(0)), [1, 1])
+        self.assertEqual(list(f1.get_last_assignee_ids(1)), [0, 0])
+        self.assertEqual(list(f2.get_last_assignee_ids(0)), [1, 1, 1])
+        self.assertTrue(f1.get_history().was_assigned(2, 0))
+        f2.remove(a)
+        self.assertEqual(list(f1.get_last_assignee_ids(0)), [1, 1])
+        self.assertEqual(list(Family(f1).get_last_assignee_ids(1)), [0, 0])
+        self.assertEqual(list(f1.get_last_assignee_ids(1)), [0, 0])
+
+
+    def test_member_updates_every_family(self):
+        """A member of two families updates the history of both, and each family reads it within its own window"""
+        a, b, c = Person("a"), Person("b"), Person("c")
+        f1 = Family([a, b, c], history_window=1)
+        f2 = Family([a, b, c], history_window=3)
+        for assignee in (b, c, b):
+            a.update_last_assignees_with(assignee)
+        self.assertEqual(list(f1.get_last_assignee_ids(0)), [1])
+        self.assertEqual(list(f2.get_last_assignee_ids(0)), [1, 2, 1])
+        a.replace_latest_assignee_with(c)
+        self.assertEqual(list(f1.get_last_assignee_ids(0)), [2])
+        self.assertEqual(list(f2.get_last_assignee_ids(0)), [1, 2, 2])
+        self.assertFalse(f1.get_history().was_assigned(0, 1))
+        self.assertTrue(a.is_person_in_last_assignees(b))
+        self.assertEqual(a.get_last_assignees(), (b, c, c))
+
+    def test_garbage_collected_family(self):
+        """The members take their last assignees back once their family is garbage-collected"""
+        a, b = Person("a"), Person("b")
+        family = Family([a, b], history_window=3)
+        family.update_last_assignees_with_pairs({"a": "b", "b": "a"})
+        del family
+        self.assertEqual(a.get_last_assignees(), (b,))
+        a.update_last_assignees_with("c")
+        self.assertEqual(a.get_last_assignees(), (b, "c"))
+
+
+class TestFamilyAdd(TestCase):
+    """Test ``add()`` method of ``Family`` class"""
+
+    def test_add_members(self):
+        """A new member is appended with the next ID, and an existing member keeps their ID"""
+        family = Family(["m1"])
+        m2 = Person("m2")
+        m2.update_last_assignees_with("m1")
+        self.assertEqual(family.add(m2), 1)
+        self.assertEqual(family.add("m3"), 2)
+        self.assertEqual(family.add(Person("m1")), 0)
+        self.assertEqual(family, ["m1", "m2", "m3"])
+        self.assertIs(family[1], m2)
+        self.assertEqual(list(family.get_last_assignee_ids(1)), [0])
+        self.assertEqual(len(family.get_household_ids(2)), 1)
+
+
+class TestLargeFamily(TestCase):
+    """Test the construction and the equality of ``Family`` class with a large roster"""
+
+    def setUp(self) -> None:
+        """Instantiate 10000 persons in households of four who are linked only through the first person"""
+        self.persons = [Person("p{}".format(i)) for i in range(10000)]
+        for head in range(0, len(self.persons), 4):
+            for i in range(head + 1, head + 4):
+                self.persons[head].add_immediate_family_with(self.persons[i])
+                self.persons[i].add_immediate_family_with(self.persons[head])
+
+    def test_immediate_family_closure(self):
+        """The immediate family who are not in the given members are interned exactly once in their household"""
+        family = Family(self.persons[::4])
+        self.assertEqual(len(family), len(self.persons))
+        self.assertEqual(len({str(member) for member in family}), len(self.persons))
+        for position, member in enumerate(family):
+            self.assertEqual(family.get_member_id(member), position)
+            self.assertEqual(len(family.get_immediate_family_ids(position)), 3)
+
+    def test_eq_regardless_of_order(self):
+        """Families and sequences of the same members are the same regardless of the order"""
+        family = Family(self.persons)
+        self.assertEqual(family, Family(self.persons[::4]))
+        self.assertEqual(family, list(reversed(self.persons)))
+        self.assertEqual(family, [str(person) for person in self.persons])
+
+    def test_not_eq_with_different_members(self):
+        """Sequences with a different or duplicated member are different"""
+        family = Family(self.persons)
+        self.assertNotEqual(family, self.persons[:-1] + ["p0"])
+        self.assertNotEqual(family, self.persons[:-1])
+        self.assertNotEqual(family, self.persons[:-1] + ["different"])
+
+
 if __name__ == '__main__':
     main()
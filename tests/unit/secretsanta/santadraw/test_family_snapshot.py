@@ -0,0 +1,116 @@
+import os
+import tempfile
+from unittest import TestCase, main
+
+from secretsanta.santadraw.budget import DrawTimeout
+from secretsanta.santadraw.family import Family
+from secretsanta.santadraw.family_snapshot import FamilySnapshot, draw_snapshot, write_snapshot
+from secretsanta.utils.assignment_history import NO_ASSIGNEE
+
+
+class TestFamilySnapshot(TestCase):
+    """Test ``FamilySnapshot`` class and ``write_snapshot()`` which map a family from a binary snapshot file"""
+
+    def setUp(self) -> None:
+        """Each test case will have a snapshot of a family of five members with a household and a year of history"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "family.snapshot")
+        self.family = Family(["m1", "m2", "m3", "m4", "산타"], history_window=3)
+        self.family.add_immediate_family_of_person_with_new_member("m1", "m2")
+        self.family.update_last_assignees_with_pairs({"m1": "m3", "m2": "m4", "m3": "산타", "m4": "m1", "산타": "m2"})
+        self.family.update_last_assignees_with_pairs({"m3": "m1"})
+        write_snapshot(self.family, self.path)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_snapshot(self):
+        """The snapshot has the names, the households and the history of the family by the IDs"""
+        with FamilySnapshot(self.path) as snapshot:
+            self.assertEqual(len(snapshot), 5)
+            self.assertEqual(snapshot.window, 3)
+            self.assertEqual([snapshot.name(i) for i in range(5)], ["m1", "m2", "m3", "m4", "산타"])
+            household_ids = snapshot.household_ids
+            self.assertEqual(household_ids[0], household_ids[1])
+            self.assertEqual(len(set(household_ids)), 4)
+            self.assertEqual(sorted(map(list, snapshot.households())), [[0, 1], [2], [3], [4]])
+            self.assertEqual(list(snapshot.year(0)), [NO_ASSIGNEE] * 5)
+            self.assertEqual(list(snapshot.year(1)), [NO_ASSIGNEE, NO_ASSIGNEE, 4, NO_ASSIGNEE, NO_ASSIGNEE])
+            self.assertEqual(list(snapshot.year(2)), [2, 3, 0, 0, 1])
+            self.assertEqual(list(snapshot.last_assignee_ids(2)), [4, 0])
+            self.assertEqual(list(snapshot.last_assignee_ids(0)), [2])
+            del household_ids
+
+    def test_household_ids_of_members(self):
+        """The household ID of each member is the smallest ID of the household, even after the members change"""
+        family = Family(["a", "b"])
+        family.add_immediate_family_of_person_with_new_member("a", "c")
+        family[2] = "d"
+        family.add_immediate_family_of_person_with_new_member("b", "e")
+        write_snapshot(family, self.path)
+        with FamilySnapshot(self.path) as snapshot:
+            self.assertEqual(list(snapshot.household_ids), [0, 1, 2, 1])
+            self.assertEqual(sorted(map(list, snapshot.households())), [[0], [1, 3], [2]])
+
+    def test_to_family(self):
+        """The family of the snapshot has the same members, households and history"""
+        with FamilySnapshot(self.path) as snapshot:
+            family = snapshot.to_family()
+        self.assertEqual(family, self.family)
+        self.assertEqual(family.get_history().window, 3)
+        self.assertTrue(family[1].is_person_in_immediate_family("m1"))
+        for member_id in range(5):
+            self.assertEqual(family.get_last_assignee_ids(member_id), self.family.get_last_assignee_ids(member_id))
+            self.assertEqual(family.get_household_ids(member_id), self.family.get_household_ids(member_id))
+        self.assertEqual(family.get_history().year(1), self.family.get_history().year(1))
+
+    def test_draw_snapshot(self):
+        """The draw of the snapshot is valid for the family and the same with the same random seed"""
+        with FamilySnapshot(self.path) as snapshot:
+            assignment = draw_snapshot(snapshot, random_seed=1)
+            self.assertEqual(assignment, draw_snapshot(snapshot, random_seed=1))
+            self.assertEqual(sorted(assignment), list(range(5)))
+            for santa, assignee in enumerate(assignment):
+                self.assertNotIn(assignee, self.family.get_household_ids(santa))
+                self.assertNotIn(assignee, self.family.get_last_assignee_ids(santa))
+            self.assertEqual(len(draw_snapshot(snapshot, strategy="matching")), 5)
+            with self.assertRaises(DrawTimeout):
+                draw_snapshot(snapshot, max_nodes=0)
+
+    def test_draw_snapshot_of_large_family(self):
+        """The matching of a large snapshot is drawn from the forbidden pairs only, without the mask of every pair"""
+        family = Family(["m{}".format(i) for i in range(20000)], history_window=1)
+        for i in range(0, 19998, 3):
+            family.add_immediate_family_of_person_with_new_member(family[i], family[i + 1])
+        family.update_last_assignees_with_ids([(i + 3) % 20000 for i in range(20000)])
+        write_snapshot(family, self.path)
+        with FamilySnapshot(self.path) as snapshot:
+            assignment = draw_snapshot(snapshot, random_seed=1, strategy="matching", deadline=10)
+        self.assertEqual(sorted(assignment), list(range(20000)))
+        for santa, assignee in enumerate(assignment):
+            self.assertNotEqual(family.get_household_id(santa), family.get_household_id(assignee))
+            self.assertNotEqual(assignee, (santa + 3) % 20000)
+
+    def test_invalid_draw_snapshot(self):
+        """The draw of the snapshot fails as ``draw_secret_santa_pairs()`` does"""
+        family = Family(["m1", "m2", "m3"])
+        family.add_immediate_family_of_person_with_new_member("m1", "m2")
+        for members in (family, Family(["m1"])):
+            write_snapshot(members, self.path)
+            with FamilySnapshot(self.path) as snapshot:
+                with self.assertRaises(ValueError):
+                    draw_snapshot(snapshot)
+
+    def test_invalid_file(self):
+        """A file which is not a snapshot of the supported version or is truncated is not mapped"""
+        with open(self.path, "rb") as f:
+            data = f.read()
+        for invalid in (b"not a snapshot" * 4, data[:4] + b"\x02" + data[5:], data[:-1]):
+            with open(self.path, "wb") as f:
+                f.write(invalid)
+            with self.assertRaises(ValueError):
+                FamilySnapshot(self.path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+import os
+import tempfile
+from unittest import TestCase, main
+
+from secretsanta.santadraw.family import Family
+from secretsanta.santadraw.family_store import FamilyStore
+from secretsanta.santadraw.person import Person
+
+
+class TestFamilyStore(TestCase):
+    """Test ``FamilyStore`` class which persists a family and the pairs of every year in SQLite"""
+
+    def setUp(self) -> None:
+        """Each test case will have a store of a family of four members where m1 and m2 are in a household"""
+        self.family = Family(["m1", "m2", "m3", "m4"])
+        self.family.add_immediate_family_of_person_with_new_member("m1", "m2")
+        self.store = FamilyStore()
+        self.store.save_family(self.family)
+
+    def tearDown(self) -> None:
+        self.store.close()
+
+    def test_load_family(self):
+        """The loaded family has the same members and households"""
+        family = self.store.load_family()
+        self.assertEqual(family, self.family)
+        self.assertEqual([str(member) for member in family], ["m1", "m2", "m3", "m4"])
+        self.assertTrue(family[0].is_person_in_immediate_family("m2"))
+        self.assertEqual(family.get_household_id(0), family.get_household_id(1))
+        self.assertNotEqual(family.get_household_id(0), family.get_household_id(2))
+        self.assertEqual(family[0].get_last_assignees(), ())
+
+    def test_load_family_with_history(self):
+        """The loaded family has the pairs of the last years in its history window"""
+        self.store.save_pairs(2018, {"m1": "m3", "m2": "m4", "m3": "m1", "m4": "m2"})
+        self.store.save_pairs(2019, {"m1": "m4", "m2": "m3", "m3": "m2", "m4": "m1"})
+        self.store.save_pairs(2020, {"m1": "m3", "m2": "m4", "m3": "m2", "m4": "m1"})
+        family = self.store.load_family()
+        self.assertEqual(family.get("m1").get_last_assignees(), ("m4", "m3"))
+        self.assertEqual(family.get("m3").get_last_assignees(), ("m2", "m2"))
+        family = self.store.load_family(history_window=3)
+        self.assertEqual(family.get("m1").get_last_assignees(), ("m3", "m4", "m3"))
+        with self.assertRaises(ValueError):
+            self.store.load_family(history_window=0)
+
+    def test_save_pairs(self):
+        """The pairs of a year replace the saved pairs of the year, and the pairs of non-members are ignored"""
+        self.store.save_pairs(2019, {"m1": "m3", "m2": "m4", "m3": "m1", "m4": "m2"})
+        self.store.save_pairs(2020, {Person("m1"): Person("m4"), "m2": "m3", "m3": "NOT_EXIST", "NOT_EXIST": "m1"})
+        self.store.save_pairs(2019, {"m1": "m3", "m2": "m4", "m3": "m2", "m4": "m1"})
+        self.assertEqual(self.store.get_years(), [2019, 2020])
+        self.assertEqual(self.store.get_assignees("m1"), [(2019, "m3"), (2020, "m4")])
+        self.assertEqual(self.store.get_assignees(Person("m3")), [(2019, "m2")])
+        self.assertEqual(self.store.get_santas("m3"), [(2019, "m1"), (2020, "m2")])
+        self.assertEqual(self.store.get_santas("m3", since=2020), [(2020, "m2")])
+        self.assertEqual(self.store.get_assignees("NOT_EXIST"), [])
+
+    def test_save_family_again(self):
+        """The saved family is replaced, where the members who left are deleted with their assignments"""
+        self.store.save_pairs(2020, {"m1": "m3", "m2": "m4", "m3": "m1", "m4": "m2"})
+        self.family.remove_immediate_family_of_person_with_member("m1", "m2")
+        self.family.add_immediate_family_of_person_with_new_member("m3", "m5")
+        self.store.save_family(self.family)
+        family = self.store.load_family()
+        self.assertEqual(family, Family(["m1", "m3", "m4", "m5"]))
+        self.assertEqual(family.get_largest_household_size(), 2)
+        self.assertTrue(family.get("m5").is_person_in_immediate_family("m3"))
+        self.assertEqual(family.get("m1").get_last_assignees(), ("m3",))
+        self.assertEqual(family.get("m4").get_last_assignees(), ())
+        self.assertEqual(self.store.get_santas("m4"), [])
+
+    def test_persistence(self):
+        """The family and the pairs survive closing the database"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "santa.db")
+            with FamilyStore(path) as store:
+                store.save_family(self.family)
+                store.save_pairs(2020, {"m1": "m3", "m2": "m4", "m3": "m1", "m4": "m2"})
+            with FamilyStore(path) as store:
+                family = store.load_family()
+            self.assertEqual(family, self.family)
+            self.assertEqual(family.get("m4").get_last_assignees(), ("m2",))
+
+
+if __name__ == '__main__':
+    main()
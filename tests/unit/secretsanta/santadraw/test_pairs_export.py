@@ -0,0 +1,58 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from unittest import TestCase, main
+
+from secretsanta.santadraw.pairs_export import export_pairs, iter_pair_chunks
+from secretsanta.santadraw.person import Person
+
+
+class TestPairsExport(TestCase):
+    """Test ``iter_pair_chunks()`` and ``export_pairs()`` which export the pairs chunk by chunk"""
+
+    def setUp(self) -> None:
+        """Each test case will have the pairs of five members, one of whom has a name to quote in CSV"""
+        names = ["m1", "m2", "m3", "Kim, Narae", "산타"]
+        self.santa_pairs = {Person(santa): Person(assignee) for santa, assignee in zip(names, names[1:] + names[:1])}
+        self.records = [(santa, assignee) for santa, assignee in zip(names, names[1:] + names[:1])]
+
+    def test_iter_pair_chunks(self):
+        """The records are yielded in chunks of the given size"""
+        chunks = list(iter_pair_chunks(self.santa_pairs, chunksize=2))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual([record for chunk in chunks for record in chunk], list(self.santa_pairs.items()))
+        self.assertEqual(list(iter_pair_chunks({})), [])
+        with self.assertRaises(ValueError):
+            iter_pair_chunks(self.santa_pairs, chunksize=0)
+
+    def test_export_csv_to_path(self):
+        """The records are written to the CSV file by the extension of the path"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "reveal.csv")
+            self.assertEqual(export_pairs(self.santa_pairs, path, chunksize=2), 5)
+            with open(path, newline="", encoding="utf-8") as f:
+                rows = list(csv.reader(f))
+        self.assertEqual(rows, [["santa", "assignee"]] + [list(record) for record in self.records])
+
+    def test_export_jsonl_to_sink(self):
+        """The records are written to the binary sink as JSONL"""
+        sink = io.BytesIO()
+        self.assertEqual(export_pairs(self.santa_pairs, sink, "jsonl", chunksize=3), 5)
+        lines = sink.getvalue().decode("utf-8").splitlines()
+        self.assertEqual([json.loads(line) for line in lines],
+                         [{"santa": santa, "assignee": assignee} for santa, assignee in self.records])
+
+    def test_invalid_export(self):
+        """An unknown format or chunk size is not exported"""
+        with self.assertRaises(ValueError):
+            export_pairs(self.santa_pairs, io.BytesIO())
+        with self.assertRaises(ValueError):
+            export_pairs(self.santa_pairs, "reveal.txt")
+        with self.assertRaises(ValueError):
+            export_pairs(self.santa_pairs, io.BytesIO(), "csv", chunksize=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -28,6 +28,21 @@ class TestPerson(TestCase):
         """Test __eq__ with a same name string"""
         self.assertEqual(self.person, "Narae Kim")
 
+    def test_person_eq_with_itself(self):
+        """Test __eq__ with the same instance"""
+        self.assertTrue(self.person == self.person)
+        self.assertFalse(self.person != self.person)
+
+    def test_person_not_eq_with_different_name(self):
+        """Test __eq__ with a different Person instance and a different name string"""
+        self.assertNotEqual(self.person, Person("DIFFERENT"))
+        self.assertNotEqual(self.person, "DIFFERENT")
+
+    def test_person_eq_with_non_str_name(self):
+        """Test __eq__ with a name which is not a string"""
+        self.assertEqual(Person(2022), "2022")
+        self.assertEqual(Person(2022), Person("2022"))
+
     def test_person_hash_with_same_name_person(self):
         """Test __hash__ with a new Person instance with the same name"""
         self.assertEqual(hash(self.person), hash(Person("Narae Kim")))
@@ -78,6 +93,43 @@ class TestPerson(TestCase):
         self.assertTrue(self.person.is_person_in_last_assignees("NEW2"))
         self.assertTrue(self.person.is_person_in_last_assignees("NEW3"))
 
+    def test_replace_latest_assignee_with(self):
+        """Test ``replace_latest_assignee_with()``, which adds the person if there is no assignee yet"""
+        self.person.replace_latest_assignee_with("NEW1")
+        self.assertEqual(self.person.get_last_assignees(), ("NEW1",))
+
+        self.person.update_last_assignees_with("NEW2")
+        self.person.replace_latest_assignee_with("NEW3")
+        self.assertEqual(self.person.get_last_assignees(), ("NEW1", "NEW3"))
+
+    def test_person_without_dict(self):
+        """``Person`` is slotted so that no attributes can be added to the instance"""
+        self.assertFalse(hasattr(self.person, "__dict__"))
+        with self.assertRaises(AttributeError):
+            self.person.new_attribute = "NEW"
+
+    def test_name_is_read_only(self):
+        """The name cannot be changed since the hash depends on it"""
+        with self.assertRaises(AttributeError):
+            self.person.name = "NEW"
+
+    def test_empty_containers(self):
+        """A new person has no last assignees nor immediate family"""
+        self.assertEqual(self.person.get_last_assignees(), ())
+        self.assertEqual(self.person.get_immediate_family(), set())
+        self.assertFalse(self.person.is_person_in_last_assignees("Narae Kim"))
+        self.assertFalse(self.person.is_person_in_immediate_family("Narae Kim"))
+        self.person.remove_immediate_family_with("NOT_EXIST")  # no error
+        self.assertEqual(self.person.get_immediate_family(), set())
+
+    def test_get_last_assignees(self):
+        """Test ``get_last_assignees()``, which returns the last two assignees from the oldest"""
+        self.assertEqual(self.person.get_last_assignees(), ())
+        self.person.update_last_assignees_with("NEW1")
+        self.person.update_last_assignees_with("NEW2")
+        self.person.update_last_assignees_with("NEW3")
+        self.assertEqual(self.person.get_last_assignees(), ("NEW2", "NEW3"))
+
 
 class TestPersonImmediateFamily(TestCase):
     """Test ``Person`` with a name and immediate family"""
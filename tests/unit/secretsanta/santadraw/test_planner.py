@@ -0,0 +1,97 @@
+from unittest import TestCase, main
+from unittest.mock import patch
+
+from secretsanta.santadraw import plan_years
+from secretsanta.santadraw.budget import DrawTimeout
+from secretsanta.santadraw.family import Family
+from secretsanta.santadraw.santa_draw import draw_secret_santa_pairs
+from secretsanta.utils.validation import \
+    is_distinct_assignee_unique_and_not_in_last_two_pairs_and_not_in_immediate_family
+
+validate_santa_draw = is_distinct_assignee_unique_and_not_in_last_two_pairs_and_not_in_immediate_family
+
+
+class TestPlanYears(TestCase):
+    """Test ``plan_years()`` which plans the pairs of many years jointly"""
+
+    def assert_valid_schedule(self, family, schedule, prev_pairs1=None, prev_pairs2=None):
+        """Every year of the schedule is valid with the two years before"""
+        for santa_pairs in schedule:
+            self.assertTrue(validate_santa_draw(family, santa_pairs, prev_pairs1, prev_pairs2))
+            prev_pairs1, prev_pairs2 = santa_pairs, prev_pairs1
+
+    def test_plan_of_small_families(self):
+        """The small families are planned for many years, where the draws year by year may come to a dead end"""
+        for size in range(4, 8):
+            family = Family(["m{}".format(i) for i in range(size)])
+            schedule = plan_years(family, years=10, random_seed=size)
+            self.assertEqual(len(schedule), 10)
+            self.assert_valid_schedule(family, schedule)
+            self.assertEqual(family[0].get_last_assignees(), ())
+
+    def test_plan_with_exhaustive_search(self):
+        """The first years are searched at once if the random tries fail"""
+        with patch("secretsanta.santadraw.planner._PLAN_RESTARTS", 0):
+            for size in range(4, 8):
+                family = Family(["m{}".format(i) for i in range(size)])
+                self.assert_valid_schedule(family, plan_years(family, years=5, random_seed=size))
+            with self.assertRaises(ValueError):
+                plan_years(["Narae Kim", "Jay Kim", "Jung Lee"], years=3)
+
+    def test_plan_after_last_assignees(self):
+        """The plan continues the last assignees of the members"""
+        family = Family(["m{}".format(i) for i in range(5)])
+        prev_pairs2 = draw_secret_santa_pairs(family, random_seed=1)
+        prev_pairs1 = draw_secret_santa_pairs(family, random_seed=2)
+        schedule = plan_years(family, years=4, random_seed=3)
+        self.assert_valid_schedule(family, schedule, prev_pairs1, prev_pairs2)
+
+    def test_plan_of_three_members(self):
+        """A family of three members has two years at most, and the third year raises 'ValueError'"""
+        family = Family(["Narae Kim", "Jay Kim", "Jung Lee"])
+        self.assert_valid_schedule(family, plan_years(family, years=2))
+        with self.assertRaises(ValueError):
+            plan_years(family, years=3)
+
+    def test_plan_of_large_family(self):
+        """A family of a few hundred members in households is planned for ten years"""
+        family = Family(["h{}".format(i) for i in range(100)])
+        for i in range(100):
+            for j in range(2):
+                family.add_immediate_family_of_person_with_new_member("h{}".format(i), "h{}-{}".format(i, j))
+        schedule = plan_years(family, years=10, random_seed=7)
+        self.assert_valid_schedule(family, schedule)
+
+    def test_plan_with_history_window(self):
+        """The plan follows the window of the history of the family"""
+        family = Family(["m{}".format(i) for i in range(5)], history_window=3)
+        schedule = plan_years(family, years=8, random_seed=1)
+        for santa in family:
+            assignees = [santa_pairs[santa] for santa_pairs in schedule]
+            for year in range(len(assignees) - 3):
+                self.assertEqual(len(set(assignees[year:year + 4])), 4)
+        with self.assertRaises(ValueError):
+            plan_years(Family(["m{}".format(i) for i in range(4)], history_window=3), years=4)
+
+    def test_same_plan_with_same_random_seed(self):
+        """The plans with the same random seed are the same"""
+        members = ["m{}".format(i) for i in range(20)]
+        self.assertEqual(plan_years(members, years=5, random_seed=1), plan_years(members, years=5, random_seed=1))
+
+    def test_invalid_plan(self):
+        """It will raise 'ValueError' for an invalid number of the years or members, or 'DrawTimeout' out of budget"""
+        with self.assertRaises(ValueError):
+            plan_years(["m1", "m2"], years=0)
+        with self.assertRaises(ValueError):
+            plan_years(["ALONE"], years=1)
+        family = Family(["m1"])
+        for i in range(3):
+            family.add_immediate_family_of_person_with_new_member("m1", "h{}".format(i))
+        with self.assertRaises(ValueError):
+            plan_years(family, years=1)
+        with self.assertRaises(DrawTimeout):
+            plan_years(["m{}".format(i) for i in range(20)], years=3, max_nodes=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+import io
+import os
+import tempfile
+from pathlib import Path
+from unittest import TestCase, main
+
+from secretsanta.santadraw.family import Family
+from secretsanta.santadraw.roster_import import RosterRow, import_roster, iter_roster
+
+CSV_ROSTER = """name,household,2018,2019,2020
+m1,h1,m3,m4,m5
+m2,h1,m4,m5,NOT_EXIST
+m3,,m1,,m4
+m4,h2,m2,m1,
+m5,h2,,m3,m1
+"""
+
+JSONL_ROSTER = """{"name": "m1", "household": "h1", "assignees": {"2018": "m3", "2019": "m4", "2020": "m5"}}
+{"name": "m2", "household": "h1", "assignees": {"2019": "m5", "2020": "NOT_EXIST"}}
+
+{"name": "m3", "assignees": {"2018": "m1", "2020": "m4"}}
+{"name": "m4", "household": "h2", "assignees": {"2018": "m2", "2019": "m1"}}
+{"name": "m5", "household": "h2", "assignees": {"2019": "m3", "2020": "m1"}}
+"""
+
+
+class TestIterRoster(TestCase):
+    """Test ``iter_roster()`` which reads a roster chunk by chunk"""
+
+    def test_chunks_of_csv(self):
+        """The rows of the CSV roster are read in chunks"""
+        chunks = list(iter_roster(io.StringIO(CSV_ROSTER), "csv", chunksize=2))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual(chunks[0][0], RosterRow("m1", "h1", {2018: "m3", 2019: "m4", 2020: "m5"}))
+        self.assertEqual(chunks[1][0], RosterRow("m3", "", {2018: "m1", 2019: "", 2020: "m4"}))
+
+    def test_chunks_of_jsonl(self):
+        """The rows of the JSONL roster are read in chunks, where the blank lines are skipped"""
+        chunks = list(iter_roster(io.StringIO(JSONL_ROSTER), "jsonl", chunksize=3))
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 2])
+        self.assertEqual(chunks[0][2], RosterRow("m3", None, {2018: "m1", 2020: "m4"}))
+
+    def test_invalid_roster(self):
+        """An unknown format, chunk size or an invalid row is not read"""
+        with self.assertRaises(ValueError):
+            iter_roster("roster.txt")
+        with self.assertRaises(ValueError):
+            iter_roster(io.StringIO(CSV_ROSTER), "csv", chunksize=0)
+        for roster, roster_format in (("household,2020\nh1,m1\n", "csv"), ("name,year\nm1,m2\n", "csv"),
+                                      ("name,household\nm1\n", "csv"), ('{"household": "h1"}\n', "jsonl"),
+                                      ('{"name": "m1", "assignees": {"last": "m2"}}\n', "jsonl"), ("[\n", "jsonl")):
+            with self.assertRaises(ValueError):
+                list(iter_roster(io.StringIO(roster), roster_format))
+
+
+class TestImportRoster(TestCase):
+    """Test ``import_roster()`` which imports a roster into a family in a single pass"""
+
+    def assert_roster(self, family: Family):
+        """The family of the roster has the members, the households and the history of the last two years"""
+        self.assertEqual([str(member) for member in family], ["m1", "m2", "m3", "m4", "m5"])
+        self.assertTrue(family.get("m2").is_person_in_immediate_family("m1"))
+        self.assertEqual(family.get_household_ids(3), family.get_household_ids(4))
+        self.assertEqual(family.get_largest_household_size(), 2)
+        self.assertEqual(family.get("m1").get_last_assignees(), ("m4", "m5"))
+        self.assertEqual(family.get("m2").get_last_assignees(), ("m5",))
+        self.assertEqual(family.get("m3").get_last_assignees(), ("m4",))
+        self.assertEqual(family.get("m4").get_last_assignees(), ("m1",))
+        self.assertEqual(family.get("m5").get_last_assignees(), ("m3", "m1"))
+
+    def test_import_csv(self):
+        """The CSV roster is imported from a file by the extension"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "roster.CSV")
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                f.write(CSV_ROSTER)
+            self.assert_roster(import_roster(path, chunksize=2))
+
+    def test_import_path(self):
+        """The roster is imported from any path-like object"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory, "roster.jsonl")
+            path.write_text(JSONL_ROSTER, encoding="utf-8")
+            self.assert_roster(import_roster(path))
+
+    def test_import_jsonl(self):
+        """The JSONL roster is imported from a text file object"""
+        self.assert_roster(import_roster(io.StringIO(JSONL_ROSTER), "jsonl", chunksize=1))
+
+    def test_import_with_history_window(self):
+        """The years in the history window of the family are imported, even if they are not in order"""
+        roster = "name,2020,2018,2019\nm1,m2,m3,m4\nm2,m3,m4,m1\nm3,m4,m1,m2\nm4,m1,m2,m3\n"
+        family = import_roster(io.StringIO(roster), "csv", history_window=3)
+        self.assertEqual(family.get("m1").get_last_assignees(), ("m3", "m4", "m2"))
+        family = import_roster(io.StringIO(roster), "csv", history_window=1)
+        self.assertEqual(family.get("m1").get_last_assignees(), ("m2",))
+        self.assertEqual(family.get("m4").get_last_assignees(), ("m1",))
+
+    def test_invalid_members(self):
+        """A member without a name or in the roster twice is not imported"""
+        for roster in ("name\nm1\n\n", "name\nm1\nm2\nm1\n", "name,household\nm1,h1\n,h1\n"):
+            with self.assertRaises(ValueError):
+                import_roster(io.StringIO(roster), "csv")
+
+
+if __name__ == '__main__':
+    main()
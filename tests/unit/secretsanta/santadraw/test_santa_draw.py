@@ -1,5 +1,10 @@
+import io
+import random
 from unittest import TestCase, main
+from unittest.mock import patch
 
+from secretsanta.santadraw.budget import CancellationToken, DrawCancelled, DrawTimeout
+from secretsanta.santadraw.family import Family
 from secretsanta.santadraw.santa_draw import SantaDraw
 from secretsanta.santadraw.person import Person
 from secretsanta.utils.validation import \
@@ -28,6 +33,11 @@ class TestSantaDrawWithLessThanTwoMembers(TestCase):
         with self.assertRaises(ValueError):
             drawer.assign_santa_to_everyone()
 
+    def test_is_drawable(self):
+        """Santa Draw is not drawable with less than two members"""
+        self.assertFalse(SantaDraw().is_drawable())
+        self.assertFalse(SantaDraw(["ALONE"]).is_drawable())
+
 
 class TestSantaDrawWithThreeMembers(TestCase):
     """Santa Draw with three members for pair assignment"""
@@ -70,9 +80,18 @@ class TestSantaDrawWithThreeMembers(TestCase):
         self.assertTrue(validate_santa_draw(self.drawer.get_family_members(), second_santa_pairs, first_santa_pairs))
 
         # third time
+        self.assertFalse(self.drawer.is_drawable())
         with self.assertRaises(ValueError):
             self.drawer.assign_santa_to_everyone()
 
+    def test_is_drawable(self):
+        """Three members are drawable for the first two years only"""
+        self.assertTrue(self.drawer.is_drawable())
+        self.drawer.assign_santa_to_everyone()
+        self.assertTrue(self.drawer.is_drawable())
+        self.drawer.assign_santa_to_everyone()
+        self.assertFalse(self.drawer.is_drawable())
+
 
 class TestSantaDrawWithFourMembers(TestCase):
     """Santa Draw with four members for pair assignment"""
@@ -135,6 +154,170 @@ class TestSantaDrawWithManyMembers(TestCase):
             prev_pairs = santa_pairs
 
 
+class TestSantaDrawWithLargeFamily(TestCase):
+    """Santa Draw with a large family, which was not feasible by trying all possible combinations"""
+
+    def test_successful_santa_draw_with_200_members_multiple_times(self):
+        """Try pair assignment of Santa Draw with 200 family members multiple times"""
+        drawer = SantaDraw(["m{}".format(i) for i in range(200)])
+        family = drawer.get_family_members()
+        prev_prev_pairs = None
+        prev_pairs = None
+        for _ in range(3):
+            santa_pairs = drawer.assign_santa_to_everyone()
+            self.assertTrue(validate_santa_draw(family, santa_pairs, prev_pairs, prev_prev_pairs))
+            prev_prev_pairs = prev_pairs
+            prev_pairs = santa_pairs
+
+    def test_successful_santa_draw_with_large_immediate_families(self):
+        """Try pair assignment of Santa Draw with 20 immediate families of 10 members"""
+        drawer = SantaDraw(["h{}".format(i) for i in range(20)])
+        family = drawer.get_family_members()
+        for i in range(20):
+            for j in range(9):
+                family.add_immediate_family_of_person_with_new_member("h{}".format(i), "h{}-{}".format(i, j))
+        self.assertEqual(len(family), 200)
+        santa_pairs = drawer.assign_santa_to_everyone()
+        self.assertTrue(validate_santa_draw(family, santa_pairs))
+
+    def test_failed_santa_draw_with_one_immediate_family(self):
+        """Nobody can be assigned when everyone else is in their immediate family. It will raise 'ValueError'"""
+        drawer = SantaDraw(["orig"])
+        family = drawer.get_family_members()
+        for i in range(30):
+            family.add_immediate_family_of_person_with_new_member("orig", "new{}".format(i))
+        self.assertFalse(drawer.is_drawable())
+        with self.assertRaises(ValueError):
+            drawer.assign_santa_to_everyone()
+
+    def test_santa_draw_with_households(self):
+        """Nobody is assigned to their household even if they are not immediate family of each other directly"""
+        drawer = SantaDraw(["h{}".format(i) for i in range(10)])
+        family = drawer.get_family_members()
+        for i in range(0, 10, 2):
+            family.add_immediate_family_of_person_with_new_member("h{}".format(i), "h{}".format(i + 1))
+            family.add_immediate_family_of_person_with_new_member("h{}".format(i + 1), "h{}-1".format(i))
+        for _ in range(3):
+            santa_pairs = drawer.assign_santa_to_everyone()
+            for santa, assignee in santa_pairs.items():
+                self.assertNotEqual(family.get_household_id(family.get_member_id(santa)),
+                                    family.get_household_id(family.get_member_id(assignee)))
+
+    def test_failed_santa_draw_with_household_of_more_than_half(self):
+        """A household of more than half of the family cannot be assigned. It will raise 'ValueError'"""
+        drawer = SantaDraw(["m{}".format(i) for i in range(5)])
+        family = drawer.get_family_members()
+        for i in range(1, 6):
+            family.add_immediate_family_of_person_with_new_member("m0", "h{}".format(i))
+        self.assertEqual(family.get_largest_household_size(), 6)
+        self.assertFalse(drawer.is_drawable())
+        with self.assertRaises(ValueError):
+            drawer.assign_santa_to_everyone()
+
+
+class TestSantaDrawWithMatchingStrategy(TestCase):
+    """Santa Draw with the "matching" strategy for pair assignment"""
+
+    def test_successful_santa_draw_with_7_members_multiple_times(self):
+        """Try pair assignment of Santa Draw with an odd number of family members multiple times"""
+        drawer = SantaDraw(["m1", "m2", "m3", "m4", "m5", "m6", "m7"])
+        family = drawer.get_family_members()
+        prev_prev_pairs = None
+        prev_pairs = None
+        for _ in range(100):  # test for 100 times
+            santa_pairs = drawer.assign_santa_to_everyone(strategy="matching")
+            self.assertTrue(validate_santa_draw(family, santa_pairs, prev_pairs, prev_prev_pairs))
+            prev_prev_pairs = prev_pairs
+            prev_pairs = santa_pairs
+
+    def test_successful_santa_draw_with_500_members(self):
+        """Try pair assignment of Santa Draw with 500 family members"""
+        drawer = SantaDraw(["m{}".format(i) for i in range(500)])
+        santa_pairs = drawer.assign_santa_to_everyone(strategy="matching")
+        self.assertTrue(validate_santa_draw(drawer.get_family_members(), santa_pairs))
+
+    def test_failed_santa_draw_at_third_times(self):
+        """There are only two true cases for three members and no possible pairs on the third year"""
+        drawer = SantaDraw(["Narae Kim", "Jay Kim", "Jung Lee"])
+        drawer.assign_santa_to_everyone(strategy="matching")
+        drawer.assign_santa_to_everyone(strategy="matching")
+        with self.assertRaises(ValueError):
+            drawer.assign_santa_to_everyone(strategy="matching")
+
+    def test_unknown_strategy(self):
+        """Santa Draw cannot assign pairs with an unknown strategy. It will raise 'ValueError'"""
+        drawer = SantaDraw(["m1", "m2", "m3"])
+        with self.assertRaises(ValueError):
+            drawer.assign_santa_to_everyone(strategy="UNKNOWN")
+
+
+class TestSantaDrawWithRandomStream(TestCase):
+    """Santa Draw with the random stream of each instance"""
+
+    def setUp(self) -> None:
+        """Each test case will have those members for Santa Draw"""
+        self.members = ["m{}".format(i) for i in range(50)]
+
+    def test_same_pairs_with_same_random_seed(self):
+        """The draws with the same random seed have the same pairs"""
+        for strategy in ("backtracking", "matching"):
+            santa_pairs = SantaDraw(self.members).assign_santa_to_everyone(random_seed=7, strategy=strategy)
+            same_pairs = SantaDraw(self.members).assign_santa_to_everyone(random_seed=7, strategy=strategy)
+            self.assertEqual(santa_pairs, same_pairs)
+
+    def test_same_pairs_with_same_instance_random_seed(self):
+        """The instances with the same random seed have the same pairs in every draw"""
+        drawer1 = SantaDraw(self.members, random_seed=7)
+        drawer2 = SantaDraw(self.members, random_seed=7)
+        for _ in range(3):
+            self.assertEqual(drawer1.assign_santa_to_everyone(), drawer2.assign_santa_to_everyone())
+
+    def test_global_random_untouched(self):
+        """The draw does not change the state of the global ``random`` module"""
+        state = random.getstate()
+        SantaDraw(self.members).assign_santa_to_everyone(random_seed=7)
+        SantaDraw(self.members).assign_santa_to_everyone()
+        self.assertEqual(random.getstate(), state)
+
+
+class TestSantaDrawWithSnapshot(TestCase):
+    """Santa Draw publishes the pairs as immutable snapshots"""
+
+    def setUp(self) -> None:
+        """Each test case will have Santa Draw of three members, who can only be drawn twice"""
+        self.drawer = SantaDraw(["Narae Kim", "Jay Kim", "Jung Lee"])
+
+    def test_no_pairs_before_draw(self):
+        """The snapshot before the first draw has no pairs and the generation 0"""
+        self.assertEqual(self.drawer.get_santa_pairs(), {})
+        self.assertEqual(self.drawer.get_santa_pairs_snapshot().generation, 0)
+
+    def test_read_only_pairs(self):
+        """The pairs cannot be changed by the viewers. It will raise 'TypeError'"""
+        self.drawer.assign_santa_to_everyone()
+        with self.assertRaises(TypeError):
+            self.drawer.get_santa_pairs()["Narae Kim"] = "Narae Kim"
+
+    def test_snapshot_per_draw(self):
+        """Every draw publishes a new snapshot of the next generation and the old snapshot stays the same"""
+        first_santa_pairs = self.drawer.assign_santa_to_everyone()
+        first_snapshot = self.drawer.get_santa_pairs_snapshot()
+        self.assertIs(self.drawer.get_santa_pairs(), first_snapshot.pairs)
+        self.assertEqual(first_snapshot, (first_santa_pairs, 1))
+        second_santa_pairs = self.drawer.assign_santa_to_everyone()
+        self.assertEqual(self.drawer.get_santa_pairs_snapshot(), (second_santa_pairs, 2))
+        self.assertEqual(first_snapshot.pairs, first_santa_pairs)
+
+    def test_snapshot_kept_after_failed_draw(self):
+        """The latest snapshot stays published if a draw fails"""
+        self.drawer.assign_santa_to_everyone()
+        self.drawer.assign_santa_to_everyone()
+        snapshot = self.drawer.get_santa_pairs_snapshot()
+        with self.assertRaises(ValueError):
+            self.drawer.assign_santa_to_everyone()
+        self.assertIs(self.drawer.get_santa_pairs_snapshot(), snapshot)
+
+
 class TestSantaDrawWithGrowingFamily(TestCase):
     """Santa Draw with growing family members for pair assignment"""
 
@@ -149,10 +332,12 @@ class TestSantaDrawWithGrowingFamily(TestCase):
         self.assertTrue(validate_santa_draw(family, first_santa_pairs))
 
         family.add_immediate_family_of_person_with_new_member("orig1", "new11")
+        self.assertFalse(drawer.is_drawable())
         with self.assertRaises(ValueError):  # it is not possible
             drawer.assign_santa_to_everyone()
 
         family.add_immediate_family_of_person_with_new_member("orig2", "new21")
+        self.assertTrue(drawer.is_drawable())
         second_santa_pairs = drawer.assign_santa_to_everyone()
         second_expected = {"orig1": "new21", "orig2": "new11", "new11": "orig2", "new21": "orig1"}
         self.assertEqual(second_santa_pairs, second_expected)
@@ -170,6 +355,244 @@ class TestSantaDrawWithGrowingFamily(TestCase):
             prev_pairs = santa_pairs
 
 
+class TestSantaDrawWithOverriddenRules(TestCase):
+    """Santa Draw with an additional constraint by overriding ``SantaDraw.is_valid_pairs()``"""
+
+    class SantaDrawToTeachers(SantaDraw):
+        """Students, whose names start with 'S', can only give a gift to teachers, whose names start with 'T'"""
+
+        @staticmethod
+        def is_valid_pairs(santa, candidate) -> bool:
+            return SantaDraw.is_valid_pairs(santa, candidate) and (
+                not str(santa).startswith("S") or str(candidate).startswith("T"))
+
+    def test_successful_santa_draw(self):
+        """Ten students and ten teachers are drawable"""
+        drawer = self.SantaDrawToTeachers(["S{}".format(i) for i in range(10)] + ["T{}".format(i) for i in range(10)])
+        self.assertTrue(drawer.is_drawable())
+        santa_pairs = drawer.assign_santa_to_everyone()
+        self.assertTrue(validate_santa_draw(drawer.get_family_members(), santa_pairs))
+        self.assertTrue(all(str(a).startswith("T") for s, a in santa_pairs.items() if str(s).startswith("S")))
+
+    def test_failed_santa_draw(self):
+        """
+        Twelve students cannot have distinct assignees out of eleven teachers.
+        Every student has eleven candidates, so it is not possible to find it out without the feasibility check
+        until trying all the possible assignments of the students.
+        """
+        drawer = self.SantaDrawToTeachers(["S{}".format(i) for i in range(12)] + ["T{}".format(i) for i in range(11)])
+        self.assertFalse(drawer.is_drawable())
+        with self.assertRaises(ValueError):
+            drawer.assign_santa_to_everyone()
+
+    def test_no_repair(self):
+        """The draw of an overridden rule cannot be repaired, since the rule cannot see the history before the draw"""
+        drawer = self.SantaDrawToTeachers(["S{}".format(i) for i in range(10)] + ["T{}".format(i) for i in range(10)])
+        santa_pairs = drawer.assign_santa_to_everyone()
+        drawer.get_family_members().add_immediate_family_of_person_with_new_member("T0", "T10")
+        with self.assertRaises(ValueError):
+            drawer.repair(added=["T10"])
+        self.assertEqual(drawer.get_santa_pairs(), santa_pairs)
+
+    def test_history_window_of_overridden_rule(self):
+        """The rule which delegates ``SantaDraw.is_valid_pairs()`` reads the history in the window of the family"""
+        class DelegatingSantaDraw(SantaDraw):
+            @staticmethod
+            def is_valid_pairs(santa, candidate) -> bool:
+                return SantaDraw.is_valid_pairs(santa, candidate)
+
+        drawer = DelegatingSantaDraw(Family(["a", "b", "c"], history_window=1))
+        for _ in range(5):
+            santa_pairs = drawer.assign_santa_to_everyone()
+            self.assertTrue(validate_santa_draw(drawer.get_family_members(), santa_pairs))
+
+    def test_santa_draw_with_portfolio(self):
+        """The overridden rule is compiled before the portfolio of the searches in worker processes"""
+        drawer = self.SantaDrawToTeachers(["S{}".format(i) for i in range(10)] + ["T{}".format(i) for i in range(10)])
+        santa_pairs = drawer.assign_santa_to_everyone(portfolio=2)
+        self.assertTrue(all(str(a).startswith("T") for s, a in santa_pairs.items() if str(s).startswith("S")))
+        drawer = self.SantaDrawToTeachers(["S{}".format(i) for i in range(12)] + ["T{}".format(i) for i in range(11)])
+        with self.assertRaises(ValueError):
+            drawer.assign_santa_to_everyone(portfolio=2)
+
+
+class TestSantaDrawWithPortfolio(TestCase):
+    """Santa Draw with a portfolio of the searches in worker processes"""
+
+    def setUp(self) -> None:
+        """Each test case will have Santa Draw of 100 members in households of four"""
+        self.drawer = SantaDraw(["h{}".format(i) for i in range(25)])
+        family = self.drawer.get_family_members()
+        for i in range(25):
+            for j in range(3):
+                family.add_immediate_family_of_person_with_new_member("h{}".format(i), "h{}-{}".format(i, j))
+
+    def test_santa_draw_with_portfolio_of_same_strategy(self):
+        """The first pairs of the searches of the same strategy are valid and published"""
+        prev_pairs = None
+        for _ in range(3):
+            santa_pairs = self.drawer.assign_santa_to_everyone(portfolio=3)
+            self.assertTrue(validate_santa_draw(self.drawer.get_family_members(), santa_pairs, prev_pairs))
+            self.assertEqual(self.drawer.get_santa_pairs(), santa_pairs)
+            prev_pairs = santa_pairs
+
+    def test_santa_draw_with_portfolio_of_strategies(self):
+        """The portfolio can have different strategies"""
+        santa_pairs = self.drawer.assign_santa_to_everyone(portfolio=("backtracking", "matching"))
+        self.assertTrue(validate_santa_draw(self.drawer.get_family_members(), santa_pairs))
+
+    def test_failed_santa_draw_with_portfolio(self):
+        """The portfolio cannot find pairs of an impossible family. It will raise 'ValueError'"""
+        drawer = SantaDraw(["Narae Kim", "Jay Kim", "Jung Lee"])
+        drawer.assign_santa_to_everyone(portfolio=2)
+        drawer.assign_santa_to_everyone(portfolio=2)
+        with self.assertRaises(ValueError):
+            drawer.assign_santa_to_everyone(portfolio=2)
+
+    def test_invalid_portfolio(self):
+        """The portfolio must have at least one search of the known strategies. It will raise 'ValueError'"""
+        with self.assertRaises(ValueError):
+            self.drawer.assign_santa_to_everyone(portfolio=0)
+        with self.assertRaises(ValueError):
+            self.drawer.assign_santa_to_everyone(portfolio=("backtracking", "UNKNOWN"))
+        self.assertEqual(self.drawer.get_santa_pairs_snapshot().generation, 0)
+
+
+class TestSantaDrawWithBudget(TestCase):
+    """Santa Draw bounded by a deadline, a number of the nodes or a cancellation token"""
+
+    def setUp(self) -> None:
+        """Each test case will have Santa Draw of 50 members"""
+        self.drawer = SantaDraw(["m{}".format(i) for i in range(50)])
+
+    def test_santa_draw_within_budget(self):
+        """The draw within its budget succeeds as usual"""
+        santa_pairs = self.drawer.assign_santa_to_everyone(deadline=60, max_nodes=100000)
+        self.assertTrue(validate_santa_draw(self.drawer.get_family_members(), santa_pairs))
+
+    def test_santa_draw_out_of_nodes(self):
+        """The draw which runs out of the nodes raises 'DrawTimeout', not 'ValueError', and publishes no pairs"""
+        for strategy in ("backtracking", "matching"):
+            with self.assertRaises(DrawTimeout):
+                self.drawer.assign_santa_to_everyone(strategy=strategy, max_nodes=0)
+        self.assertEqual(self.drawer.get_santa_pairs_snapshot().generation, 0)
+        self.assertEqual(self.drawer.get_family_members()[0].get_last_assignees(), ())
+        self.assertEqual(len(self.drawer.assign_santa_to_everyone()), 50)
+
+    def test_santa_draw_past_deadline(self):
+        """The draw past its deadline raises 'DrawTimeout'"""
+        with self.assertRaises(DrawTimeout):
+            self.drawer.assign_santa_to_everyone(deadline=0)
+
+    def test_cancelled_santa_draw(self):
+        """The draw with a cancelled token raises 'DrawCancelled'"""
+        token = CancellationToken()
+        token.cancel()
+        with self.assertRaises(DrawCancelled):
+            self.drawer.assign_santa_to_everyone(cancellation=token)
+        with self.assertRaises(DrawCancelled):
+            self.drawer.assign_santa_to_everyone(portfolio=2, cancellation=token)
+        self.assertEqual(self.drawer.get_santa_pairs_snapshot().generation, 0)
+
+    def test_santa_draw_with_portfolio_out_of_budget(self):
+        """The portfolio which runs out of its budget raises 'DrawTimeout'"""
+        with self.assertRaises(DrawTimeout):
+            self.drawer.assign_santa_to_everyone(portfolio=2, max_nodes=0)
+        with self.assertRaises(DrawTimeout):
+            self.drawer.assign_santa_to_everyone(portfolio=2, deadline=0)
+
+    def test_negative_budget(self):
+        """The budget must not be negative. It will raise 'ValueError'"""
+        with self.assertRaises(ValueError):
+            self.drawer.assign_santa_to_everyone(deadline=-1)
+
+
+class TestSantaDrawRepair(TestCase):
+    """Santa Draw repaired after the members are added to or removed from the family"""
+
+    def setUp(self) -> None:
+        """Each test case will have Santa Draw of 60 members in households of three, drawn twice"""
+        self.drawer = SantaDraw(["h{}".format(i) for i in range(20)], random_seed=1)
+        self.family = self.drawer.get_family_members()
+        for i in range(20):
+            for j in range(2):
+                self.family.add_immediate_family_of_person_with_new_member("h{}".format(i), "h{}-{}".format(i, j))
+        self.prev_pairs = self.drawer.assign_santa_to_everyone()
+        self.santa_pairs = self.drawer.assign_santa_to_everyone()
+
+    def assert_repaired(self, santa_pairs):
+        """The repaired pairs are valid for the history before the latest draw, which they replace in the history"""
+        self.assertTrue(validate_santa_draw(self.family, santa_pairs, self.prev_pairs))
+        self.assertEqual(self.drawer.get_santa_pairs(), santa_pairs)
+        for santa, assignee in santa_pairs.items():
+            self.assertIs(santa.get_last_assignees()[-1], assignee)
+            if santa in self.prev_pairs and self.prev_pairs[santa] in self.family:
+                self.assertEqual(santa.get_last_assignees(), (self.prev_pairs[santa], assignee))
+
+    def test_repair_with_new_member(self):
+        """A new member is spliced into the draw while most of the pairs are kept"""
+        self.family.add_immediate_family_of_person_with_new_member("h0", "NEW")
+        santa_pairs = self.drawer.repair(added=["NEW"])
+        self.assert_repaired(santa_pairs)
+        kept = sum(santa_pairs[santa] is assignee for santa, assignee in self.santa_pairs.items())
+        self.assertGreaterEqual(kept, len(self.santa_pairs) - 5)
+        self.assertEqual(self.drawer.get_santa_pairs_snapshot().generation, 3)
+
+    def test_repair_with_removed_member(self):
+        """The gap left by a leaver is closed while most of the pairs are kept"""
+        self.family.remove_immediate_family_of_person_with_member("h0", "h0-0")
+        santa_pairs = self.drawer.repair(removed=["h0-0"])
+        self.assert_repaired(santa_pairs)
+        kept = sum(santa_pairs.get(santa) is assignee for santa, assignee in self.santa_pairs.items())
+        self.assertGreaterEqual(kept, len(self.santa_pairs) - 6)
+
+    def test_repair_many_times(self):
+        """The members join and leave many times, and the draw is repaired every time"""
+        for i in range(10):
+            self.family.add_immediate_family_of_person_with_new_member("h{}".format(i), "NEW{}".format(i))
+            self.family.remove_immediate_family_of_person_with_member("h{}".format(i + 10), "h{}-0".format(i + 10))
+            self.assert_repaired(self.drawer.repair(added=["NEW{}".format(i)], removed=["h{}-0".format(i + 10)]))
+
+    def test_repair_with_full_matching(self):
+        """The repair falls back to the full matching if the search is stuck"""
+        self.family.add_immediate_family_of_person_with_new_member("h0", "NEW")
+        self.family.remove_immediate_family_of_person_with_member("h1", "h1-0")
+        with patch("secretsanta.santadraw.santa_draw._REPAIR_MAX_NODES", 0):
+            self.assert_repaired(self.drawer.repair(added=["NEW"], removed=["h1-0"]))
+
+    def test_failed_repair(self):
+        """The repair of an impossible family raises 'ValueError' and leaves the draw as it was"""
+        drawer = SantaDraw(["m1", "m2", "m3"])
+        santa_pairs = drawer.assign_santa_to_everyone()
+        family = drawer.get_family_members()
+        family.add_immediate_family_of_person_with_new_member("m1", "m4")
+        family.add_immediate_family_of_person_with_new_member("m1", "m5")
+        with self.assertRaises(ValueError):
+            drawer.repair(added=["m4", "m5"])
+        self.assertEqual(drawer.get_santa_pairs(), santa_pairs)
+        self.assertEqual(family[family.get_member_id("m4")].get_last_assignees(), ())
+
+    def test_repair_after_failed_repair(self):
+        """A failed repair restores the reverse pairs which it updates in place, so the next repair is valid"""
+        self.family.remove_immediate_family_of_person_with_member("h0", "h0-0")
+        with self.assertRaises(ValueError):
+            self.drawer.repair(removed=["h0-0", "h1"])
+        self.assertEqual(self.drawer._santas, {assignee: santa for santa, assignee in self.santa_pairs.items()})
+        self.assert_repaired(self.drawer.repair(removed=["h0-0"]))
+
+    def test_invalid_repair(self):
+        """The repair needs a draw, new members which are added and the members which are removed"""
+        with self.assertRaises(ValueError):
+            SantaDraw(["m1", "m2"]).repair(added=["m1"])
+        with self.assertRaises(ValueError):
+            self.drawer.repair(added=["h0"])
+        with self.assertRaises(ValueError):
+            self.drawer.repair(added=["UNKNOWN"])
+        with self.assertRaises(ValueError):
+            self.drawer.repair(removed=["h0"])
+        self.assertEqual(self.drawer.get_santa_pairs_snapshot().generation, 2)
+
+
 class TestSantaDrawIsValidPairs(TestCase):
     """Test the ``SantaDraw.is_valid_pairs()`` method"""
 
@@ -229,5 +652,36 @@ class TestSantaDrawIsValidPairs(TestCase):
         self.assertFalse(SantaDraw.is_valid_pairs(person1, person4))
 
 
+
+class TestSantaDrawExport(TestCase):
+    """Test ``iter_santa_pairs()`` and ``export_santa_pairs()`` methods which export the latest pairs"""
+
+    def setUp(self) -> None:
+        """Each test case will have a draw of a family of six members"""
+        self.santa_draw = SantaDraw(["m{}".format(i) for i in range(6)], random_seed=1)
+        self.santa_draw.assign_santa_to_everyone()
+
+    def test_iter_santa_pairs(self):
+        """The records are of the pairs at the call, even if a new draw is published meanwhile"""
+        santa_pairs = self.santa_draw.get_santa_pairs()
+        chunks = self.santa_draw.iter_santa_pairs(chunksize=4)
+        self.santa_draw.assign_santa_to_everyone()
+        chunks = list(chunks)
+        self.assertEqual([len(chunk) for chunk in chunks], [4, 2])
+        self.assertEqual(dict(record for chunk in chunks for record in chunk), santa_pairs)
+        self.assertEqual(dict(record for chunk in self.santa_draw.iter_santa_pairs() for record in chunk),
+                         self.santa_draw.get_santa_pairs())
+        self.assertEqual(list(SantaDraw(["m1", "m2"]).iter_santa_pairs()), [])
+
+    def test_export_santa_pairs(self):
+        """The records are written to the binary sink"""
+        sink = io.BytesIO()
+        self.assertEqual(self.santa_draw.export_santa_pairs(sink, "csv", chunksize=4), 6)
+        lines = sink.getvalue().decode("utf-8").splitlines()
+        self.assertEqual(lines[0], "santa,assignee")
+        self.assertEqual(dict(line.split(",") for line in lines[1:]),
+                         {str(santa): str(assignee) for santa, assignee in self.santa_draw.get_santa_pairs().items()})
+
+
 if __name__ == '__main__':
     main()
@@ -1,6 +1,10 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread
 from unittest import TestCase, main
 
-from secretsanta.santadraw.santa_draw import draw_secret_santa_pairs
+from secretsanta.santadraw.budget import CancellationToken, DrawCancelled, DrawTimeout
+from secretsanta.santadraw.santa_draw import draw_secret_santa_pairs, SantaDraw, search_assignment_of_ids
 from secretsanta.santadraw.family import Family
 from secretsanta.utils.validation import \
     is_distinct_assignee_unique_and_not_in_last_two_pairs_and_not_in_immediate_family
@@ -108,6 +112,105 @@ class TestSantaDrawWithManyMembers(TestCase):
             prev_pairs = santa_pairs
 
 
+class TestSantaDrawWithMatchingStrategy(TestCase):
+    """Santa Draw with the "matching" strategy for pair assignment"""
+
+    def test_successful_santa_draw_with_7_members_multiple_times(self):
+        """Try pair assignment of Santa Draw with an odd number of family members multiple times"""
+        members = Family(["m1", "m2", "m3", "m4", "m5", "m6", "m7"])
+        prev_prev_pairs = None
+        prev_pairs = None
+        for _ in range(100):  # test for 100 times
+            santa_pairs = draw_secret_santa_pairs(members, strategy="matching")
+            self.assertTrue(validate_santa_draw(members, santa_pairs, prev_pairs, prev_prev_pairs))
+            prev_prev_pairs = prev_pairs
+            prev_pairs = santa_pairs
+
+    def test_successful_santa_draw_of_large_family(self):
+        """A large family is matched from the forbidden pairs only, without the mask of every pair"""
+        family = Family(["m{}".format(i) for i in range(10000)])
+        for i in range(0, 9999, 3):
+            family.add_immediate_family_of_person_with_new_member(family[i], family[i + 1])
+        prev_pairs = draw_secret_santa_pairs(family, strategy="matching", deadline=10)
+        santa_pairs = draw_secret_santa_pairs(family, strategy="matching", deadline=10)
+        self.assertTrue(validate_santa_draw(family, santa_pairs, prev_pairs))
+
+    def test_unknown_strategy(self):
+        """Santa Draw cannot assign pairs with an unknown strategy. It will raise 'ValueError'"""
+        with self.assertRaises(ValueError):
+            draw_secret_santa_pairs(Family(["m1", "m2", "m3"]), strategy="UNKNOWN")
+
+
+class TestSantaDrawWithRandomStream(TestCase):
+    """Santa Draw with the random stream of each call"""
+
+    def test_same_pairs_with_same_random_seed(self):
+        """The draws with the same random seed have the same pairs without changing the global ``random`` module"""
+        members = ["m{}".format(i) for i in range(50)]
+        state = random.getstate()
+        santa_pairs = draw_secret_santa_pairs(Family(members), random_seed=7)
+        self.assertEqual(santa_pairs, draw_secret_santa_pairs(Family(members), random_seed=7))
+        self.assertEqual(random.getstate(), state)
+
+
+class TestSantaDrawWithPortfolio(TestCase):
+    """Santa Draw with a portfolio of the searches in worker processes"""
+
+    def test_successful_santa_draw_with_portfolio(self):
+        """The first pairs of the portfolio are valid"""
+        members = Family(["m{}".format(i) for i in range(50)])
+        santa_pairs = draw_secret_santa_pairs(members, portfolio=("backtracking", "matching", "backtracking"))
+        self.assertTrue(validate_santa_draw(members, santa_pairs))
+
+
+class TestSantaDrawWithBudget(TestCase):
+    """Santa Draw bounded by a deadline, a number of the nodes or a cancellation token"""
+
+    def test_santa_draw_out_of_budget(self):
+        """The draw which runs out of its budget raises 'DrawTimeout' and leaves the history and the lock untouched"""
+        family = Family(["m{}".format(i) for i in range(20)])
+        with self.assertRaises(DrawTimeout):
+            draw_secret_santa_pairs(family, max_nodes=0)
+        token = CancellationToken()
+        token.cancel()
+        with self.assertRaises(DrawCancelled):
+            draw_secret_santa_pairs(family, cancellation=token)
+        self.assertEqual(family[0].get_last_assignees(), ())
+        self.assertTrue(validate_santa_draw(family, draw_secret_santa_pairs(family, deadline=60)))
+
+
+class TestSantaDrawConcurrently(TestCase):
+    """Santa Draw from many threads, which only locks each family"""
+
+    def test_santa_draw_of_many_families(self):
+        """The draws of many families in a thread pool are all valid"""
+        families = [Family(["f{}-m{}".format(i, j) for j in range(5)]) for i in range(100)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(draw_secret_santa_pairs, families))
+        for family, santa_pairs in zip(families, results):
+            self.assertTrue(validate_santa_draw(family, santa_pairs))
+
+    def test_santa_draw_of_same_family(self):
+        """The concurrent draws of the same family do not interfere, so there are exactly two draws of three members"""
+        family = Family(["Narae Kim", "Jay Kim", "Jung Lee"])
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(draw_secret_santa_pairs, [family, family]))
+        self.assertNotEqual(results[0], results[1])
+        with self.assertRaises(ValueError):
+            draw_secret_santa_pairs(family)
+
+    def test_santa_draw_not_blocked_by_another_family(self):
+        """The draw of a family is not blocked while another family is locked"""
+        locked_family = Family(["m1", "m2", "m3"])
+        family = Family(["m1", "m2", "m3"])
+        results = []
+        with locked_family.locked():
+            thread = Thread(target=lambda: results.append(draw_secret_santa_pairs(family)), daemon=True)
+            thread.start()
+            thread.join(5)
+        self.assertEqual(len(results), 1)
+
+
 class TestSantaDrawWithGrowingFamily(TestCase):
     """Santa Draw with growing family members for pair assignment"""
 
@@ -142,5 +245,56 @@ class TestSantaDrawWithGrowingFamily(TestCase):
             prev_pairs = santa_pairs
 
 
+class TestSantaDrawFnWithSantaDraw(TestCase):
+    """Santa Draw of the same family by both ``SantaDraw`` and ``draw_secret_santa_pairs()``"""
+
+    def test_santa_draw_after_santa_draw_instance(self):
+        """The draws of either API see the history of the other, so there are exactly two draws of three members"""
+        family = Family(["Narae Kim", "Jay Kim", "Jung Lee"])
+        santa_draw = SantaDraw(family)
+        santa_draw.assign_santa_to_everyone()
+        first_santa_pairs = dict(santa_draw.get_santa_pairs())
+        second_santa_pairs = draw_secret_santa_pairs(family)
+        self.assertTrue(validate_santa_draw(family, second_santa_pairs, first_santa_pairs))
+        with self.assertRaises(ValueError):
+            draw_secret_santa_pairs(family)
+        with self.assertRaises(ValueError):
+            santa_draw.assign_santa_to_everyone()
+
+    def test_santa_draw_instance_after_santa_draw(self):
+        """The pairs of the draws of either API are not repeated within the last two draws"""
+        family = Family(["m{}".format(i) for i in range(5)])
+        santa_draw = SantaDraw(family)
+        prev_prev_pairs = {}
+        prev_pairs = draw_secret_santa_pairs(family, random_seed=0)
+        for seed in range(1, 7):
+            if seed % 2:
+                santa_draw.assign_santa_to_everyone(random_seed=seed)
+                santa_pairs = dict(santa_draw.get_santa_pairs())
+            else:
+                santa_pairs = draw_secret_santa_pairs(family, random_seed=seed)
+            self.assertTrue(validate_santa_draw(family, santa_pairs, prev_pairs, prev_prev_pairs))
+            prev_prev_pairs = prev_pairs
+            prev_pairs = santa_pairs
+
+
+class TestSearchAssignmentOfIds(TestCase):
+    """Search the assignees of a family given by the IDs of its members only"""
+
+    def test_search_assignment_of_ids(self):
+        """Both strategies find a valid assignment of the IDs, and an impossible family fails"""
+        households = [[0, 1], [2], [3]]
+        last_assignee_ids = [[2], [], [3], []]
+        for strategy in ("backtracking", "matching"):
+            assignment = search_assignment_of_ids(4, households, last_assignee_ids, strategy, random.Random(0))
+            self.assertEqual(sorted(assignment), [0, 1, 2, 3])
+            self.assertEqual(assignment[0], 3)
+            self.assertNotIn(assignment[1], (0, 1))
+            with self.assertRaises(ValueError):
+                search_assignment_of_ids(1, [[0]], [[]], strategy)
+            with self.assertRaises(ValueError):
+                search_assignment_of_ids(3, [[0, 1], [2]], [[], [], []], strategy)
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,106 @@
+from unittest import TestCase, main
+
+from secretsanta.utils.assignment_history import AssignmentHistory, NO_ASSIGNEE
+
+
+class TestAssignmentHistory(TestCase):
+    """Test ``AssignmentHistory`` class of the dense indices"""
+
+    def setUp(self) -> None:
+        """Instantiate ``AssignmentHistory`` class of four santas with two years of the cycles 0-1-2-3 and 0-2-1-3"""
+        self.history = AssignmentHistory(4)
+        self.history.assign_all([1, 2, 3, 0])
+        self.history.assign_all([2, 3, 1, 0])
+
+    def assert_assignees(self, *assignees):
+        """The assignees of every santa from the oldest are as given"""
+        self.assertEqual([list(self.history.assignees(santa)) for santa in range(len(self.history))], list(assignees))
+
+    def test_was_assigned(self):
+        """The assignees in the window are found"""
+        self.assertTrue(self.history.was_assigned(0, 1))
+        self.assertTrue(self.history.was_assigned(0, 2))
+        self.assertFalse(self.history.was_assigned(0, 3))
+        self.assert_assignees([1, 2], [2, 3], [3, 1], [0, 0])
+
+    def test_window(self):
+        """The oldest year leaves the window"""
+        self.assertEqual(self.history.window, 2)
+        self.history.assign_all([3, 0, 1, 2])
+        self.assertFalse(self.history.was_assigned(0, 1))
+        self.assert_assignees([2, 3], [3, 0], [1, 1], [0, 2])
+        history = AssignmentHistory(2, window=3)
+        for _ in range(3):
+            history.assign_all([1, 0])
+        self.assertEqual(list(history.assignees(0)), [1, 1, 1])
+        with self.assertRaises(ValueError):
+            AssignmentHistory(window=0)
+
+    def test_assign_santas(self):
+        """Assigning some santas shifts the years of the santas only"""
+        self.history.assign({0: 3, 3: 1})
+        self.assert_assignees([2, 3], [2, 3], [3, 1], [0, 1])
+        with self.assertRaises(ValueError):
+            self.history.assign_all([1, 0])
+
+    def test_replace_latest(self):
+        """The latest assignees are replaced, and a santa without any assignee has a new one"""
+        index = self.history.add()
+        self.history.replace_latest({0: 3, 3: 2, index: 0})
+        self.assert_assignees([1, 3], [2, 3], [3, 1], [0, 2], [0])
+
+    def test_set_assignees(self):
+        """The assignees of a santa are replaced and only the latest ones in the window are kept"""
+        self.history.set_assignees(1, [0, 2, 3])
+        self.history.set_assignees(2, [0])
+        self.assert_assignees([1, 2], [2, 3], [0], [0, 0])
+
+    def test_forget(self):
+        """A forgotten index has no assignee and is no longer an assignee of the others"""
+        self.history.forget(2)
+        self.assert_assignees([1], [3], [], [0, 0])
+
+    def test_copy(self):
+        """A copy has the same years, and neither of the history and the copy changes the other"""
+        history = self.history.copy()
+        self.history.assign_all([3, 0, 1, 2])
+        history.swap_remove(3)
+        self.assert_assignees([2, 3], [3, 0], [1, 1], [0, 2])
+        self.assertEqual([list(history.assignees(santa)) for santa in range(len(history))], [[1, 2], [2], [1]])
+
+    def test_swap(self):
+        """Two indices swap their assignees and their santas"""
+        self.history.swap(0, 3)
+        self.assert_assignees([3, 3], [2, 0], [0, 1], [1, 2])
+        self.assertTrue(self.history.was_assigned(2, 1))
+        self.history.swap(0, 3)
+        self.assert_assignees([1, 2], [2, 3], [3, 1], [0, 0])
+
+    def test_swap_remove(self):
+        """The last index takes the removed index both as a santa and as an assignee"""
+        self.history.swap_remove(1)
+        self.assertEqual(len(self.history), 3)
+        self.assert_assignees([2], [0, 0], [1])
+        self.history.swap_remove(2)
+        self.assert_assignees([], [0, 0])
+
+    def test_swap_remove_of_inexact_years(self):
+        """The santas of the same assignee in a year are all found even if the year is not a permutation"""
+        history = AssignmentHistory(4)
+        history.assign({santa: 3 for santa in range(3)})
+        history.assign({3: 1})
+        history.swap_remove(0)
+        self.assertEqual([list(history.assignees(santa)) for santa in range(3)], [[1], [0], [0]])
+        history.swap_remove(0)
+        self.assertEqual([list(history.assignees(santa)) for santa in range(2)], [[], []])
+
+    def test_no_assignee(self):
+        """The santas without an assignee in a year are skipped"""
+        history = AssignmentHistory(2)
+        history.assign_all([1, NO_ASSIGNEE])
+        self.assertEqual(list(history.assignees(1)), [])
+        self.assertFalse(history.was_assigned(1, NO_ASSIGNEE - 1))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+from unittest import TestCase, main
+
+from secretsanta.utils.bitset import popcount, lowest_index, iter_indices, from_flags
+
+
+class TestBitset(TestCase):
+    """Test the bitset functions on ints"""
+
+    def test_popcount(self):
+        """The number of the indices in the bitset"""
+        self.assertEqual(popcount(0), 0)
+        self.assertEqual(popcount(0b1011), 3)
+        self.assertEqual(popcount((1 << 1000) - 1), 1000)
+
+    def test_lowest_index(self):
+        """The lowest index in the bitset"""
+        self.assertEqual(lowest_index(0b1), 0)
+        self.assertEqual(lowest_index(0b101000), 3)
+        self.assertEqual(lowest_index(1 << 1000 | 1 << 999), 999)
+
+    def test_iter_indices(self):
+        """The indices in the bitset in ascending order"""
+        self.assertEqual(list(iter_indices(0)), [])
+        self.assertEqual(list(iter_indices(0b101001)), [0, 3, 5])
+
+    def test_from_flags(self):
+        """The bitset of the indices flagged as 1"""
+        self.assertEqual(from_flags(b""), 0)
+        self.assertEqual(from_flags(b"\x00\x00"), 0)
+        self.assertEqual(from_flags(b"\x01\x00\x00\x01"), 0b1001)
+        self.assertEqual(from_flags(bytearray(b"\x00\x01\x01")), 0b110)
+        flags = bytes(i % 3 == 0 for i in range(1000))
+        self.assertEqual(list(iter_indices(from_flags(flags))), list(range(0, 1000, 3)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+from unittest import TestCase, main
+
+from secretsanta.utils.disjoint_set import DisjointSet
+
+
+class TestDisjointSet(TestCase):
+    """Test ``DisjointSet`` class of the dense indices"""
+
+    def setUp(self) -> None:
+        """Instantiate ``DisjointSet`` class with six indices in the groups {0, 1, 2}, {3, 4} and {5}"""
+        self.groups = DisjointSet(6)
+        self.groups.union(0, 1)
+        self.groups.union(2, 1)
+        self.groups.union(3, 4)
+
+    def test_new_index_in_own_group(self):
+        """A new index starts in a group of its own"""
+        index = self.groups.add()
+        self.assertEqual(index, 6)
+        self.assertEqual(len(self.groups), 7)
+        self.assertEqual(self.groups.group(index), [index])
+        self.assertNotIn(self.groups.find(index), [self.groups.find(i) for i in range(6)])
+
+    def test_union(self):
+        """The indices in the same group have the same group ID"""
+        self.assertEqual(self.groups.find(0), self.groups.find(2))
+        self.assertNotEqual(self.groups.find(0), self.groups.find(3))
+        self.assertEqual(sorted(self.groups.group(2)), [0, 1, 2])
+        self.assertEqual(self.groups.group_size(4), 2)
+        self.assertEqual(self.groups.largest_group_size(), 3)
+        self.assertEqual(self.groups.union(0, 3), self.groups.find(4))
+        self.assertEqual(sorted(self.groups.group(4)), [0, 1, 2, 3, 4])
+        self.assertEqual(self.groups.union(1, 4), self.groups.find(0))
+        self.assertEqual(sorted(map(sorted, self.groups.groups())), [[0, 1, 2, 3, 4], [5]])
+
+    def test_separate(self):
+        """An index leaves its group into a group of its own"""
+        self.groups.separate(1)
+        self.assertEqual(self.groups.group(1), [1])
+        self.assertEqual(sorted(self.groups.group(0)), [0, 2])
+        self.groups.separate(5)
+        self.assertEqual(self.groups.group(5), [5])
+
+    def test_split(self):
+        """A group is split into its components, where the first one keeps the group ID"""
+        group_id = self.groups.find(0)
+        self.groups.split([[0, 2], [1]])
+        self.assertEqual(self.groups.find(2), group_id)
+        self.assertEqual(sorted(self.groups.group(0)), [0, 2])
+        self.assertEqual(self.groups.group(1), [1])
+        self.assertEqual(sorted(map(sorted, self.groups.groups())), [[0, 2], [1], [3, 4], [5]])
+
+    def test_swap(self):
+        """Two indices swap their groups, and the indices of the same group stay"""
+        self.groups.swap(1, 3)
+        self.assertEqual(sorted(self.groups.group(3)), [0, 2, 3])
+        self.assertEqual(sorted(self.groups.group(1)), [1, 4])
+        self.groups.swap(0, 2)
+        self.assertEqual(sorted(map(sorted, self.groups.groups())), [[0, 2, 3], [1, 4], [5]])
+
+    def test_swap_remove(self):
+        """The last index takes the removed index in its group"""
+        self.groups.swap_remove(1)
+        self.assertEqual(len(self.groups), 5)
+        self.assertEqual(self.groups.group(1), [1])  # the last index 5 is 1 now
+        self.assertEqual(sorted(self.groups.group(0)), [0, 2])
+        self.groups.swap_remove(0)
+        self.assertEqual(sorted(self.groups.group(0)), [0, 3])  # the last index 4 is 0 now
+        self.assertEqual(sorted(map(sorted, self.groups.groups())), [[0, 3], [1], [2]])
+
+    def test_empty(self):
+        """No indices, no groups"""
+        groups = DisjointSet()
+        self.assertEqual(len(groups), 0)
+        self.assertEqual(groups.largest_group_size(), 0)
+        self.assertEqual(list(groups.groups()), [])
+
+
+if __name__ == '__main__':
+    main()
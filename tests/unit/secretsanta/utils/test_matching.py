@@ -0,0 +1,167 @@
+import itertools
+import random
+from unittest import TestCase, main
+from unittest.mock import patch
+
+from secretsanta.santadraw.budget import CancellationToken, DrawBudget, DrawCancelled
+from secretsanta.utils.matching import ComplementAdjacency, has_complement_perfect_matching, hopcroft_karp, \
+    has_perfect_matching, random_complement_matching, random_maximum_matching, UNMATCHED
+
+
+def is_matching(adjacency, match_left) -> bool:
+    """Return True if every matched pair is an edge and no right vertex is matched twice"""
+    matched = [v for v in match_left if v != UNMATCHED]
+    return len(matched) == len(set(matched)) and all(
+        v in adjacency[u] for u, v in enumerate(match_left) if v != UNMATCHED)
+
+
+class TestHopcroftKarp(TestCase):
+    """Test ``hopcroft_karp()`` function"""
+
+    def test_empty_graph(self):
+        """No vertices, no matching"""
+        self.assertEqual(hopcroft_karp([], 0), [])
+
+    def test_perfect_matching(self):
+        """The greedy matching {0: 0} must be augmented to find the perfect matching"""
+        adjacency = [[0, 1], [0]]
+        self.assertEqual(hopcroft_karp(adjacency, 2), [1, 0])
+
+    def test_maximum_matching_with_unmatched_vertex(self):
+        """Two left vertices compete for the only right vertex"""
+        match_left = hopcroft_karp([[0], [0], [1, 2]], 3)
+        self.assertTrue(is_matching([[0], [0], [1, 2]], match_left))
+        self.assertEqual(match_left.count(UNMATCHED), 1)
+
+    def test_long_augmenting_path(self):
+        """The greedy matching leaves the last vertex free and only a path through every vertex can augment it"""
+        size = 2000
+        adjacency = [[i, i + 1] for i in range(size - 1)] + [[0]]
+        match_left = hopcroft_karp(adjacency, size)
+        self.assertTrue(is_matching(adjacency, match_left))
+        self.assertNotIn(UNMATCHED, match_left)
+
+    def test_greedy_matching_checks_budget(self):
+        """The greedy matching of a large graph stops with the budget before any phase"""
+        token = CancellationToken()
+        token.cancel()
+        with self.assertRaises(DrawCancelled):
+            hopcroft_karp([[0, 1], [0, 1]], 2, budget=DrawBudget(cancellation=token))
+
+    def test_maximum_matching_size_with_random_graphs(self):
+        """The size of the matching should be the same as the one found by trying all possible assignments"""
+        rng = random.Random(0)
+        for _ in range(200):
+            size = rng.randint(1, 6)
+            adjacency = [[v for v in range(size) if rng.random() < 0.4] for _ in range(size)]
+            best = max(sum(1 for u, v in enumerate(perm) if v in adjacency[u])
+                       for perm in itertools.permutations(range(size)))
+            match_left = hopcroft_karp(adjacency, size)
+            self.assertTrue(is_matching(adjacency, match_left))
+            self.assertEqual(size - match_left.count(UNMATCHED), best)
+
+
+class TestRandomMaximumMatching(TestCase):
+    """Test ``random_maximum_matching()`` function"""
+
+    def test_maximum_matching_size_with_random_graphs(self):
+        """The size of the matching should be the same as the one of ``hopcroft_karp()``"""
+        rng = random.Random(0)
+        for _ in range(200):
+            size = rng.randint(1, 8)
+            adjacency = [[v for v in range(size) if rng.random() < 0.4] for _ in range(size)]
+            match_left = random_maximum_matching(adjacency, size, rng)
+            self.assertTrue(is_matching(adjacency, match_left))
+            self.assertEqual(match_left.count(UNMATCHED), hopcroft_karp(adjacency, size).count(UNMATCHED))
+
+    def test_random_matching(self):
+        """All the six perfect matchings of a complete graph of three should appear"""
+        rng = random.Random(0)
+        adjacency = [[0, 1, 2]] * 3
+        matchings = {tuple(random_maximum_matching(adjacency, 3, rng)) for _ in range(200)}
+        self.assertEqual(matchings, set(itertools.permutations(range(3))))
+
+    def test_same_matching_with_same_seed(self):
+        """The matching is reproducible with the same random seed"""
+        adjacency = [[v for v in range(50) if v != u] for u in range(50)]
+        self.assertEqual(random_maximum_matching(adjacency, 50, random.Random(1)),
+                         random_maximum_matching(adjacency, 50, random.Random(1)))
+
+
+class TestRandomComplementMatching(TestCase):
+    """Test ``random_complement_matching()`` function, which is given the missing edges instead of the edges"""
+
+    def test_maximum_matching_size_with_random_graphs(self):
+        """The size of the matching should be the same as the one of ``hopcroft_karp()`` on the edges"""
+        rng = random.Random(0)
+        for _ in range(200):
+            size = rng.randint(1, 8)
+            forbidden = [{v for v in range(size) if rng.random() < 0.5} for _ in range(size)]
+            adjacency = [[v for v in range(size) if v not in forbidden[u]] for u in range(size)]
+            match_left = random_complement_matching(forbidden, size, rng)
+            self.assertTrue(is_matching(adjacency, match_left))
+            self.assertEqual(match_left.count(UNMATCHED), hopcroft_karp(adjacency, size).count(UNMATCHED))
+
+    def test_random_matching(self):
+        """All the derangements of four should appear"""
+        rng = random.Random(0)
+        forbidden = [{u} for u in range(4)]
+        matchings = {tuple(random_complement_matching(forbidden, 4, rng)) for _ in range(300)}
+        self.assertEqual(matchings, {p for p in itertools.permutations(range(4)) if all(p[i] != i for i in range(4))})
+
+    def test_lazy_adjacency(self):
+        """Only the adjacency of the vertices visited by the augmenting paths is built"""
+        size = 5000
+        adjacency = ComplementAdjacency([{u} for u in range(size)], size)
+        match_left = list(range(1, size - 1)) + [0, UNMATCHED]  # only the last vertex is left free
+        match_left = hopcroft_karp(adjacency, size, match_left)
+        self.assertTrue(all(v != u and v != UNMATCHED for u, v in enumerate(match_left)))
+        self.assertLess(len(adjacency._lists), 10)
+        self.assertEqual(len(adjacency[0]), size - 1)
+
+
+class TestHasPerfectMatching(TestCase):
+    """Test ``has_perfect_matching()`` function"""
+
+    def test_has_perfect_matching(self):
+        """A cycle of three has a perfect matching"""
+        self.assertTrue(has_perfect_matching([[1], [2], [0]], 3))
+
+    def test_has_no_perfect_matching(self):
+        """Two left vertices only have the same right vertex"""
+        self.assertFalse(has_perfect_matching([[2], [2], [0, 1]], 3))
+
+    def test_vertex_without_neighbours(self):
+        """A left vertex without any neighbours cannot be matched"""
+        self.assertFalse(has_perfect_matching([[1], []], 2))
+
+    def test_set_adjacency(self):
+        """The adjacency can be given as sets"""
+        self.assertTrue(has_perfect_matching([{1, 2}, {0, 2}, {0, 1}], 3))
+
+
+class TestHasComplementPerfectMatching(TestCase):
+    """Test ``has_complement_perfect_matching()`` function, which is given the missing edges instead of the edges"""
+
+    def test_same_as_has_perfect_matching(self):
+        """The result should be the same as the one of ``has_perfect_matching()`` on the edges"""
+        rng = random.Random(0)
+        for _ in range(200):
+            size = rng.randint(1, 8)
+            forbidden = [{v for v in range(size) if rng.random() < rng.choice((0.2, 0.6))} for _ in range(size)]
+            adjacency = [[v for v in range(size) if v not in forbidden[u]] for u in range(size)]
+            self.assertEqual(has_complement_perfect_matching(forbidden, size), has_perfect_matching(adjacency, size))
+
+    def test_dense_graph_without_search(self):
+        """Every vertex of a derangement of many has enough neighbours, so the matching is not searched"""
+        with patch("secretsanta.utils.matching.random_complement_matching") as matching:
+            self.assertTrue(has_complement_perfect_matching([{u} for u in range(1000)], 1000))
+        matching.assert_not_called()
+
+    def test_vertex_without_neighbours(self):
+        """A left vertex without any neighbours cannot be matched"""
+        self.assertFalse(has_complement_perfect_matching([{0, 1}, {0}], 2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+from threading import Barrier, Event, Thread
+from unittest import TestCase, main
+
+from secretsanta.utils.synchronized_decorator import ReadWriteLock, read_synchronized_method, \
+    write_synchronized_method
+
+TIMEOUT = 5  # seconds not to hang the tests forever if the lock is broken
+
+
+class TestReadWriteLock(TestCase):
+    """Test ``ReadWriteLock`` class with threads"""
+
+    def setUp(self) -> None:
+        """Each test case will have a new lock"""
+        self.lock = ReadWriteLock()
+
+    def run_thread(self, target):
+        """Start a daemon thread running the target and return the thread"""
+        thread = Thread(target=target, daemon=True)
+        thread.start()
+        return thread
+
+    def test_readers_in_parallel(self):
+        """Two readers hold the lock at the same time, otherwise they cannot pass the barrier together"""
+        barrier = Barrier(2, timeout=TIMEOUT)
+        passed = []
+
+        def read():
+            with self.lock.reading():
+                barrier.wait()
+                passed.append(True)
+
+        threads = [self.run_thread(read) for _ in range(2)]
+        for thread in threads:
+            thread.join(TIMEOUT)
+        self.assertEqual(passed, [True, True])
+
+    def test_writer_excludes_readers(self):
+        """A reader waits until the writer releases the lock"""
+        events = []
+        reader_started = Event()
+        self.lock.acquire_write()
+
+        def read():
+            reader_started.set()
+            with self.lock.reading():
+                events.append("read")
+
+        thread = self.run_thread(read)
+        reader_started.wait(TIMEOUT)
+        thread.join(0.1)
+        self.assertTrue(thread.is_alive())
+        events.append("write")
+        self.lock.release_write()
+        thread.join(TIMEOUT)
+        self.assertEqual(events, ["write", "read"])
+
+    def test_readers_exclude_writer(self):
+        """A writer waits until the readers release the lock, and new readers wait for the waiting writer"""
+        events = []
+        self.lock.acquire_read()
+        writer = self.run_thread(lambda: (self.lock.acquire_write(), events.append("write"), self.lock.release_write()))
+        while not self.lock._waiting_writers:
+            writer.join(0.01)
+        reader = self.run_thread(lambda: (self.lock.acquire_read(), events.append("read"), self.lock.release_read()))
+        reader.join(0.1)
+        self.assertEqual(events, [])
+        self.lock.release_read()
+        writer.join(TIMEOUT)
+        reader.join(TIMEOUT)
+        self.assertEqual(events, ["write", "read"])
+
+    def test_reentrant(self):
+        """The thread holding the lock can read or write again"""
+        with self.lock.writing():
+            with self.lock.writing():
+                with self.lock.reading():
+                    pass
+        with self.lock.reading():
+            with self.lock.reading():
+                pass
+        with self.lock.writing():  # the lock is free again
+            pass
+
+    def test_reader_cannot_write(self):
+        """A reader cannot become a writer. It will raise 'RuntimeError'"""
+        with self.lock.reading():
+            with self.assertRaises(RuntimeError):
+                self.lock.acquire_write()
+
+    def test_release_without_acquire(self):
+        """The lock cannot be released by the thread not holding it. It will raise 'RuntimeError'"""
+        with self.assertRaises(RuntimeError):
+            self.lock.release_read()
+        with self.assertRaises(RuntimeError):
+            self.lock.release_write()
+
+
+class TestReadWriteSynchronizedMethod(TestCase):
+    """Test the decorators of the methods with the lock of the instance"""
+
+    class Counter:
+        """The counter of which the increment writes and the value reads"""
+
+        def __init__(self):
+            self._rw_lock = ReadWriteLock()
+            self._value = 0
+
+        @write_synchronized_method
+        def increment(self):
+            value = self._value
+            self._value = value + 1
+
+        @read_synchronized_method
+        def get_value(self):
+            return self._value
+
+    def test_writers_not_interfering(self):
+        """The increments from many threads are not lost"""
+        counter = self.Counter()
+
+        def increment():
+            for _ in range(1000):
+                counter.increment()
+
+        threads = [Thread(target=increment) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(TIMEOUT)
+        self.assertEqual(counter.get_value(), 4000)
+
+    def test_lock_per_instance(self):
+        """A writer of an instance does not block a reader of another instance"""
+        counter1 = self.Counter()
+        counter2 = self.Counter()
+        with counter1._rw_lock.writing():
+            thread = Thread(target=counter2.get_value, daemon=True)
+            thread.start()
+            thread.join(TIMEOUT)
+            self.assertFalse(thread.is_alive())
+
+
+if __name__ == '__main__':
+    main()
@@ -2,7 +2,8 @@ from unittest import TestCase, main
 
 from secretsanta.utils.validation import is_assignee_unique_and_not_themselves_in_pairs, \
     is_distinct_assignee_unique_and_not_in_last_two_pairs, \
-    is_distinct_assignee_unique_and_not_in_last_two_pairs_and_not_in_immediate_family
+    is_distinct_assignee_unique_and_not_in_last_two_pairs_and_not_in_immediate_family, \
+    is_distinct_assignee_unique_and_not_in_history_and_not_in_household
 from secretsanta.santadraw.family import Family
 
 
@@ -378,5 +379,39 @@ class TestUniqueAssignmentNotInPrevTwoNotInImmediateFamily(TestCase):
         self.assertFalse(validate_part3(members, invalid_second_pairs2, first_pairs))
 
 
+class TestUniqueAssignmentNotInHistoryNotInHousehold(TestCase):
+    """Test ``is_distinct_assignee_unique_and_not_in_history_and_not_in_household()`` function"""
+
+    def setUp(self) -> None:
+        """Each test case will have a family of four members where m1 and m2 are in a household"""
+        self.family = Family(["m1", "m2", "m3", "m4"])
+        self.family.add_immediate_family_of_person_with_new_member("m1", "m2")
+
+    def test_pair_assignment_with_true_case(self):
+        """This is a true test case so it should return True"""
+        santa_pairs = {"m1": "m3", "m2": "m4", "m3": "m1", "m4": "m2"}
+        self.assertTrue(is_distinct_assignee_unique_and_not_in_history_and_not_in_household(self.family, santa_pairs))
+
+    def test_pair_assignment_in_history(self):
+        """The pairs in the history of the family are invalid, until they leave the window"""
+        santa_pairs = {"m1": "m3", "m2": "m4", "m3": "m1", "m4": "m2"}
+        self.family.update_last_assignees_with_pairs(santa_pairs)
+        self.assertFalse(is_distinct_assignee_unique_and_not_in_history_and_not_in_household(self.family, santa_pairs))
+        self.family.update_last_assignees_with_pairs({"m1": "m4", "m2": "m3", "m3": "m2", "m4": "m1"})
+        self.assertFalse(is_distinct_assignee_unique_and_not_in_history_and_not_in_household(self.family, santa_pairs))
+        self.family.update_last_assignees_with_pairs({"m1": "m4", "m2": "m3", "m3": "m2", "m4": "m1"})
+        self.assertTrue(is_distinct_assignee_unique_and_not_in_history_and_not_in_household(self.family, santa_pairs))
+
+    def test_invalid_pair_assignment(self):
+        """The pairs in a household, of themselves, of non-members or of the same assignee are invalid"""
+        for santa_pairs in ({"m1": "m2", "m2": "m1", "m3": "m4", "m4": "m3"},
+                            {"m1": "m1", "m2": "m4", "m3": "m2", "m4": "m3"},
+                            {"m1": "m3", "m2": "m4", "m3": "m1", "NOT_EXIST": "m2"},
+                            {"m1": "m3", "m2": "m3", "m3": "m1", "m4": "m2"},
+                            {"m1": "m3", "m2": "m4", "m3": "m1"}):
+            self.assertFalse(is_distinct_assignee_unique_and_not_in_history_and_not_in_household(self.family,
+                                                                                                 santa_pairs))
+
+
 if __name__ == '__main__':
     main()